@@ -1,51 +1,72 @@
-from vanilla.vanillaBase import VanillaBaseObject, VanillaBaseControl, VanillaError
-from vanilla.vanillaBox import Box, HorizontalLine, VerticalLine
-from vanilla.vanillaBrowser import ObjectBrowser
-from vanilla.vanillaButton import Button, SquareButton, ImageButton, HelpButton
-from vanilla.vanillaCheckBox import CheckBox
-from vanilla.vanillaColorWell import ColorWell
-from vanilla.vanillaComboBox import ComboBox
-from vanilla.vanillaDatePicker import DatePicker
-from vanilla.vanillaDrawer import Drawer
-from vanilla.vanillaEditText import EditText, SecureEditText
-from vanilla.vanillaGradientButton import GradientButton
-from vanilla.vanillaGroup import Group
-from vanilla.vanillaImageView import ImageView
-from vanilla.vanillaLevelIndicator import LevelIndicator, LevelIndicatorListCell
-from vanilla.vanillaList import List, CheckBoxListCell, SliderListCell, PopUpButtonListCell, ImageListCell, SegmentedButtonListCell
-from vanilla.vanillaList2 import (
-    List2,
-    List2GroupRow,
-    EditTextList2Cell,
-    GroupTitleList2Cell,
-    SliderList2Cell,
-    CheckBoxList2Cell,
-    PopUpButtonList2Cell,
-    ImageList2Cell,
-    SegmentedButtonList2Cell,
-    ColorWellList2Cell,
-    LevelIndicatorList2Cell,
-    ComboBoxList2Cell
-)
-from vanilla.vanillaPathControl import PathControl
-from vanilla.vanillaPopUpButton import PopUpButton, ActionButton
-from vanilla.vanillaPopover import Popover
-from vanilla.vanillaProgressBar import ProgressBar
-from vanilla.vanillaProgressSpinner import ProgressSpinner
-from vanilla.vanillaRadioGroup import RadioGroup, VerticalRadioGroup, HorizontalRadioGroup, RadioButton
-from vanilla.vanillaScrollView import ScrollView
-from vanilla.vanillaSearchBox import SearchBox
-from vanilla.vanillaSegmentedButton import SegmentedButton
-from vanilla.vanillaSlider import Slider
-from vanilla.vanillaSplitView import SplitView, SplitView2
-from vanilla.vanillaStackGroup import HorizontalStackGroup, VerticalStackGroup
-from vanilla.vanillaStackView import HorizontalStackView, VerticalStackView
-from vanilla.vanillaStepper import Stepper
-from vanilla.vanillaTabs import Tabs
-from vanilla.vanillaTextBox import TextBox
-from vanilla.vanillaTextEditor import TextEditor
-from vanilla.vanillaWindows import Window, FloatingWindow, HUDFloatingWindow, Sheet, ModalWindow
-from vanilla.dragAndDrop import startDraggingSession, DropTargetProtocolMixIn
+import os
+import sys
+
+# The objects are imported from their modules on first access
+# (PEP 562) so that `import vanilla` doesn't load every widget
+# module and the PyObjC classes they use.
+
+_lazyObjects = {
+    "vanilla.vanillaBase": ["VanillaBaseObject", "VanillaBaseControl", "VanillaError"],
+    "vanilla.vanillaBox": ["Box", "HorizontalLine", "VerticalLine"],
+    "vanilla.vanillaBrowser": ["ObjectBrowser", "setAppKitNameCacheDirectory"],
+    "vanilla.vanillaButton": ["Button", "SquareButton", "ImageButton", "HelpButton"],
+    "vanilla.vanillaCheckBox": ["CheckBox"],
+    "vanilla.vanillaColorWell": ["ColorWell"],
+    "vanilla.vanillaComboBox": ["ComboBox"],
+    "vanilla.vanillaDatePicker": ["DatePicker"],
+    "vanilla.vanillaDrawer": ["Drawer"],
+    "vanilla.vanillaEditText": ["EditText", "SecureEditText"],
+    "vanilla.vanillaGradientButton": ["GradientButton"],
+    "vanilla.vanillaGridView": ["GridView"],
+    "vanilla.vanillaGroup": ["Group"],
+    "vanilla.vanillaImageView": ["ImageView"],
+    "vanilla.vanillaLevelIndicator": ["LevelIndicator", "LevelIndicatorListCell"],
+    "vanilla.vanillaList": ["List", "CheckBoxListCell", "SliderListCell", "PopUpButtonListCell", "ImageListCell", "SegmentedButtonListCell"],
+    "vanilla.vanillaList2": [
+        "List2",
+        "List2GroupRow",
+        "EditTextList2Cell",
+        "GroupTitleList2Cell",
+        "SliderList2Cell",
+        "CheckBoxList2Cell",
+        "PopUpButtonList2Cell",
+        "ImageList2Cell",
+        "SegmentedButtonList2Cell",
+        "ColorWellList2Cell",
+        "LevelIndicatorList2Cell",
+        "ComboBoxList2Cell"
+    ],
+    "vanilla.vanillaPathControl": ["PathControl"],
+    "vanilla.vanillaPopUpButton": ["PopUpButton", "ActionButton"],
+    "vanilla.vanillaPopover": ["Popover"],
+    "vanilla.vanillaProgressBar": ["ProgressBar"],
+    "vanilla.vanillaProgressSpinner": ["ProgressSpinner"],
+    "vanilla.vanillaRadioGroup": ["RadioGroup", "VerticalRadioGroup", "HorizontalRadioGroup", "RadioButton"],
+    "vanilla.vanillaScrollView": ["ScrollView"],
+    "vanilla.vanillaSearchBox": ["SearchBox"],
+    "vanilla.vanillaSegmentedButton": ["SegmentedButton"],
+    "vanilla.vanillaSlider": ["Slider"],
+    "vanilla.vanillaSplitView": ["SplitView", "SplitView2"],
+    "vanilla.vanillaStackGroup": ["HorizontalStackGroup", "VerticalStackGroup"],
+    "vanilla.vanillaStackView": ["HorizontalStackView", "VerticalStackView", "VirtualVerticalStackView"],
+    "vanilla.vanillaStepper": ["Stepper"],
+    "vanilla.vanillaTabs": ["Tabs"],
+    "vanilla.vanillaTextBox": ["TextBox"],
+    "vanilla.vanillaTextEditor": ["TextEditor"],
+    "vanilla.vanillaWindows": ["Window", "FloatingWindow", "HUDFloatingWindow", "Sheet", "ModalWindow"],
+    "vanilla.dragAndDrop": ["startDraggingSession", "endDraggingSession", "DropTargetProtocolMixIn"],
+    "vanilla.nsSubclasses": ["preload"],
+    "vanilla.profiling": ["profile", "Profiler"],
+    "vanilla.imageCache": ["invalidateImageCache", "getImageCacheStats"],
+    "vanilla.imageLoading": ["setMaxConcurrentImageLoads"],
+    "vanilla.thumbnailCache": ["setThumbnailCacheDirectory"],
+}
+
+_lazyObjectModules = {
+    name: moduleName
+    for moduleName, names in _lazyObjects.items()
+    for name in names
+}
 
 __all__ = [
     "VanillaBaseObject", "VanillaBaseControl", "VanillaError",
@@ -78,7 +99,7 @@ __all__ = [
     "SplitView",
     "SplitView2",
     "HorizontalStackGroup", "VerticalStackGroup",
-    "HorizontalStackView", "VerticalStackView",
+    "HorizontalStackView", "VerticalStackView", "VirtualVerticalStackView",
     "Stepper",
     "Tabs",
     "TextBox",
@@ -86,7 +107,19 @@ __all__ = [
     "Window", "FloatingWindow", "HUDFloatingWindow", "Sheet", "ModalWindow",
 
     "startDraggingSession",
-    "DropTargetProtocolMixIn"
+    "endDraggingSession",
+    "DropTargetProtocolMixIn",
+
+    "preload",
+
+    "profile",
+    "Profiler",
+
+    "invalidateImageCache",
+    "getImageCacheStats",
+    "setMaxConcurrentImageLoads",
+    "setThumbnailCacheDirectory",
+    "setAppKitNameCacheDirectory"
     ]
 
 
@@ -97,10 +130,39 @@ except ImportError:
 
 
 # NSGridview is available from OS 10.12+
-try:
-    from AppKit import NSGridView
-except ImportError:
-    pass
-else:
-    from vanilla.vanillaGridView import GridView
+# This is tested with the Darwin kernel version (16 is 10.12)
+# rather than by importing AppKit.NSGridView to keep the
+# import cheap.
+def _gridViewIsAvailable():
+    if sys.platform != "darwin":
+        return False
+    try:
+        major = int(os.uname().release.split(".")[0])
+    except ValueError:
+        return True
+    return major >= 16
+
+if _gridViewIsAvailable():
     __all__.append("GridView")
+else:
+    del _lazyObjectModules["GridView"]
+
+
+def __getattr__(name):
+    import importlib
+    moduleName = _lazyObjectModules.get(name)
+    if moduleName is None:
+        # submodules, like vanilla.vanillaBase, that weren't imported yet
+        if not name.startswith("_"):
+            import importlib.util
+            if importlib.util.find_spec("vanilla." + name) is not None:
+                return importlib.import_module("vanilla." + name)
+        raise AttributeError(f"module 'vanilla' has no attribute '{name}'")
+    module = importlib.import_module(moduleName)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
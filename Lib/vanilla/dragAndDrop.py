@@ -1,6 +1,7 @@
 import objc
 import AppKit
 from vanilla.vanillaBase import VanillaBaseObject
+from vanilla.dragSessions import DragSessionRegistry
 
 # Dragging Source
 
@@ -17,12 +18,21 @@ except AttributeError:
     NSPasteboardTypeFileURL = "public.file-url"
 
 plistPasteboardType = "dev.robotools.vanilla.propertyList"
+rowIndexPasteboardType = "dev.robotools.vanilla.rowIndex"
+dragItemPasteboardType = "dev.robotools.vanilla.dragItem"
 pasteboardTypeMap = dict(
     string=AppKit.NSPasteboardTypeString,
     plist=plistPasteboardType,
-    fileURL=NSPasteboardTypeFileURL
+    fileURL=NSPasteboardTypeFileURL,
+    rowIndex=rowIndexPasteboardType
 )
 
+def _normalizePasteboardType(pasteboardType):
+    return pasteboardTypeMap.get(pasteboardType, pasteboardType)
+
+# the drags started by vanilla views in this application
+dragSessionRegistry = DragSessionRegistry(normalizeType=_normalizePasteboardType)
+
 def startDraggingSession(
         view,
         event,
@@ -63,6 +73,11 @@ def startDraggingSession(
 
     `location` A fallback in case `location` is not defined in
     an item dictionary. Optional.
+
+    The values of the items are kept for drop targets in this
+    application until the drag ends. Call `endDraggingSession`
+    from the `draggingSession:endedAtPoint:operation:` method
+    of the source to let go of them.
     """
     if isinstance(view, VanillaBaseObject):
         view = view._nsObject
@@ -74,39 +89,105 @@ def startDraggingSession(
         x = AppKit.NSMidX(rect)
         y = AppKit.NSMidY(rect)
         location = (x, y)
-    for item in items:
+    sessionItems = {}
+    for index, item in enumerate(items):
         if "location" not in item:
             item["location"] = location
-        draggingItem = _makeDraggingItem(**item)
+        itemKey = str(index)
+        draggingItem = _makeDraggingItem(itemKey=itemKey, **item)
         draggingItems.append(draggingItem)
+        sessionItems[itemKey] = item["typesAndValues"]
     session = view.beginDraggingSessionWithItems_event_source_(
         draggingItems,
         event,
         source
     )
+    dragSessionRegistry.beginSession(session.draggingSequenceNumber(), source, sessionItems)
     formation = draggingFormationMap.get(formation, formation)
     session.setDraggingFormation_(formation)
     return session
 
+def endDraggingSession(session):
+    """
+    Let go of the values of a dragging session started with
+    `startDraggingSession`. Call this from the
+    `draggingSession:endedAtPoint:operation:` method of the source.
+    Without it, only the values of the last few drags are kept.
+    """
+    dragSessionRegistry.endSession(session.draggingSequenceNumber())
+
 def makePasteboardItem(typesAndValues):
     pasteboardItem = AppKit.NSPasteboardItem.alloc().init()
     for pasteboardType, value in typesAndValues.items():
         pasteboardType = pasteboardTypeMap.get(pasteboardType, pasteboardType)
-        if isinstance(value, bytes):
-            pasteboardItem.setData_forType_(value, pasteboardType)
-        elif isinstance(value, str):
-            pasteboardItem.setString_forType_(value, pasteboardType)
-        else:
-            pasteboardItem.setPropertyList_forType_(value, pasteboardType)
+        _setPasteboardItemValue(pasteboardItem, value, pasteboardType)
     return pasteboardItem
 
+def makePromisedPasteboardItem(pasteboardTypes, makeTypesAndValues, typesAndValues=None):
+    """
+    Make a pasteboard item that promises data for `pasteboardTypes`
+    without writing it. `makeTypesAndValues` is called without arguments
+    the first time a drop target asks for one of the types and must return
+    a `typesAndValues` dictionary. It is called at most once.
+
+    `typesAndValues` Optional. Values written to the item right away.
+    """
+    pasteboardItem = makePasteboardItem(typesAndValues or {})
+    provider = VanillaPasteboardItemDataProvider.alloc().initWithCallback_(makeTypesAndValues)
+    pasteboardTypes = [pasteboardTypeMap.get(pasteboardType, pasteboardType) for pasteboardType in pasteboardTypes]
+    pasteboardItem.setDataProvider_forTypes_(provider, pasteboardTypes)
+    return pasteboardItem
+
+def _setPasteboardItemValue(pasteboardItem, value, pasteboardType):
+    if isinstance(value, bytes):
+        pasteboardItem.setData_forType_(value, pasteboardType)
+    elif isinstance(value, str):
+        pasteboardItem.setString_forType_(value, pasteboardType)
+    else:
+        pasteboardItem.setPropertyList_forType_(value, pasteboardType)
+
+
+class VanillaPasteboardItemDataProvider(AppKit.NSObject):
+
+    """
+    A `NSPasteboardItemDataProvider` producing the
+    data of a pasteboard item when it is asked for.
+    """
+
+    def initWithCallback_(self, callback):
+        self = self.init()
+        self._callback = callback
+        self._typesAndValues = None
+        return self
+
+    def pasteboard_item_provideDataForType_(self, pasteboard, pasteboardItem, pasteboardType):
+        if self._typesAndValues is None:
+            if self._callback is None:
+                return
+            typesAndValues = self._callback() or {}
+            self._callback = None
+            self._typesAndValues = {
+                pasteboardTypeMap.get(key, key) : value
+                for key, value in typesAndValues.items()
+            }
+        value = self._typesAndValues.get(pasteboardType)
+        if value is not None:
+            _setPasteboardItemValue(pasteboardItem, value, pasteboardType)
+
+    def pasteboardFinishedWithDataProvider_(self, pasteboard):
+        self._callback = None
+        self._typesAndValues = None
+
 def _makeDraggingItem(
         typesAndValues,
         location=(0, 0),
         size=None,
-        image=None
+        image=None,
+        itemKey=None
     ):
     pasteboardItem = makePasteboardItem(typesAndValues)
+    if itemKey is not None:
+        pasteboardItem.setString_forType_(itemKey, dragItemPasteboardType)
     if size is None:
         if image is not None:
             size = image.size()
@@ -218,6 +299,13 @@ class DropTargetProtocolMixIn:
       will be given as the source.
     - `items` The list of NSPasteboardItem objects. Use the
       `getDropItemValues` method to unpack these to Python objects.
+      Items dragged from a `List2` carry the index of their row with
+      the "rowIndex" pasteboard type. Use the `getDropSourceItems`
+      method to get the dragged objects themselves.
+      When the drag started in a vanilla view in this application,
+      `getDropItemValues` given `draggingInfo` returns the values
+      given by the drag source without decoding the pasteboard.
+      These are the live objects, not copies.
     - `location` The location of the drop.
     - `draggingInfo` The underlying NSDraggingInfo object.
     """
@@ -233,6 +321,7 @@ class DropTargetProtocolMixIn:
     _performDropCallback = None
     _finishDropCallback = None
     _unpackDragDataCallback = None
+    _dropCandidateCache = None
 
     def _getDropView(self):
         return self._nsObject
@@ -260,24 +349,47 @@ class DropTargetProtocolMixIn:
             unwrapped.append(pasteboardType)
         view.registerForDraggedTypes_(unwrapped)
 
-    def getDropItemValues(self, items, pasteboardType=None):
+    def getDropItemValues(self, items, pasteboardType=None, draggingInfo=None):
         """
         Get Python objects from the given NSPasteboardItem
         objects for the given pasteboard type. If this view
         is registered for only one pasteboard type, None may
         be given as the pasteboard type.
+
+        If `draggingInfo`, the NSDraggingInfo of the drag, is given
+        and the drag started in a vanilla view in this application,
+        the values are taken from the drag source as they are,
+        nothing is decoded. These are the live objects of the
+        source, not copies.
         """
         if pasteboardType is None:
             pasteboardTypes = self._getDropView().registeredDraggedTypes()
             assert len(pasteboardTypes) == 1
             pasteboardType = pasteboardTypes[0]
         pasteboardType = pasteboardTypeMap.get(pasteboardType, pasteboardType)
+        session = None
+        if draggingInfo is not None:
+            session = self._getDragSession(draggingInfo)
+        if pasteboardType in (AppKit.NSPasteboardTypeFileURL, rowIndexPasteboardType):
+            # these are cheap to read and are converted
+            session = None
         values = []
         for item in items:
             value = None
-            if pasteboardType == AppKit.NSPasteboardTypeFileURL:
+            if session is not None:
+                itemKey = item.stringForType_(dragItemPasteboardType)
+                if itemKey is not None:
+                    value = session.getValue(itemKey, pasteboardType)
+            if value is not None:
+                if self._unpackDragDataCallback is not None:
+                    value = self._unpackDragDataCallback(value, pasteboardType)
+            elif pasteboardType == AppKit.NSPasteboardTypeFileURL:
                 value = item.stringForType_(pasteboardType)
                 value = AppKit.NSURL.URLWithString_(value)
+            elif pasteboardType == rowIndexPasteboardType:
+                value = item.stringForType_(pasteboardType)
+                if value is not None:
+                    value = int(value)
             else:
                 value = item.propertyListForType_(pasteboardType)
                 if self._unpackDragDataCallback is not None:
@@ -286,6 +398,24 @@ class DropTargetProtocolMixIn:
                 values.append(value)
         return values
 
+    def getDropSourceItems(self, info):
+        """
+        Get the objects dragged from a `List2` in this application from the
+        given dragging info dictionary. The objects are looked up by the
+        row indexes on the pasteboard, nothing is unpacked. Returns None
+        if the drag didn't start in a `List2` in this application.
+        """
+        source = info["source"]
+        if not hasattr(source, "_getDraggedItemsForIndexes"):
+            return None
+        indexes = []
+        for item in info["items"]:
+            index = item.stringForType_(rowIndexPasteboardType)
+            if index is None:
+                return None
+            indexes.append(int(index))
+        return source._getDraggedItemsForIndexes(indexes)
+
     # Drop Candidate
 
     def _dropCandidateCallbackCaller(self, draggingInfo, callback, draggingEvent):
@@ -299,12 +429,36 @@ class DropTargetProtocolMixIn:
             value = callback(info)
         return value
 
+    def _getDragSession(self, draggingInfo):
+        # drags from other applications have no source
+        if draggingInfo.draggingSource() is None:
+            return None
+        return dragSessionRegistry.getSession(draggingInfo.draggingSequenceNumber())
+
+    def _getDropCandidateCache(self, draggingInfo):
+        # The source and the pasteboard items don't change during a
+        # drag, they are only looked up once per dragging session.
+        sequenceNumber = draggingInfo.draggingSequenceNumber()
+        cache = self._dropCandidateCache
+        if cache is None or cache["sequenceNumber"] != sequenceNumber:
+            source = draggingInfo.draggingSource()
+            if hasattr(source, "vanillaWrapper"):
+                source = source.vanillaWrapper()
+            pasteboard = draggingInfo.draggingPasteboard()
+            cache = self._dropCandidateCache = dict(
+                sequenceNumber=sequenceNumber,
+                source=source,
+                items=pasteboard.pasteboardItems()
+            )
+        return cache
+
+    def _clearDropCandidateCache(self):
+        self._dropCandidateCache = None
+
     def _unpackDropCandidateInfo(self, draggingInfo):
-        source = draggingInfo.draggingSource()
-        if hasattr(source, "vanillaWrapper"):
-            source = source.vanillaWrapper()
-        pasteboard = draggingInfo.draggingPasteboard()
-        items = pasteboard.pasteboardItems()
+        cache = self._getDropCandidateCache(draggingInfo)
+        source = cache["source"]
+        items = cache["items"]
         x, y = self._getDropView().convertPoint_fromView_(
             draggingInfo.draggingLocation(),
             None
@@ -342,6 +496,7 @@ class DropTargetProtocolMixIn:
             self._dropCandidateEndedCallback,
             draggingEvent="ended"
         )
+        self._clearDropCandidateCache()
 
     def _dropCandidateExited(self, draggingInfo):
         self._dropCandidateCallbackCaller(
@@ -0,0 +1,119 @@
+"""
+A registry of the drags started by vanilla views.
+
+Drag data has to be written to the pasteboard so other applications
+can read it. When a drag starts and ends in the same application that
+is a detour: the drop target decodes what the source just encoded. The
+source registers the Python values of the dragged items under the
+identifier of the drag session. A drop target in the same application
+looks the values up by the identifier and the key of each item, and
+only decodes the pasteboard for items it can't find.
+
+Nothing in here depends on AppKit.
+"""
+
+import collections
+
+
+class DragSession(object):
+
+    """
+    The items of one drag.
+
+    **source** The object that started the drag.
+
+    **items** A dictionary of the form `{itemKey : typesAndValues}`.
+    *typesAndValues* is a dictionary of pasteboard types and values or a
+    function without arguments returning one. Functions are called the
+    first time a value of the item is asked for.
+
+    **normalizeType** An optional function turning a pasteboard type
+    into the type the values are looked up by.
+    """
+
+    def __init__(self, source, items, normalizeType=None):
+        if normalizeType is None:
+            normalizeType = _identity
+        self.source = source
+        self._items = dict(items)
+        self._normalizeType = normalizeType
+        self._resolved = {}
+
+    def __contains__(self, itemKey):
+        return itemKey in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def getTypesAndValues(self, itemKey):
+        """
+        Return the types and values of the item
+        with **itemKey** or `None` if there is none.
+        """
+        typesAndValues = self._resolved.get(itemKey)
+        if typesAndValues is None:
+            typesAndValues = self._items.get(itemKey)
+            if typesAndValues is None:
+                return None
+            if callable(typesAndValues):
+                typesAndValues = typesAndValues() or {}
+            normalizeType = self._normalizeType
+            typesAndValues = {
+                normalizeType(pasteboardType) : value
+                for pasteboardType, value in typesAndValues.items()
+            }
+            self._resolved[itemKey] = typesAndValues
+        return typesAndValues
+
+    def getValue(self, itemKey, pasteboardType, default=None):
+        """
+        Return the value of **pasteboardType** for the item
+        with **itemKey** or **default** if there is none.
+        """
+        typesAndValues = self.getTypesAndValues(itemKey)
+        if typesAndValues is None:
+            return default
+        return typesAndValues.get(self._normalizeType(pasteboardType), default)
+
+
+def _identity(value):
+    return value
+
+
+class DragSessionRegistry(object):
+
+    """
+    The drag sessions of this application by identifier.
+
+    Sessions should be ended when the drag ends. In case one isn't,
+    only the last **maxSessions** sessions are kept.
+    """
+
+    def __init__(self, maxSessions=8, normalizeType=None):
+        self._sessions = collections.OrderedDict()
+        self._maxSessions = maxSessions
+        self._normalizeType = normalizeType
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def beginSession(self, identifier, source, items):
+        """
+        Register the items of the drag with **identifier**. See
+        `DragSession` for **source** and **items**.
+        """
+        session = DragSession(source, items, self._normalizeType)
+        self._sessions.pop(identifier, None)
+        self._sessions[identifier] = session
+        while len(self._sessions) > self._maxSessions:
+            self._sessions.popitem(last=False)
+        return session
+
+    def getSession(self, identifier):
+        """
+        Return the `DragSession` with **identifier** or `None`.
+        """
+        return self._sessions.get(identifier)
+
+    def endSession(self, identifier):
+        self._sessions.pop(identifier, None)
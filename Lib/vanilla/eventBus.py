@@ -0,0 +1,244 @@
+"""
+A small event bus used by `Window.bind` and `Popover.bind`.
+
+Callbacks are bound to an event name and called in order of
+priority, higher first, and then in the order they were bound.
+Binding returns a token that can be used to unbind the callback
+in constant time. Callbacks can be held weakly so that observers
+don't have to unbind themselves before they go away.
+
+Nothing in here depends on AppKit.
+"""
+
+import time
+import weakref
+
+
+class EventBinding(object):
+
+    """
+    The token returned by `EventBus.bind`. It can be given
+    to `EventBus.unbind` to remove the binding.
+    """
+
+    __slots__ = ("event", "priority", "_order", "_callback", "_handler", "_isWeak", "_bus", "__weakref__")
+
+    def __init__(self, bus, event, callback, priority, order, weak):
+        self.event = event
+        self.priority = priority
+        self._order = order
+        self._bus = weakref.ref(bus)
+        self._isWeak = weak
+        if weak:
+            selfRef = weakref.ref(self)
+
+            def callbackDied(ref):
+                binding = selfRef()
+                if binding is not None:
+                    binding.unbind()
+
+            if hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+                callback = weakref.WeakMethod(callback, callbackDied)
+            else:
+                callback = weakref.ref(callback, callbackDied)
+        self._callback = callback
+        self._handler = None
+
+    def getCallback(self):
+        """
+        Return the bound callback or `None` if it has been
+        garbage collected.
+        """
+        if self._isWeak:
+            return self._callback()
+        return self._callback
+
+    def isBound(self):
+        """
+        Return a bool indicating if the binding is still active.
+        """
+        bus = self._bus()
+        return bus is not None and bus._isBound(self)
+
+    def unbind(self):
+        """
+        Remove the binding from its bus.
+        """
+        bus = self._bus()
+        if bus is not None:
+            bus.unbind(self)
+
+    def _callCallback(self, sender):
+        callback = self.getCallback()
+        if callback is None:
+            return None
+        return callback(sender)
+
+
+class EventBus(object):
+
+    """
+    A registry of callbacks per event name.
+
+    **clock** A function returning the current time in seconds.
+    It is used to record the time spent dispatching each event.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._bindings = {}  # { event : { binding : None } }
+        self._dispatchOrder = {}  # { event : (binding, ...) }
+        self._dispatchStats = {}  # { event : [count, total time, max time] }
+        self._counter = 0
+
+    def bind(self, event, callback, priority=0, weak=False, wrapper=None):
+        """
+        Bind **callback** to **event** and return an `EventBinding`.
+
+        **priority** Callbacks with a higher priority are called first.
+
+        **weak** If `True` the bus only keeps a weak reference to the
+        callback and the binding is removed when the callback is
+        garbage collected. Bound methods are referenced with
+        `weakref.WeakMethod`.
+
+        **wrapper** An optional function that is given a callable
+        that calls the callback and returns the callable that the bus
+        should call instead. If the returned object has a `cancel`
+        method, it is called when the binding is removed.
+        """
+        self._counter += 1
+        binding = EventBinding(self, event, callback, priority, self._counter, weak)
+        if wrapper is not None:
+            binding._handler = wrapper(binding._callCallback)
+        elif weak:
+            binding._handler = binding._callCallback
+        else:
+            binding._handler = callback
+        bindings = self._bindings.get(event)
+        if bindings is None:
+            bindings = self._bindings[event] = {}
+        bindings[binding] = None
+        self._dispatchOrder.pop(event, None)
+        return binding
+
+    def unbind(self, binding):
+        """
+        Remove **binding**. Removing a binding that is
+        no longer bound does nothing.
+        """
+        bindings = self._bindings.get(binding.event)
+        if bindings is None or binding not in bindings:
+            return
+        del bindings[binding]
+        if not bindings:
+            del self._bindings[binding.event]
+        self._dispatchOrder.pop(binding.event, None)
+        cancel = getattr(binding._handler, "cancel", None)
+        if cancel is not None:
+            cancel()
+
+    def unbindCallback(self, event, callback):
+        """
+        Remove the first binding of **callback** to **event**.
+        This needs to search the bindings of the event,
+        unbinding with the token is faster.
+        """
+        for binding in self._bindings.get(event, ()):
+            if binding.getCallback() == callback:
+                self.unbind(binding)
+                return
+        raise ValueError("callback is not bound to %r" % (event,))
+
+    def _isBound(self, binding):
+        return binding in self._bindings.get(binding.event, ())
+
+    def getBindings(self, event):
+        """
+        Return the bindings for **event** in dispatch order.
+        """
+        order = self._dispatchOrder.get(event)
+        if order is None:
+            bindings = self._bindings.get(event)
+            if not bindings:
+                return ()
+            order = tuple(sorted(bindings, key=lambda binding: (-binding.priority, binding._order)))
+            self._dispatchOrder[event] = order
+        return order
+
+    def hasBindings(self, event):
+        """
+        Return a bool indicating if anything is bound to **event**.
+        """
+        return event in self._bindings
+
+    def post(self, event, sender, collectResults=False):
+        """
+        Call the callbacks bound to **event** with **sender**.
+
+        If **collectResults** is `True` a list of the values
+        returned by the callbacks, excluding `None`, is returned.
+        """
+        order = self.getBindings(event)
+        if not order:
+            return [] if collectResults else None
+        results = [] if collectResults else None
+        bindings = self._bindings[event]
+        clock = self._clock
+        start = clock()
+        try:
+            for binding in order:
+                # skip bindings removed by an earlier callback
+                if binding not in bindings:
+                    continue
+                value = binding._handler(sender)
+                if collectResults and value is not None:
+                    results.append(value)
+        finally:
+            duration = clock() - start
+            stats = self._dispatchStats.get(event)
+            if stats is None:
+                self._dispatchStats[event] = [1, duration, duration]
+            else:
+                stats[0] += 1
+                stats[1] += duration
+                if duration > stats[2]:
+                    stats[2] = duration
+        return results
+
+    def flush(self, event):
+        """
+        Deliver pending calls of wrapped callbacks bound to **event**.
+        Only wrappers with a `flush` method are affected.
+        """
+        for binding in self.getBindings(event):
+            flush = getattr(binding._handler, "flush", None)
+            if flush is not None:
+                flush()
+
+    def clear(self):
+        """
+        Remove all bindings.
+        """
+        for bindings in list(self._bindings.values()):
+            for binding in list(bindings):
+                self.unbind(binding)
+        self._bindings = {}
+        self._dispatchOrder = {}
+
+    def getDispatchStats(self):
+        """
+        Return a dictionary of the form
+        `{event : dict(count=int, totalTime=float, maxTime=float)}`
+        describing the time spent calling the callbacks of each event.
+        """
+        return {
+            event: dict(count=count, totalTime=totalTime, maxTime=maxTime)
+            for event, (count, totalTime, maxTime) in self._dispatchStats.items()
+        }
+
+    def resetDispatchStats(self):
+        """
+        Discard the recorded dispatch times.
+        """
+        self._dispatchStats = {}
@@ -0,0 +1,145 @@
+"""
+Coalescing of bursts of events into fewer callback calls.
+
+This is used by `Window.bind` to keep callbacks bound to events
+such as "resize" from running on every notification AppKit posts
+during a live resize. Nothing in here depends on AppKit: the clock
+and the function used to schedule delayed calls are given to the
+objects, so they can be tested with a fake clock.
+"""
+
+import time
+
+
+defaultFrameInterval = 1.0 / 60
+
+
+def normalizeCoalesceMode(coalesce):
+    """
+    Validate a *coalesce* value and return it. The options are:
+
+    +----------------+------------------------------------------------------------+
+    | *None*         | Call the callback for every event.                         |
+    +----------------+------------------------------------------------------------+
+    | *"frame"*      | Call the callback at most once per display frame. The last |
+    |                | event of a burst is always delivered.                      |
+    +----------------+------------------------------------------------------------+
+    | *"end"*        | Call the callback once, when the live resize ends. Events  |
+    |                | that happen outside of a live resize are delivered         |
+    |                | immediately.                                               |
+    +----------------+------------------------------------------------------------+
+    | a number       | Call the callback once the events have stopped for this    |
+    |                | many seconds.                                              |
+    +----------------+------------------------------------------------------------+
+    """
+    if coalesce is None or coalesce in ("frame", "end"):
+        return coalesce
+    if isinstance(coalesce, (int, float)) and not isinstance(coalesce, bool) and coalesce >= 0:
+        return float(coalesce)
+    raise ValueError("invalid coalesce value: %r" % (coalesce,))
+
+
+class CoalescedCallback(object):
+
+    """
+    A callable that forwards calls to **callback** according to **mode**.
+    Refer to `normalizeCoalesceMode` for the modes.
+
+    **scheduleCall** A function with the signature `scheduleCall(delay, function)`
+    that calls *function* without arguments after *delay* seconds.
+
+    **clock** A function returning the current time in seconds.
+
+    **inLiveResize** A function returning a bool indicating if a live resize
+    is in progress. Only used by the *"end"* mode.
+
+    **frameInterval** The duration of a display frame in seconds.
+    Only used by the *"frame"* mode.
+    """
+
+    def __init__(self, callback, mode, scheduleCall, clock=time.monotonic,
+            inLiveResize=None, frameInterval=defaultFrameInterval):
+        self.callback = callback
+        self.mode = normalizeCoalesceMode(mode)
+        self._scheduleCall = scheduleCall
+        self._clock = clock
+        self._inLiveResize = inLiveResize
+        self._frameInterval = frameInterval
+        self._pending = False
+        self._timerScheduled = False
+        self._pendingSender = None
+        self._lastCallTime = None
+        self._lastEventTime = None
+
+    def __call__(self, sender):
+        mode = self.mode
+        if mode is None:
+            return self._call(sender)
+        now = self._clock()
+        self._pendingSender = sender
+        self._lastEventTime = now
+        if mode == "end":
+            if self._inLiveResize is not None and self._inLiveResize():
+                self._pending = True
+            else:
+                self._call(sender)
+        elif mode == "frame":
+            if self._timerScheduled:
+                self._pending = True
+            elif self._lastCallTime is None or now - self._lastCallTime >= self._frameInterval:
+                self._call(sender)
+            else:
+                self._pending = True
+                self._schedule(self._lastCallTime + self._frameInterval - now)
+        else:
+            self._pending = True
+            if not self._timerScheduled:
+                self._schedule(mode)
+        return None
+
+    def _schedule(self, delay):
+        self._timerScheduled = True
+        self._scheduleCall(max(delay, 0), self._timerFired)
+
+    def _timerFired(self):
+        self._timerScheduled = False
+        if not self._pending or self.callback is None:
+            return
+        mode = self.mode
+        if isinstance(mode, float):
+            # debounce: wait until the events have
+            # stopped for the full delay.
+            remaining = self._lastEventTime + mode - self._clock()
+            if remaining > 0:
+                self._schedule(remaining)
+                return
+        self._call(self._pendingSender)
+
+    def _call(self, sender):
+        self._pending = False
+        self._pendingSender = None
+        self._lastCallTime = self._clock()
+        if self.callback is None:
+            return None
+        return self.callback(sender)
+
+    def isPending(self):
+        """
+        Return a bool indicating if a call is waiting to be delivered.
+        """
+        return self._pending
+
+    def flush(self):
+        """
+        Deliver the pending call, if there is one, now.
+        """
+        if self._pending:
+            self._call(self._pendingSender)
+
+    def cancel(self):
+        """
+        Drop the pending call and stop forwarding calls.
+        """
+        self._pending = False
+        self._pendingSender = None
+        self.callback = None
@@ -0,0 +1,289 @@
+"""
+Layout planning for `GridView`.
+
+The contents of a grid are turned into a plan before anything is
+done to the `NSGridView`: the cells to merge, and for every cell the
+placement, alignment and size to apply. The grid view applies the
+plan in one pass. Nothing in here depends on AppKit, the sizes of
+views are requested through functions that are only called when a
+cell needs them.
+
+`diffRows` works out how to change the rows of a grid into other rows
+and `editColumns` changes the cells of the rows like a column change.
+"""
+
+import bisect
+
+# the value of NSViewNoInstrinsicMetric
+noIntrinsicMetric = -1
+
+
+def mergeRanges(cellRows):
+    """
+    Return a list of *(rowIndex, start, length)* for the horizontal
+    ranges of cells to merge. A run of `None` cells is merged with the
+    cell before it. A run at the start of a row can't be merged with
+    anything and is ignored.
+    """
+    ranges = []
+    for rowIndex, cells in enumerate(cellRows):
+        start = None
+        length = 0
+        for columnIndex, cell in enumerate(cells):
+            if cell is None:
+                if start is not None:
+                    length += 1
+            else:
+                if length > 1:
+                    ranges.append((rowIndex, start, length))
+                start = columnIndex
+                length = 1
+        if length > 1:
+            ranges.append((rowIndex, start, length))
+    return ranges
+
+
+def planCell(cellData, getIntrinsicSize, getFittingSize, getColumnWidth, getRowHeight):
+    """
+    Return a dictionary with the keys *"columnPlacement"*, *"rowPlacement"*,
+    *"rowAlignment"*, *"width"* and *"height"* for a normalized cell.
+    `None` values are left to the grid.
+
+    Views without an intrinsic size get the size from the cell or the size
+    that fits them, falling back on the column width and row height, and
+    are placed at the top leading corner without alignment.
+
+    **getIntrinsicSize** and **getFittingSize** are functions returning
+    the size of the view. **getColumnWidth** and **getRowHeight** are
+    functions returning the size of the column and row of the cell.
+    They are only called when needed.
+    """
+    plan = dict(
+        columnPlacement=cellData.get("columnPlacement"),
+        rowPlacement=cellData.get("rowPlacement"),
+        rowAlignment=cellData.get("rowAlignment"),
+        width=cellData.get("width"),
+        height=cellData.get("height")
+    )
+    # the intrinsic size only matters if something is left to the defaults
+    if all(value is not None for value in plan.values()):
+        return plan
+    if tuple(getIntrinsicSize()) != (noIntrinsicMetric, noIntrinsicMetric):
+        return plan
+    if plan["width"] is None or plan["height"] is None:
+        fittingWidth, fittingHeight = getFittingSize()
+        if plan["width"] is None:
+            if fittingWidth > 0:
+                plan["width"] = fittingWidth
+            else:
+                plan["width"] = getColumnWidth()
+        if plan["height"] is None:
+            if fittingHeight > 0:
+                plan["height"] = fittingHeight
+            else:
+                plan["height"] = getRowHeight()
+    if plan["rowAlignment"] is None:
+        plan["rowAlignment"] = "none"
+    if plan["columnPlacement"] is None:
+        plan["columnPlacement"] = "leading"
+    if plan["rowPlacement"] is None:
+        plan["rowPlacement"] = "top"
+    return plan
+
+
+def planGrid(cellRows, getIntrinsicSize, getFittingSize, getColumnWidth, getRowHeight):
+    """
+    Plan the contents of a grid.
+
+    **cellRows** A list of lists of normalized cells: dictionaries
+    with a *"view"* key or `None`.
+
+    **getIntrinsicSize** and **getFittingSize** are functions taking a view.
+    **getColumnWidth** and **getRowHeight** are functions taking an index.
+
+    Returns a dictionary with the keys *"merges"*, as returned by
+    `mergeRanges`, and *"cells"*, a list of *(rowIndex, columnIndex, view, plan)*
+    with the plan returned by `planCell`.
+    """
+    cells = []
+    for rowIndex, row in enumerate(cellRows):
+        for columnIndex, cellData in enumerate(row):
+            if cellData is None:
+                continue
+            view = cellData["view"]
+            plan = planCell(
+                cellData,
+                getIntrinsicSize=lambda: getIntrinsicSize(view),
+                getFittingSize=lambda: getFittingSize(view),
+                getColumnWidth=lambda: getColumnWidth(columnIndex),
+                getRowHeight=lambda: getRowHeight(rowIndex)
+            )
+            cells.append((rowIndex, columnIndex, view, plan))
+    return dict(merges=mergeRanges(cellRows), cells=cells)
+
+
+def _longestIncreasingSubsequence(values):
+    # Return the indexes in values of a longest
+    # strictly increasing subsequence. O(n log n).
+    tails = []
+    tailIndexes = []
+    previous = [None] * len(values)
+    for index, value in enumerate(values):
+        position = bisect.bisect_left(tails, value)
+        if position == len(tails):
+            tails.append(value)
+            tailIndexes.append(index)
+        else:
+            tails[position] = value
+            tailIndexes[position] = index
+        if position:
+            previous[index] = tailIndexes[position - 1]
+    result = []
+    index = tailIndexes[-1] if tailIndexes else None
+    while index is not None:
+        result.append(index)
+        index = previous[index]
+    result.reverse()
+    return result
+
+
+class _CountingTree(object):
+
+    # A binary indexed tree of counts.
+
+    def __init__(self, size):
+        self._tree = [0] * (size + 1)
+
+    def add(self, index, value):
+        tree = self._tree
+        position = index + 1
+        while position < len(tree):
+            tree[position] += value
+            position += position & -position
+
+    def countBefore(self, index):
+        total = 0
+        tree = self._tree
+        position = index
+        while position > 0:
+            total += tree[position]
+            position -= position & -position
+        return total
+
+
+def diffRows(oldRows, newRows):
+    """
+    Return the operations that turn **oldRows** into **newRows**.
+
+    The rows are lists of *(key, contents)*. Rows with the same key are
+    the same row, keys must be unique and hashable. Rows with the same
+    key and different contents, compared with `==`, are updated.
+
+    The operations are tuples that must be applied in order:
+
+    * *("remove", index)*
+    * *("move", fromIndex, toIndex)* the row is taken out at *fromIndex*
+      and put back so that it ends up at *toIndex*.
+    * *("insert", index, key)*
+    * *("update", index, key)* with the index in **newRows**.
+
+    Rows are removed first, from the last to the first. The rows that
+    are kept and form the longest run already in the new order don't
+    move, so the number of moves is as small as possible. Then the new
+    rows are inserted from the first to the last. This takes
+    O(n log n) time.
+    """
+    newKeys = [key for key, contents in newRows]
+    newIndexes = {key: index for index, key in enumerate(newKeys)}
+    if len(newIndexes) != len(newKeys):
+        raise ValueError("Row keys must be unique.")
+    operations = []
+    # remove
+    current = []
+    oldContents = {}
+    for index in reversed(range(len(oldRows))):
+        key, contents = oldRows[index]
+        if key in newIndexes:
+            current.append(key)
+            oldContents[key] = contents
+        else:
+            operations.append(("remove", index))
+    current.reverse()
+    # move
+    target = [key for key in newKeys if key in oldContents]
+    stay = set(current[index] for index in _longestIncreasingSubsequence([newIndexes[key] for key in current]))
+    # Every row gets a sort key for its place before and after it moves:
+    # (position of the row that stays in front of it, distance to that row).
+    # A moved row ends up right after the row before it in the target, so
+    # the index of a row is the number of sort keys in use before its own.
+    currentPositions = {key: index for index, key in enumerate(current)}
+    sortKeys = {key: (currentPositions[key], 0) for key in current}
+    movedSortKeys = {}
+    anchor = -1
+    anchorIndex = -1
+    for targetIndex, key in enumerate(target):
+        if key in stay:
+            anchor = currentPositions[key]
+            anchorIndex = targetIndex
+        else:
+            movedSortKeys[key] = (anchor, targetIndex - anchorIndex)
+    ranks = {sortKey: rank for rank, sortKey in enumerate(sorted(set(sortKeys.values()) | set(movedSortKeys.values())))}
+    used = _CountingTree(len(ranks))
+    for sortKey in sortKeys.values():
+        used.add(ranks[sortKey], 1)
+    for key in target:
+        if key in stay:
+            continue
+        rank = ranks[sortKeys[key]]
+        fromIndex = used.countBefore(rank)
+        used.add(rank, -1)
+        rank = ranks[movedSortKeys[key]]
+        toIndex = used.countBefore(rank)
+        used.add(rank, 1)
+        if fromIndex != toIndex:
+            operations.append(("move", fromIndex, toIndex))
+    # insert
+    for index, key in enumerate(newKeys):
+        if key not in oldContents:
+            operations.append(("insert", index, key))
+    # update
+    for index, (key, contents) in enumerate(newRows):
+        if key in oldContents and oldContents[key] != contents:
+            operations.append(("update", index, key))
+    return operations
+
+
+def editColumns(cellRows, operation):
+    """
+    Return **cellRows**, a list with the cells of every row, after the
+    column **operation**, like the `NSGridView` column methods do it:
+
+    * *("insert", index, cells)* with the new cell of every row.
+      Rows without a cell in **cells** get `None`.
+    * *("remove", index)*
+    * *("move", fromIndex, toIndex)*
+
+    Rows that are too short for an index are filled up with `None`.
+    The rows are returned as tuples.
+    """
+    kind = operation[0]
+    result = []
+    for rowIndex, cells in enumerate(cellRows):
+        cells = list(cells)
+        if kind == "insert":
+            index, columnCells = operation[1:]
+            cell = columnCells[rowIndex] if rowIndex < len(columnCells) else None
+            cells.extend([None] * (index - len(cells)))
+            cells.insert(index, cell)
+        elif kind == "remove":
+            index = operation[1]
+            if index < len(cells):
+                del cells[index]
+        elif kind == "move":
+            fromIndex, toIndex = operation[1:]
+            cells.extend([None] * (max(fromIndex, toIndex) + 1 - len(cells)))
+            cells.insert(toIndex, cells.pop(fromIndex))
+        else:
+            raise ValueError("Unknown column operation: %r" % kind)
+        result.append(tuple(cells))
+    return result
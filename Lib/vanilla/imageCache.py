@@ -0,0 +1,244 @@
+"""
+A process-wide cache of images loaded from files.
+
+Every vanilla API that takes an *imagePath* gets its image from
+`imageFromPath`, so the same file is only read and decoded once no
+matter how many controls show it. Entries are keyed by the path, the
+modification time and the size of the file, so an edited file is
+loaded again. The least recently used entries are evicted when the
+cache holds more than its maximum number of images or bytes.
+
+Shared images must not be modified, use `imageFromPath(path).copy()`
+when a modified version is needed.
+
+The policy lives in `ImageCache`, which doesn't depend on AppKit:
+the function that loads an image and the function that estimates
+its memory cost are given to it.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+defaultMaxCount = 512
+defaultMaxBytes = 128 * 1024 * 1024
+
+
+def _fileSizeCost(image, fileSize):
+    return fileSize
+
+
+class ImageCache(object):
+
+    """
+    A least recently used cache of images loaded from files.
+
+    **loader** A function that is given a path and returns an image or `None`.
+
+    **maxCount** The maximum number of images kept, or `None` for no limit.
+
+    **maxBytes** The maximum total cost of the images kept, or `None` for no limit.
+
+    **cost** A function that is given an image and the size of its file in bytes
+    and returns the number of bytes the image is estimated to use.
+    The default is the size of the file.
+
+    **stat** A function that is given a path and returns an object with
+    `st_mtime` and `st_size` attributes. The default is `os.stat`.
+    """
+
+    def __init__(self, loader, maxCount=defaultMaxCount, maxBytes=defaultMaxBytes, cost=_fileSizeCost, stat=os.stat):
+        self._loader = loader
+        self._cost = cost
+        self._stat = stat
+        self._maxCount = maxCount
+        self._maxBytes = maxBytes
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()  # { (path, mtime, size) : (image, cost) }
+        self._pathKeys = {}  # { path : key }
+        self._totalBytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._failures = 0
+
+    def _makeKey(self, path):
+        try:
+            info = self._stat(path)
+        except OSError:
+            return None
+        return (path, info.st_mtime, info.st_size)
+
+    def get(self, path):
+        """
+        Return the image for the file at **path**, loading it if needed.
+        `None` is returned if the file can't be read.
+        """
+        path = os.fspath(path)
+        key = self._makeKey(path)
+        if key is None:
+            with self._lock:
+                self._failures += 1
+                self._removePath(path)
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+        # load outside of the lock so that other
+        # threads can use the cache in the meantime
+        image = self._loader(path)
+        if image is None:
+            with self._lock:
+                self._failures += 1
+            return None
+        cost = self._cost(image, key[2])
+        with self._lock:
+            # an older version of the file
+            self._removePath(path)
+            self._entries[key] = (image, cost)
+            self._pathKeys[path] = key
+            self._totalBytes += cost
+            self._evict()
+        return image
+
+    def __contains__(self, path):
+        key = self._makeKey(os.fspath(path))
+        with self._lock:
+            return key in self._entries
+
+    def _removePath(self, path):
+        key = self._pathKeys.pop(path, None)
+        if key is None:
+            return
+        image, cost = self._entries.pop(key)
+        self._totalBytes -= cost
+
+    def _evict(self):
+        entries = self._entries
+        maxCount = self._maxCount
+        maxBytes = self._maxBytes
+        # always keep the most recent entry, even if it is over budget
+        while len(entries) > 1 and (
+                (maxCount is not None and len(entries) > maxCount)
+                or (maxBytes is not None and self._totalBytes > maxBytes)
+            ):
+            key, (image, cost) = entries.popitem(last=False)
+            del self._pathKeys[key[0]]
+            self._totalBytes -= cost
+            self._evictions += 1
+
+    def invalidate(self, path=None):
+        """
+        Remove the image for **path** from the cache.
+        If **path** is `None` all images are removed.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._pathKeys.clear()
+                self._totalBytes = 0
+            else:
+                self._removePath(os.fspath(path))
+
+    def setLimits(self, maxCount=defaultMaxCount, maxBytes=defaultMaxBytes):
+        """
+        Change the maximum number of images and bytes kept.
+        `None` means no limit.
+        """
+        with self._lock:
+            self._maxCount = maxCount
+            self._maxBytes = maxBytes
+            self._evict()
+
+    def getStats(self):
+        """
+        Return a dictionary with the keys `hits`, `misses`, `evictions`,
+        `failures`, `count`, `bytes`, `maxCount` and `maxBytes`.
+        """
+        with self._lock:
+            return dict(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                failures=self._failures,
+                count=len(self._entries),
+                bytes=self._totalBytes,
+                maxCount=self._maxCount,
+                maxBytes=self._maxBytes
+            )
+
+    def resetStats(self):
+        """
+        Set the hit, miss, eviction and failure counts to zero.
+        """
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._failures = 0
+
+
+# ------------
+# Shared cache
+# ------------
+
+def _loadImage(path):
+    from AppKit import NSImage
+    return NSImage.alloc().initWithContentsOfFile_(path)
+
+
+def _decodedImageCost(image, fileSize):
+    # estimate the decoded size from the bitmap representations,
+    # vector images are counted with the size of their file
+    cost = 0
+    for representation in image.representations():
+        width = representation.pixelsWide()
+        height = representation.pixelsHigh()
+        if width > 0 and height > 0:
+            cost += width * height * 4
+    return max(cost, fileSize)
+
+
+_sharedImageCache = None
+_sharedImageCacheLock = threading.Lock()
+
+
+def getSharedImageCache():
+    """
+    Return the `ImageCache` used by vanilla.
+    """
+    global _sharedImageCache
+    if _sharedImageCache is None:
+        with _sharedImageCacheLock:
+            if _sharedImageCache is None:
+                _sharedImageCache = ImageCache(_loadImage, cost=_decodedImageCost)
+    return _sharedImageCache
+
+
+def imageFromPath(path):
+    """
+    Return the shared `NSImage` for the file at **path**
+    or `None` if the file can't be read.
+    """
+    return getSharedImageCache().get(path)
+
+
+def invalidateImageCache(path=None):
+    """
+    Remove the image for **path** from the shared cache.
+    If **path** is `None` all images are removed.
+    """
+    getSharedImageCache().invalidate(path)
+
+
+def getImageCacheStats():
+    """
+    Return the statistics of the shared cache.
+    Refer to `ImageCache.getStats` for the keys.
+    """
+    return getSharedImageCache().getStats()
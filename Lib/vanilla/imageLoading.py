@@ -0,0 +1,222 @@
+"""
+Loading images off the main thread.
+
+`AsyncImageLoader` decodes images in a pool of worker threads and
+hands the results back to the main thread. Each request belongs to
+an owner, usually a view. Starting a new request for an owner cancels
+the previous one, so a list cell that is reused for another row before
+its image is ready never shows the image of the old row.
+
+The loader doesn't depend on AppKit: the function that decodes an
+image, the function that runs code on the main thread and the
+executor are given to it.
+"""
+
+import threading
+import weakref
+
+
+defaultMaxConcurrent = 4
+
+
+class ImageLoadRequest(object):
+
+    """
+    A pending image load. It is returned by `AsyncImageLoader.load`.
+    """
+
+    __slots__ = ("path", "_callback", "_decode", "_cancelled", "_done", "_future")
+
+    def __init__(self, path, callback, decode):
+        self.path = path
+        self._callback = callback
+        self._decode = decode
+        self._cancelled = False
+        self._done = False
+        self._future = None
+
+    def cancel(self):
+        """
+        Cancel the request. The callback will not be called.
+        """
+        self._cancelled = True
+        self._callback = None
+        future = self._future
+        if future is not None:
+            future.cancel()
+
+    def isCancelled(self):
+        return self._cancelled
+
+    def isDone(self):
+        """
+        Return a bool indicating if the callback has been called.
+        """
+        return self._done
+
+
+class AsyncImageLoader(object):
+
+    """
+    Decode images in worker threads.
+
+    **decode** A function that is given a path and returns an image
+    or `None`. It is called in a worker thread.
+
+    **callOnMainThread** A function that is given a function without
+    arguments and calls it on the main thread.
+
+    **maxConcurrent** The maximum number of images decoded at the same time.
+
+    **executorFactory** A function that is given **maxConcurrent** and returns
+    an object with a `submit(function, *args)` method that returns a future
+    and a `shutdown(wait)` method. The default creates a
+    `concurrent.futures.ThreadPoolExecutor`.
+    """
+
+    def __init__(self, decode, callOnMainThread, maxConcurrent=defaultMaxConcurrent, executorFactory=None):
+        if executorFactory is None:
+            executorFactory = _makeThreadPoolExecutor
+        self._decode = decode
+        self._callOnMainThread = callOnMainThread
+        self._executorFactory = executorFactory
+        self._maxConcurrent = maxConcurrent
+        self._executor = None
+        self._lock = threading.Lock()
+        self._requests = weakref.WeakKeyDictionary()  # { owner : ImageLoadRequest }
+
+    def _getExecutor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._executorFactory(self._maxConcurrent)
+            return self._executor
+
+    def getMaxConcurrent(self):
+        return self._maxConcurrent
+
+    def setMaxConcurrent(self, maxConcurrent):
+        """
+        Change the maximum number of images decoded at the same time.
+        Requests that are already running are not interrupted.
+        """
+        if maxConcurrent < 1:
+            raise ValueError("maxConcurrent must be at least 1")
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+            self._maxConcurrent = maxConcurrent
+        if executor is not None:
+            executor.shutdown(False)
+
+    def load(self, owner, path, callback, decode=None):
+        """
+        Decode the image at **path** and call **callback** with
+        the image, or `None` if it could not be decoded, on the
+        main thread. A pending request of **owner** is cancelled.
+
+        **decode** A function replacing the decode function
+        of the loader for this request. Optional.
+        """
+        self.cancel(owner)
+        if decode is None:
+            decode = self._decode
+        request = ImageLoadRequest(path, callback, decode)
+        self._requests[owner] = request
+        request._future = self._getExecutor().submit(self._run, request)
+        return request
+
+    def cancel(self, owner):
+        """
+        Cancel the pending request of **owner**, if there is one.
+        """
+        request = self._requests.pop(owner, None)
+        if request is not None:
+            request.cancel()
+
+    def getPendingRequest(self, owner):
+        """
+        Return the pending request of **owner** or `None`.
+        """
+        request = self._requests.get(owner)
+        if request is None or request._done or request._cancelled:
+            return None
+        return request
+
+    def _run(self, request):
+        if request._cancelled:
+            return
+        try:
+            image = request._decode(request.path)
+        except Exception:
+            image = None
+        if request._cancelled:
+            return
+        self._callOnMainThread(lambda: self._deliver(request, image))
+
+    def _deliver(self, request, image):
+        # the request may have been cancelled while
+        # this was waiting for the main thread
+        callback = request._callback
+        if request._cancelled or callback is None:
+            return
+        request._done = True
+        request._callback = None
+        callback(image)
+
+
+def _makeThreadPoolExecutor(maxConcurrent):
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=maxConcurrent, thread_name_prefix="vanillaImageLoader")
+
+
+# -------------
+# Shared loader
+# -------------
+
+def _decodeImage(path):
+    import objc
+    from vanilla.imageCache import imageFromPath
+    with objc.autorelease_pool():
+        image = imageFromPath(path)
+        if image is not None:
+            # NSImage decodes lazily, asking for
+            # a CGImage does the work now
+            image.CGImageForProposedRect_context_hints_(None, None, None)
+    return image
+
+
+def _callOnMainThread(function):
+    from PyObjCTools.AppHelper import callAfter
+    callAfter(function)
+
+
+_sharedImageLoader = None
+_sharedImageLoaderLock = threading.Lock()
+
+
+def getSharedImageLoader():
+    """
+    Return the `AsyncImageLoader` used by vanilla.
+    """
+    global _sharedImageLoader
+    if _sharedImageLoader is None:
+        with _sharedImageLoaderLock:
+            if _sharedImageLoader is None:
+                _sharedImageLoader = AsyncImageLoader(_decodeImage, _callOnMainThread)
+    return _sharedImageLoader
+
+
+def cancelImageLoad(owner):
+    """
+    Cancel the pending request of **owner** in the shared loader.
+    """
+    if _sharedImageLoader is not None:
+        _sharedImageLoader.cancel(owner)
+
+
+def setMaxConcurrentImageLoads(maxConcurrent):
+    """
+    Set the maximum number of images decoded at the same time
+    by vanilla. The default is 4.
+    """
+    getSharedImageLoader().setMaxConcurrent(maxConcurrent)
@@ -0,0 +1,94 @@
+"""
+Collecting and restoring the layout state of nested views.
+
+`Window.getLayoutState` stores the state of every view below the
+window that has a `getLayoutState` method, such as `SplitView` and
+`List2`, under the path of attribute names leading to it. The states
+are plain lists, dictionaries, strings and numbers, so they can be
+written to JSON or a plist.
+
+Views are found by walking the attributes of the objects, including
+lists, tuples and dictionaries of views. Nothing in here depends on
+AppKit: the function deciding what is a view is given to the walker.
+"""
+
+
+def _iterContained(name, value, isView, depth):
+    if isView(value):
+        yield name, value
+    elif depth:
+        if isinstance(value, (list, tuple)):
+            items = enumerate(value)
+        elif isinstance(value, dict):
+            items = value.items()
+        else:
+            return
+        for key, item in items:
+            for child in _iterContained("%s.%s" % (name, key), item, isView, depth - 1):
+                yield child
+
+
+def _iterChildren(obj, isView):
+    attributes = getattr(obj, "__dict__", None)
+    if not attributes:
+        return
+    # public attributes first, so that views also
+    # referenced from private attributes get the public path
+    for name in sorted(attributes, key=lambda name: (name.startswith("_"), name)):
+        # containers are followed two levels deep to reach
+        # lists of view descriptions such as the SplitView panes
+        for child in _iterContained(name, attributes[name], isView, 2):
+            yield child
+
+
+def iterViewsWithPaths(root, isView):
+    """
+    Yield `(path, view)` for all views below **root**, depth first.
+    **isView** is a function returning a bool indicating if an object
+    is a view that should be visited. Every view is visited once.
+    """
+    visited = set([id(root)])
+    stack = [("", root)]
+    while stack:
+        path, obj = stack.pop()
+        if path:
+            yield path, obj
+        children = []
+        for name, child in _iterChildren(obj, isView):
+            if id(child) in visited:
+                continue
+            visited.add(id(child))
+            if path:
+                name = path + "." + name
+            children.append((name, child))
+        stack.extend(reversed(children))
+
+
+def collectLayoutStates(root, isView):
+    """
+    Return a dictionary of the form `{path : state}` with the layout
+    states of all views below **root** that have a `getLayoutState` method.
+    """
+    states = {}
+    for path, view in iterViewsWithPaths(root, isView):
+        getLayoutState = getattr(view, "getLayoutState", None)
+        if getLayoutState is not None:
+            states[path] = getLayoutState()
+    return states
+
+
+def applyLayoutStates(root, states, isView):
+    """
+    Give the states in **states**, as returned by `collectLayoutStates`,
+    to the views below **root** with the same paths. Paths that don't
+    exist anymore are ignored.
+    """
+    if not states:
+        return
+    for path, view in iterViewsWithPaths(root, isView):
+        state = states.get(path)
+        if state is None:
+            continue
+        setLayoutState = getattr(view, "setLayoutState", None)
+        if setLayoutState is not None:
+            setLayoutState(state)
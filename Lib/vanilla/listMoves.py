@@ -0,0 +1,66 @@
+"""
+Moving items in `List2`.
+
+`moveIndexes` works out the new order of the items in O(n) and
+`rowMoves` the row moves that show the same change in a table view.
+Nothing in here depends on AppKit.
+"""
+
+
+def moveIndexes(count, indexes, toIndex):
+    """
+    Return the order of **count** items after moving the items at
+    **indexes** so they are inserted before the item at **toIndex**,
+    an index from before the move. **toIndex** can be **count** to
+    move the items to the end.
+
+    The moved items and the other items keep their relative order.
+    The result is a list of the old indexes in their new order.
+    """
+    if not 0 <= toIndex <= count:
+        raise IndexError("toIndex out of range: %s" % toIndex)
+    moved = bytearray(count)
+    for index in indexes:
+        if not 0 <= index < count:
+            raise IndexError("index out of range: %s" % index)
+        moved[index] = 1
+    before = [index for index in range(toIndex) if not moved[index]]
+    movedIndexes = [index for index in range(count) if moved[index]]
+    after = [index for index in range(toIndex, count) if not moved[index]]
+    return before + movedIndexes + after
+
+
+def invertOrder(order):
+    """
+    Return a list with the new index of every old index in **order**,
+    as returned by `moveIndexes`.
+    """
+    newIndexes = [0] * len(order)
+    for newIndex, oldIndex in enumerate(order):
+        newIndexes[oldIndex] = newIndex
+    return newIndexes
+
+
+def rowMoves(indexes, toIndex):
+    """
+    Return a list of *(fromRow, toRow)* moves that, applied one after the
+    other like `NSTableView.moveRowAtIndex:toIndex:` does, give the same
+    order as `moveIndexes`.
+    """
+    moves = []
+    # rows above the target are taken out from below the
+    # previous ones, rows below it are put in after them
+    removedAbove = 0
+    insertedBelow = 0
+    for index in sorted(set(indexes)):
+        if index < toIndex:
+            fromRow = index - removedAbove
+            toRow = toIndex - 1
+            removedAbove += 1
+        else:
+            fromRow = index
+            toRow = toIndex + insertedBelow
+            insertedBelow += 1
+        if fromRow != toRow:
+            moves.append((fromRow, toRow))
+    return moves
@@ -1,5 +1,9 @@
+import time
+import threading
+import importlib
 import objc
 import weakref
+from vanilla.profiling import instrument
 
 
 class _VanillaMethods:
@@ -20,7 +24,16 @@ class _VanillaMethods:
             return None
 
 
+# The methods every subclass gets. Each subclass is given its own
+# copy, since the PyObjC class builder may turn the functions in the
+# namespace it is given into selectors.
+_vanillaMethodsNamespace = dict(_VanillaMethods.__dict__)
+
 _subclasses = {}
+_subclassCreationTimes = {}
+_subclassesLock = threading.Lock()
+
+@instrument()
 def getNSSubclass(classOrName=None):
     """
     Return a subclass of a given Objective-C class.
@@ -45,21 +58,119 @@ def getNSSubclass(classOrName=None):
         True
 
     """
-    subCls = None
     if isinstance(classOrName, str):
-        cls = objc.lookUpClass(classOrName)
         className = classOrName
+        subCls = _subclasses.get(className)
+        if subCls is not None:
+            return subCls
+        cls = objc.lookUpClass(classOrName)
     else:
         cls = classOrName
         className = cls.__name__
-    subCls = _subclasses.get(className)
-    if subCls is None:
-        vName = "V" + className
-        subCls = cls.__class__(vName, (cls,), _VanillaMethods.__dict__.copy())
-        _subclasses[className] = subCls
+        subCls = _subclasses.get(className)
+        if subCls is not None:
+            return subCls
+    with _subclassesLock:
+        # another thread may have created it in the meantime
+        subCls = _subclasses.get(className)
+        if subCls is None:
+            start = time.perf_counter()
+            vName = "V" + className
+            subCls = cls.__class__(vName, (cls,), dict(_vanillaMethodsNamespace))
+            _subclassCreationTimes[className] = time.perf_counter() - start
+            _subclasses[className] = subCls
     return subCls
 
 
+def getNSSubclassRegistry():
+    """
+    Return a dictionary describing the subclasses that have been
+    created by `getNSSubclass`. The keys are the names of the
+    Objective-C classes and the values are dictionaries with these keys:
+
+    +-------------------+--------------------------------------------------+
+    | *"subclass"*      | The subclass.                                    |
+    +-------------------+--------------------------------------------------+
+    | *"creationTime"*  | The time in seconds it took to create the class. |
+    +-------------------+--------------------------------------------------+
+    """
+    with _subclassesLock:
+        return {
+            className: dict(
+                subclass=subCls,
+                creationTime=_subclassCreationTimes.get(className, 0)
+            )
+            for className, subCls in _subclasses.items()
+        }
+
+
+def _isSubclassedClassAttribute(name, value):
+    # Only the ns*Class attributes that are subclassed
+    # with getNSSubclass: views, view controllers, popovers
+    # and tab view items. Windows, cells, array controllers
+    # and delegates are used as they are.
+    if not (name.startswith("ns") and name.endswith("Class")):
+        return False
+    if not isinstance(value, objc.objc_class):
+        return False
+    NSResponder = objc.lookUpClass("NSResponder")
+    NSWindow = objc.lookUpClass("NSWindow")
+    NSTabViewItem = objc.lookUpClass("NSTabViewItem")
+    if issubclass(value, NSWindow):
+        return False
+    return issubclass(value, NSResponder) or issubclass(value, NSTabViewItem)
+
+
+def _preload(objects, classes):
+    if objects is None:
+        vanilla = importlib.import_module("vanilla")
+        objects = list(vanilla.__all__)
+    for obj in objects:
+        if isinstance(obj, str):
+            vanilla = importlib.import_module("vanilla")
+            obj = getattr(vanilla, obj)
+        if not isinstance(obj, type):
+            continue
+        for cls in obj.__mro__:
+            for name, value in cls.__dict__.items():
+                if _isSubclassedClassAttribute(name, value):
+                    getNSSubclass(value)
+    if classes is not None:
+        for classOrName in classes:
+            getNSSubclass(classOrName)
+
+
+def preload(objects=None, classes=None, background=False):
+    """
+    Import vanilla objects and create the Objective-C subclasses
+    they use ahead of time, so that this doesn't happen when the
+    first window is built.
+
+    **objects** A list of vanilla object classes or names, such as
+    `["Window", "Button", vanilla.List2]`. The modules defining them are
+    imported and the subclasses of their `ns*Class` attributes are created.
+    If *None* is given, all vanilla objects are preloaded.
+
+    **classes** A list of additional Objective-C classes or
+    class names to create subclasses for. Optional.
+
+    **background** A boolean indicating if the work should happen in a
+    daemon thread. If *True*, the thread is started and returned.
+    This only creates classes, no instances, so it doesn't need to
+    happen on the main thread.
+    """
+    if background:
+        thread = threading.Thread(
+            target=_preload,
+            args=(objects, classes),
+            name="vanilla.preload",
+            daemon=True
+        )
+        thread.start()
+        return thread
+    _preload(objects, classes)
+
+
 def _doctest():
     """
         >>> from AppKit import NSTextView
@@ -98,6 +209,16 @@ def _doctest():
         True
         >>> hasattr(sc, 'vanillaWrapper')
         True
+        >>> # test the registry
+        >>> registry = getNSSubclassRegistry()
+        >>> registry['TestClass']['subclass'] is sc
+        True
+        >>> registry['TestClass']['creationTime'] >= 0
+        True
+        >>> # test preloading
+        >>> preload(classes=['NSSlider'])
+        >>> 'NSSlider' in getNSSubclassRegistry()
+        True
     """
 
 if __name__ == "__main__":
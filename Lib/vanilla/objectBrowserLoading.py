@@ -0,0 +1,182 @@
+"""
+Loading the children of `ObjectBrowser` items off the main thread.
+
+Reading an attribute can run arbitrary code: a property doing I/O, a
+proxy talking to a database. An `IntrospectionJob` reads the next page
+of children of a `ChildPager` in a worker thread. Every attribute gets
+a time limit. A child that takes longer gets a `TimedOutValue`
+and the remaining attributes are read by a new worker. A Python thread
+can't be stopped, so the worker that is stuck stays around until the
+attribute returns, but its result is ignored.
+
+Nothing in here depends on AppKit. The function that runs code on the
+main thread and the function that starts threads are given to the job.
+"""
+
+import threading
+import time
+
+from vanilla.objectBrowserModel import TimedOutValue
+
+
+defaultAttributeTimeout = 0.5
+
+
+def _startDaemonThread(function):
+    thread = threading.Thread(target=function, name="vanilla.ObjectBrowser introspection")
+    thread.daemon = True
+    thread.start()
+
+
+def _callDirectly(function):
+    function()
+
+
+class _Worker(object):
+
+    # Reads the children from start on. The state is
+    # guarded by the condition of the job.
+
+    def __init__(self, job, start):
+        self.job = job
+        self.position = start
+        self.startedAt = None
+        self.abandoned = False
+        self.done = False
+
+    def run(self):
+        job = self.job
+        names = job._names
+        for index in range(self.position, len(names)):
+            with job._condition:
+                if self.abandoned or job._cancelled:
+                    return
+                self.position = index
+                self.startedAt = job._clock()
+            child = job._pager.getChildValue(*names[index])
+            if child is not None and job._describeChild is not None:
+                child += (job._describeChild(child[1]),)
+            with job._condition:
+                if self.abandoned:
+                    return
+                job._results[index] = child
+                self.startedAt = None
+                job._condition.notify_all()
+        with job._condition:
+            self.done = True
+            job._condition.notify_all()
+
+
+class IntrospectionJob(object):
+
+    """
+    Read the next page of children of **pager**, a `ChildPager`.
+
+    **callback** Called with the list of *(name, value, setter)* of the page.
+
+    **describeChild** An optional function given the value of every
+    child. Its result is added to the child, which becomes *(name, value,
+    setter, description)*. It runs in the worker within the time limit of
+    the child, a child that timed out has `None` as description.
+
+    **progressCallback** Optional, called with the number of children
+    read and the number of children in the page while the page loads.
+
+    **attributeTimeout** The time in seconds a single child may take.
+
+    **callOnMainThread** A function that is given a function without
+    arguments and calls it on the main thread. The callbacks are called
+    through it. The default calls them in the worker thread.
+
+    **startThread** A function that is given a function without
+    arguments and calls it in a new thread.
+    """
+
+    progressInterval = 0.1
+
+    def __init__(self, pager, callback, progressCallback=None, attributeTimeout=defaultAttributeTimeout,
+            describeChild=None, callOnMainThread=None, startThread=None, clock=time.monotonic):
+        if callOnMainThread is None:
+            callOnMainThread = _callDirectly
+        if startThread is None:
+            startThread = _startDaemonThread
+        self._pager = pager
+        self._callback = callback
+        self._progressCallback = progressCallback
+        self._describeChild = describeChild
+        self._attributeTimeout = attributeTimeout
+        self._callOnMainThread = callOnMainThread
+        self._startThread = startThread
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._names = []
+        self._results = {}
+        self._cancelled = False
+        self._finished = threading.Event()
+        self.timedOut = []
+
+    def start(self):
+        self._startThread(self._run)
+        return self
+
+    def cancel(self):
+        """
+        Stop reading children. The callback will not be called.
+        """
+        with self._condition:
+            self._cancelled = True
+            self._condition.notify_all()
+
+    def isCancelled(self):
+        return self._cancelled
+
+    def wait(self, timeout=None):
+        """
+        Wait until the job is finished or cancelled.
+        Return `True` if it finished.
+        """
+        return self._finished.wait(timeout)
+
+    def _report(self, function, *args):
+        def call():
+            if not self._cancelled:
+                function(*args)
+        self._callOnMainThread(call)
+
+    def _run(self):
+        try:
+            self._names = self._pager.getNextNames()
+            count = len(self._names)
+            worker = _Worker(self, 0)
+            self._startThread(worker.run)
+            lastProgress = self._clock()
+            with self._condition:
+                while not worker.done and not self._cancelled:
+                    now = self._clock()
+                    if self._progressCallback is not None and now - lastProgress >= self.progressInterval:
+                        lastProgress = now
+                        self._report(self._progressCallback, len(self._results), count)
+                    wait = self.progressInterval
+                    if worker.startedAt is not None:
+                        remaining = worker.startedAt + self._attributeTimeout - now
+                        if remaining <= 0:
+                            # skip the child and carry on in a new worker
+                            worker.abandoned = True
+                            index = worker.position
+                            name = self._names[index][0]
+                            child = (name, TimedOutValue(name, self._attributeTimeout), None)
+                            if self._describeChild is not None:
+                                child += (None,)
+                            self._results[index] = child
+                            self.timedOut.append(name)
+                            worker = _Worker(self, index + 1)
+                            self._startThread(worker.run)
+                            continue
+                        wait = min(wait, remaining)
+                    self._condition.wait(wait)
+                if self._cancelled:
+                    return
+                children = [self._results[index] for index in range(count) if self._results.get(index) is not None]
+            self._report(self._callback, children)
+        finally:
+            self._finished.set()
@@ -0,0 +1,411 @@
+"""
+Child enumeration for `ObjectBrowser`.
+
+The children of an object are the items of a sequence, mapping or set
+and, for other objects, also the public attributes. They are loaded in
+pages so that expanding a huge object only looks at the first page.
+Sequences are read with `len()` and indexed access and mappings through
+their keys, so the objects are never copied. Iterators and generators
+are not iterated, since that would consume them.
+
+Nothing in here depends on AppKit.
+"""
+
+import collections.abc
+import inspect
+import itertools
+import json
+import os
+import re
+from operator import getitem, setitem
+
+defaultPageSize = 1000
+
+# objects of these types are not eligable for expansion in the outline view
+SIMPLE_TYPES = (str, int, float, complex)
+
+
+class ChildFilter(object):
+
+    """
+    Rules hiding children in the browser, compiled once and
+    applied to all names of an object at the same time.
+
+    **rules** A list of dictionaries, each hiding the children it matches:
+
+    * *dict(private=True)* hides attributes starting with an underscore.
+    * *dict(name=pattern)* hides attributes with a name matching the
+      regular expression *pattern*.
+    * *dict(names=names)* hides attributes with a name in the collection *names*.
+    * *dict(type=type)* hides children with a value that is an instance of
+      *type*, a class, a tuple of classes or the name of a class.
+
+    The name rules apply to attributes. Items of sequences, mappings
+    and sets are only hidden by the type rules.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+        self._hidePrivate = False
+        patterns = []
+        names = set()
+        types = []
+        typeNames = set()
+        for rule in self.rules:
+            if rule.get("private"):
+                self._hidePrivate = True
+            if "name" in rule:
+                patterns.append("(?:%s)" % rule["name"])
+            if "names" in rule:
+                names.update(rule["names"])
+            if "type" in rule:
+                ruleTypes = rule["type"]
+                if not isinstance(ruleTypes, tuple):
+                    ruleTypes = (ruleTypes,)
+                for ruleType in ruleTypes:
+                    if isinstance(ruleType, str):
+                        typeNames.add(ruleType)
+                    else:
+                        types.append(ruleType)
+        self._pattern = re.compile("|".join(patterns)) if patterns else None
+        self._names = frozenset(names)
+        self._types = tuple(types)
+        self._typeNames = frozenset(typeNames)
+
+    def filterNames(self, names):
+        """
+        Return the attribute names in **names** that are not hidden.
+        """
+        names = [name for name in names if isinstance(name, str)]
+        if self._hidePrivate:
+            names = [name for name in names if not name.startswith("_")]
+        if self._names:
+            hidden = self._names
+            names = [name for name in names if name not in hidden]
+        if self._pattern is not None:
+            search = self._pattern.search
+            names = [name for name in names if search(name) is None]
+        return names
+
+    def isShownValue(self, value):
+        """
+        Return `False` if **value** is hidden by a type rule.
+        """
+        if self._types and isinstance(value, self._types):
+            return False
+        if self._typeNames and type(value).__name__ in self._typeNames:
+            return False
+        return True
+
+
+def loadNameSet(computeNames, cachePath=None, cacheKey=None):
+    """
+    Return a frozenset of names computed by **computeNames**.
+
+    If **cachePath** is given the names are stored in that JSON file and
+    read from it next time, as long as **cacheKey** is the same. Use a key
+    that changes when the names can change, such as a version number.
+    """
+    if cachePath is not None:
+        try:
+            with open(cachePath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("key") == cacheKey:
+                return frozenset(data["names"])
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+    names = frozenset(computeNames())
+    if cachePath is not None:
+        try:
+            directory = os.path.dirname(cachePath)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporaryPath = cachePath + ".tmp"
+            with open(temporaryPath, "w", encoding="utf-8") as f:
+                json.dump(dict(key=cacheKey, names=sorted(names)), f)
+            os.replace(temporaryPath, cachePath)
+        except OSError:
+            pass
+    return names
+
+
+# the attributes of PyObjC itself are not interesting to browse
+defaultFilterRules = [
+    dict(private=True),
+    dict(name="^pyobjc_"),
+    dict(type="native_selector"),
+]
+
+
+class TimedOutValue(object):
+
+    """
+    The value of a child that took longer than the time limit.
+    """
+
+    __slots__ = ("name", "timeout")
+
+    def __init__(self, name, timeout):
+        self.name = name
+        self.timeout = timeout
+
+    def __repr__(self):
+        return "<timed out after %ss>" % self.timeout
+
+
+class _SequenceSegment(object):
+
+    def __init__(self, obj):
+        self._obj = obj
+
+    def getCount(self):
+        return len(self._obj)
+
+    def getNames(self, start, stop):
+        return [(index, getitem, setitem) for index in range(start, min(stop, self.getCount()))]
+
+
+class _MappingSegment(object):
+
+    # Small mappings are shown sorted. Sorting a big mapping
+    # means copying its keys, so those are shown in key order.
+    sortLimit = defaultPageSize
+
+    def __init__(self, obj):
+        self._obj = obj
+        self._sortedKeys = None
+        self._iterator = None
+        self._iteratorPosition = 0
+
+    def getCount(self):
+        return len(self._obj)
+
+    def _getKeys(self, start, stop):
+        if self.getCount() <= self.sortLimit:
+            if self._sortedKeys is None:
+                keys = list(self._obj.keys())
+                try:
+                    keys.sort()
+                except TypeError:
+                    pass
+                self._sortedKeys = keys
+            return self._sortedKeys[start:stop]
+        # pages are usually read in order, keep the
+        # iterator so the next page doesn't start over
+        if self._iterator is None or self._iteratorPosition > start:
+            self._iterator = iter(self._obj.keys())
+            self._iteratorPosition = 0
+        keys = list(itertools.islice(self._iterator, start - self._iteratorPosition, stop - self._iteratorPosition))
+        self._iteratorPosition = start + len(keys)
+        return keys
+
+    def getNames(self, start, stop):
+        return [(key, getitem, setitem) for key in self._getKeys(start, stop)]
+
+
+def _makeItemGetter(item):
+    def getter(obj, name):
+        return item
+    return getter
+
+
+class _SetSegment(object):
+
+    # Sets can't be indexed. The items are read through
+    # an iterator, named by their position.
+
+    def __init__(self, obj):
+        self._obj = obj
+
+    def getCount(self):
+        return len(self._obj)
+
+    def getNames(self, start, stop):
+        items = itertools.islice(iter(self._obj), start, stop)
+        return [(index, _makeItemGetter(item), None) for index, item in enumerate(items, start)]
+
+
+class _AttributeSegment(object):
+
+    def __init__(self, obj, childFilter):
+        self._obj = obj
+        self._childFilter = childFilter
+        self._names = None
+
+    def _getAttributeNames(self):
+        if self._names is None:
+            try:
+                names = dir(self._obj)
+            except Exception:
+                names = []
+            self._names = self._childFilter.filterNames(names)
+        return self._names
+
+    def getCount(self):
+        return len(self._getAttributeNames())
+
+    def getNames(self, start, stop):
+        return [(name, getattr, setattr) for name in self._getAttributeNames()[start:stop]]
+
+
+def _hasMethods(obj, *names):
+    cls = type(obj)
+    return all(hasattr(cls, name) for name in names)
+
+
+def getChildSegments(obj, childFilter):
+    """
+    Return the segments listing the children of **obj**.
+    **childFilter** is the `ChildFilter` for the attribute names.
+    """
+    if obj is None or isinstance(obj, (SIMPLE_TYPES, TimedOutValue)):
+        return []
+    if isinstance(obj, dict):
+        return [_MappingSegment(obj)]
+    if isinstance(obj, (list, tuple)):
+        return [_SequenceSegment(obj)]
+    if isinstance(obj, (set, frozenset)):
+        return [_SetSegment(obj)]
+    if isinstance(obj, property) or inspect.ismethod(obj) or inspect.isfunction(obj):
+        return []
+    segments = []
+    try:
+        if isinstance(obj, collections.abc.Mapping) or _hasMethods(obj, "keys", "__getitem__", "__len__"):
+            segments.append(_MappingSegment(obj))
+        elif isinstance(obj, collections.abc.Set):
+            segments.append(_SetSegment(obj))
+        elif _hasMethods(obj, "__getitem__", "__len__") and not isinstance(obj, type):
+            segments.append(_SequenceSegment(obj))
+    except Exception:
+        pass
+    segments.append(_AttributeSegment(obj, childFilter))
+    return segments
+
+
+class ChildPager(object):
+
+    """
+    The children of **obj**, loaded in pages of **pageSize**.
+
+    **childFilter** The `ChildFilter` hiding children. The default
+    uses `defaultFilterRules`.
+    """
+
+    def __init__(self, obj, pageSize=defaultPageSize, childFilter=None):
+        if childFilter is None:
+            childFilter = ChildFilter(defaultFilterRules)
+        self.object = obj
+        self.pageSize = pageSize
+        self.childFilter = childFilter
+        self._segments = getChildSegments(obj, childFilter)
+        self._segmentIndex = 0
+        self._segmentPosition = 0
+        self._count = None
+
+    def getCount(self):
+        """
+        Return the number of children, loaded or not. Attributes
+        that turn out to be hidden when loaded are included.
+        """
+        if self._count is None:
+            count = 0
+            for segment in self._segments:
+                try:
+                    count += segment.getCount()
+                except Exception:
+                    pass
+            self._count = count
+        return self._count
+
+    def hasMore(self):
+        """
+        Return `True` if there are children that are not loaded.
+        """
+        while self._segmentIndex < len(self._segments):
+            segment = self._segments[self._segmentIndex]
+            try:
+                count = segment.getCount()
+            except Exception:
+                count = 0
+            if self._segmentPosition < count:
+                return True
+            self._segmentIndex += 1
+            self._segmentPosition = 0
+        return False
+
+    def getNextNames(self):
+        """
+        Return the next page of children as a list of *(name, getter, setter)*
+        without getting their values. *getter* and *setter* are functions like
+        `getattr` and `setattr`, *setter* can be `None`.
+        """
+        names = []
+        while len(names) < self.pageSize and self.hasMore():
+            segment = self._segments[self._segmentIndex]
+            start = self._segmentPosition
+            stop = start + self.pageSize - len(names)
+            segmentNames = segment.getNames(start, stop)
+            if not segmentNames:
+                # the object changed size
+                self._segmentIndex += 1
+                self._segmentPosition = 0
+                continue
+            self._segmentPosition += len(segmentNames)
+            names.extend(segmentNames)
+        return names
+
+    def loadNextPage(self):
+        """
+        Return the next page of children as a list of
+        *(name, value, setter)*. Attributes that don't exist and
+        children hidden by the filter are left out.
+        """
+        children = [self.getChildValue(*names) for names in self.getNextNames()]
+        return [child for child in children if child is not None]
+
+    def getChildValue(self, name, getter, setter):
+        """
+        Return *(name, value, setter)* for a child or `None` if the child
+        should be left out. Exceptions other than `AttributeError` raised
+        by the getter are returned as the value, so the browser shows them.
+        """
+        try:
+            value = getter(self.object, name)
+        except AttributeError:
+            return None
+        except Exception as e:
+            value = e
+        if not self.childFilter.isShownValue(value):
+            return None
+        return name, value, setter
+
+
+def getArguments(obj):
+    """
+    Return all arguments for a method of function
+    and leave 'self' out.
+    """
+    try:
+        sig = inspect.signature(obj)
+        arguments = ", ".join(sig.parameters.keys())
+    except (TypeError, ValueError):
+        arguments = ""
+    return arguments.replace("self, ", "").replace("self", "")
+
+
+def describeValue(obj, childFilter=None):
+    """
+    Return *(expandable, arguments)* for **obj**: `True` if it has
+    children shown with **childFilter** and the arguments of a function,
+    method or class. Both can run code of the object, like `len()`.
+    """
+    # in PyObjC a python_selector has the function in callable
+    if type(obj).__name__ == "python_selector" and hasattr(obj, "callable"):
+        obj = obj.callable
+    expandable = ChildPager(obj, childFilter=childFilter).getCount() > 0
+    arguments = ""
+    if inspect.ismethod(obj) or inspect.isfunction(obj):
+        arguments = getArguments(obj)
+    elif inspect.isclass(obj) and hasattr(obj, "__init__"):
+        arguments = getArguments(getattr(obj, "__init__"))
+    return expandable, arguments
@@ -0,0 +1,216 @@
+"""
+Searching the objects shown in `ObjectBrowser`.
+
+`walkObjectGraph` visits the children of an object breadth first, the
+way the browser lists them, so the paths it yields can be revealed in
+the browser. Objects that were seen before are not visited again and
+the walk stops at a depth and a number of objects.
+
+`SearchIndex` collects names and values while the walk runs. Asking it
+for a query again only looks at the entries added since the last time.
+`SearchJob` runs a walk in a background thread and reports matches as
+they are found.
+
+Nothing in here depends on AppKit.
+"""
+
+import collections
+import threading
+
+from vanilla.objectBrowserModel import ChildPager, SIMPLE_TYPES
+
+
+defaultMaxDepth = 6
+defaultMaxNodes = 100000
+defaultMaxChildren = 5000
+
+
+def walkObjectGraph(root, childFilter=None, maxDepth=defaultMaxDepth, maxNodes=defaultMaxNodes, maxChildren=defaultMaxChildren, isCancelled=None):
+    """
+    Yield *(path, value)* for the objects below **root**, breadth first.
+    *path* is a tuple with the names of the children leading to the value.
+
+    **childFilter** The `ChildFilter` used to list the children.
+
+    **maxDepth** The maximum length of a path.
+
+    **maxNodes** The maximum number of values yielded.
+
+    **maxChildren** The maximum number of children read of a single object.
+
+    **isCancelled** An optional function returning `True` to stop the walk.
+    """
+    # the objects are kept so their ids can't be reused during the walk
+    seen = {id(root): root}
+    queue = collections.deque([((), root)])
+    count = 0
+    while queue:
+        path, obj = queue.popleft()
+        if len(path) >= maxDepth:
+            continue
+        pager = ChildPager(obj, pageSize=maxChildren, childFilter=childFilter)
+        for name, value, setter in pager.loadNextPage():
+            if isCancelled is not None and isCancelled():
+                return
+            childPath = path + (name,)
+            yield childPath, value
+            count += 1
+            if count >= maxNodes:
+                return
+            if value is None or isinstance(value, SIMPLE_TYPES):
+                continue
+            if id(value) in seen:
+                continue
+            seen[id(value)] = value
+            queue.append((childPath, value))
+
+
+def _getValueText(value):
+    if isinstance(value, SIMPLE_TYPES):
+        return str(value).lower()
+    return None
+
+
+class SearchIndex(object):
+
+    """
+    The names and simple values of the visited objects.
+
+    Entries are only added. The results of the last queries are kept
+    and extended with the entries added since, so repeating a query
+    while a walk is running costs only the new entries.
+    """
+
+    maxCachedQueries = 8
+
+    def __init__(self):
+        self._paths = []
+        self._names = []
+        self._values = []
+        self._queries = collections.OrderedDict()  # { query : (position, results) }
+
+    def __len__(self):
+        return len(self._paths)
+
+    def add(self, path, value):
+        self._paths.append(path)
+        self._names.append(str(path[-1]).lower() if path else "")
+        self._values.append(_getValueText(value))
+
+    def search(self, query, searchValues=True):
+        """
+        Return the paths with a name, or a value if **searchValues**
+        is `True`, containing **query**, ignoring case.
+        """
+        query = query.lower()
+        key = (query, searchValues)
+        position, results = self._queries.pop(key, (0, []))
+        names = self._names
+        values = self._values
+        paths = self._paths
+        for index in range(position, len(paths)):
+            if query in names[index]:
+                results.append(paths[index])
+            elif searchValues:
+                value = values[index]
+                if value is not None and query in value:
+                    results.append(paths[index])
+        self._queries[key] = (len(paths), results)
+        while len(self._queries) > self.maxCachedQueries:
+            self._queries.popitem(last=False)
+        return list(results)
+
+
+def _startDaemonThread(function):
+    thread = threading.Thread(target=function, name="vanilla.ObjectBrowser search")
+    thread.daemon = True
+    thread.start()
+
+
+def _callDirectly(function):
+    function()
+
+
+class SearchJob(object):
+
+    """
+    Walk the objects below **root** in a background thread and report
+    the paths matching **query**.
+
+    **callback** Called with a list of new matching paths. It is called
+    every **batchSize** visited objects if there are new matches and once
+    more with `finished=True` as keyword argument when the walk is done.
+
+    **callOnMainThread** A function that is given a function without
+    arguments and calls it on the main thread. The callback is called
+    through it. The default calls it in the worker thread.
+
+    The other arguments are passed to `walkObjectGraph`.
+    """
+
+    batchSize = 500
+
+    def __init__(self, root, query, callback, childFilter=None, maxDepth=defaultMaxDepth, maxNodes=defaultMaxNodes,
+            searchValues=True, callOnMainThread=None, startThread=None):
+        if callOnMainThread is None:
+            callOnMainThread = _callDirectly
+        if startThread is None:
+            startThread = _startDaemonThread
+        self.root = root
+        self.query = query
+        self.index = SearchIndex()
+        self._callback = callback
+        self._childFilter = childFilter
+        self._maxDepth = maxDepth
+        self._maxNodes = maxNodes
+        self._searchValues = searchValues
+        self._callOnMainThread = callOnMainThread
+        self._startThread = startThread
+        self._cancelled = False
+        self._finished = threading.Event()
+
+    def start(self):
+        self._startThread(self._run)
+        return self
+
+    def cancel(self):
+        """
+        Stop the walk. The callback will not be called anymore.
+        """
+        self._cancelled = True
+
+    def isCancelled(self):
+        return self._cancelled
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    def _report(self, paths, finished):
+        def call():
+            if not self._cancelled:
+                self._callback(paths, finished=finished)
+        self._callOnMainThread(call)
+
+    def _run(self):
+        try:
+            reported = 0
+            walker = walkObjectGraph(
+                self.root,
+                childFilter=self._childFilter,
+                maxDepth=self._maxDepth,
+                maxNodes=self._maxNodes,
+                isCancelled=self.isCancelled
+            )
+            for path, value in walker:
+                self.index.add(path, value)
+                if len(self.index) % self.batchSize == 0:
+                    results = self.index.search(self.query, self._searchValues)
+                    if len(results) > reported:
+                        self._report(results[reported:], False)
+                        reported = len(results)
+            if self._cancelled:
+                return
+            results = self.index.search(self.query, self._searchValues)
+            self._report(results[reported:], True)
+        finally:
+            self._finished.set()
@@ -0,0 +1,345 @@
+"""
+Opt-in instrumentation for the hot paths used while a vanilla UI is built.
+
+Nothing is recorded unless a profiler is active. A profiler can be
+activated with the `profile` context manager::
+
+    import vanilla
+
+    with vanilla.profile() as profiler:
+        MyWindowController()
+    print(profiler.formatTree())
+    profiler.writeChromeTrace("/tmp/vanilla-trace.json")
+
+or for a whole process by setting the `VANILLA_PROFILE` environment
+variable before vanilla is imported. If the value is a path ending with
+`.json`, a Chrome trace will be written to that path when the process
+exits. Any other non-empty value prints the call tree to stderr on exit.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import functools
+
+
+_activeProfiler = None
+
+
+class _NullMeasurement:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_nullMeasurement = _NullMeasurement()
+
+
+class _Measurement:
+
+    __slots__ = ("_profiler", "_name")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._profiler._enter(self._name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler._exit()
+        return False
+
+
+class _Node:
+
+    __slots__ = ("name", "count", "totalTime", "children")
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.totalTime = 0.0
+        self.children = {}
+
+    def child(self, name):
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = _Node(name)
+        return node
+
+    def ownTime(self):
+        return self.totalTime - sum(child.totalTime for child in self.children.values())
+
+
+class Profiler:
+
+    """
+    A recorder for the time spent in instrumented vanilla code.
+
+    **clock** A function returning the current time in seconds.
+    The default is `time.perf_counter`.
+
+    **maxEvents** The maximum number of individual events kept for
+    the Chrome trace export. The call tree is always complete.
+    """
+
+    def __init__(self, clock=time.perf_counter, maxEvents=1000000):
+        self._clock = clock
+        self._maxEvents = maxEvents
+        self._lock = threading.Lock()
+        self._roots = {} # { thread id : _Node }
+        self._stacks = {} # { thread id : [(node, start time), ...] }
+        self._events = []
+        self._origin = clock()
+
+    def _enter(self, name):
+        threadID = threading.get_ident()
+        stack = self._stacks.get(threadID)
+        if stack is None:
+            with self._lock:
+                self._roots[threadID] = _Node(None)
+                stack = self._stacks[threadID] = []
+        if stack:
+            parent = stack[-1][0]
+        else:
+            parent = self._roots[threadID]
+        stack.append((parent.child(name), self._clock()))
+
+    def _exit(self):
+        end = self._clock()
+        stack = self._stacks.get(threading.get_ident())
+        if not stack:
+            # the profiler was reset inside of a measurement
+            return
+        node, start = stack.pop()
+        duration = end - start
+        node.count += 1
+        node.totalTime += duration
+        if len(self._events) < self._maxEvents:
+            self._events.append((node.name, start, duration, threading.get_ident()))
+
+    def measure(self, name):
+        """
+        Return a context manager that records the time spent
+        in its block under **name**.
+        """
+        return _Measurement(self, name)
+
+    def reset(self):
+        """
+        Discard everything recorded so far.
+        """
+        with self._lock:
+            self._roots = {}
+            self._stacks = {}
+            self._events = []
+            self._origin = self._clock()
+
+    # Reporting
+
+    def getTotals(self):
+        """
+        Return a dictionary of the form `{name : (count, totalTime)}`
+        merged across all threads and call paths. Time spent in
+        recursive calls is only counted once.
+        """
+        totals = {}
+
+        def walk(node, active):
+            for child in node.children.values():
+                count, total = totals.get(child.name, (0, 0.0))
+                count += child.count
+                if child.name not in active:
+                    total += child.totalTime
+                totals[child.name] = (count, total)
+                walk(child, active | {child.name})
+
+        for root in list(self._roots.values()):
+            walk(root, frozenset())
+        return totals
+
+    def getTree(self):
+        """
+        Return the call tree as nested dictionaries. Each entry has
+        a `name`, `count`, `totalTime`, `ownTime` and `children` key.
+        There is one top level entry per thread that recorded something.
+        """
+        def convert(node):
+            return dict(
+                name=node.name,
+                count=node.count,
+                totalTime=node.totalTime,
+                ownTime=node.ownTime(),
+                children=[
+                    convert(child)
+                    for child in sorted(node.children.values(), key=lambda n: -n.totalTime)
+                ]
+            )
+
+        tree = []
+        for threadID, root in list(self._roots.items()):
+            children = [convert(child) for child in sorted(root.children.values(), key=lambda n: -n.totalTime)]
+            tree.append(dict(thread=threadID, children=children))
+        return tree
+
+    def formatTree(self, minTime=0.0):
+        """
+        Return the call tree as a string. Entries that took less
+        than **minTime** seconds in total are omitted.
+        """
+        lines = []
+
+        def write(entry, depth):
+            if entry["totalTime"] < minTime:
+                return
+            lines.append("%s%s  %d calls  %.3f ms total  %.3f ms own" % (
+                "  " * depth,
+                entry["name"],
+                entry["count"],
+                entry["totalTime"] * 1000,
+                entry["ownTime"] * 1000
+            ))
+            for child in entry["children"]:
+                write(child, depth + 1)
+
+        for thread in self.getTree():
+            lines.append("thread %s" % thread["thread"])
+            for entry in thread["children"]:
+                write(entry, 1)
+        return "\n".join(lines)
+
+    def getChromeTrace(self):
+        """
+        Return the recorded events in the Chrome trace event format.
+        The result can be loaded into `chrome://tracing` or Perfetto.
+        """
+        pid = os.getpid()
+        origin = self._origin
+        events = [
+            dict(
+                name=name,
+                cat="vanilla",
+                ph="X",
+                ts=(start - origin) * 1000000,
+                dur=duration * 1000000,
+                pid=pid,
+                tid=threadID
+            )
+            for name, start, duration, threadID in list(self._events)
+        ]
+        return dict(traceEvents=events, displayTimeUnit="ms")
+
+    def writeChromeTrace(self, path):
+        """
+        Write the recorded events to **path** in the Chrome trace event format.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.getChromeTrace(), f)
+
+
+# ---
+# API
+# ---
+
+def getActiveProfiler():
+    """
+    Return the active profiler or `None`.
+    """
+    return _activeProfiler
+
+
+def isProfiling():
+    """
+    Return a bool indicating if a profiler is active.
+    """
+    return _activeProfiler is not None
+
+
+class profile:
+
+    """
+    A context manager that activates a profiler for the duration
+    of its block and returns it.
+
+    **profiler** An existing `Profiler` to record into. Optional.
+    """
+
+    def __init__(self, profiler=None):
+        if profiler is None:
+            profiler = Profiler()
+        self.profiler = profiler
+        self._previous = None
+
+    def __enter__(self):
+        global _activeProfiler
+        self._previous = _activeProfiler
+        _activeProfiler = self.profiler
+        return self.profiler
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _activeProfiler
+        _activeProfiler = self._previous
+        self._previous = None
+        return False
+
+
+def measure(name):
+    """
+    Return a context manager that records the time spent in its
+    block under **name** if a profiler is active. This is meant
+    for places where `instrument` can't be used, such as the
+    Objective-C selector methods of `NSObject` subclasses.
+    """
+    profiler = _activeProfiler
+    if profiler is None:
+        return _nullMeasurement
+    return _Measurement(profiler, name)
+
+
+def instrument(name=None):
+    """
+    Decorate a function so that calls to it are recorded if a profiler
+    is active. **name** defaults to the qualified name of the function.
+    When no profiler is active the only cost is one global lookup.
+    """
+    def decorator(func):
+        label = name
+        if label is None:
+            label = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _activeProfiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            profiler._enter(label)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler._exit()
+
+        return wrapper
+    return decorator
+
+
+# -------------------
+# Environment Support
+# -------------------
+
+def _reportAtExit(profiler, destination):
+    if destination.lower().endswith(".json"):
+        profiler.writeChromeTrace(destination)
+    else:
+        sys.stderr.write(profiler.formatTree() + "\n")
+
+
+_environmentValue = os.environ.get("VANILLA_PROFILE", "")
+if _environmentValue and _environmentValue != "0":
+    _activeProfiler = Profiler()
+    atexit.register(_reportAtExit, _activeProfiler, _environmentValue)
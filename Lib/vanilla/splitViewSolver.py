@@ -0,0 +1,208 @@
+"""
+Pane size allocation for `SplitView`.
+
+These functions decide how the space of a split view is divided
+between its panes, both when the split view is first shown and when
+its size changes. They work on plain lists of numbers and don't depend
+on AppKit.
+
+Space is given to panes in tiers of decreasing priority. Within a tier
+it is spread evenly, except that panes stop growing at their maximum
+size and stop shrinking at their minimum size, the rest going to the
+other panes of the tier. Only panes that hit a limit are sorted, so
+the cost is linear in the number of panes when no limits are hit.
+"""
+
+import math
+
+
+def _fill(capacities, amount):
+    # Spread amount (>= 0) over capacities, a list of
+    # (index, capacity) with None meaning no limit, as
+    # evenly as possible. Returns {index: share} and the
+    # amount that didn't fit.
+    shares = {}
+    count = len(capacities)
+    if not count or amount <= 0:
+        return shares, amount
+    limited = []
+    unlimited = []
+    for index, capacity in capacities:
+        if capacity is None:
+            unlimited.append(index)
+        else:
+            limited.append((capacity, index))
+    remaining = amount
+    # only the panes with a capacity below the even share
+    # need special treatment. everything else gets the share.
+    share = remaining / count
+    if limited and min(limited)[0] < share:
+        limited.sort()
+        position = 0
+        while position < len(limited):
+            capacity, index = limited[position]
+            if capacity >= remaining / count:
+                break
+            shares[index] = capacity
+            remaining -= capacity
+            count -= 1
+            position += 1
+        limited = limited[position:]
+    if not count:
+        return shares, remaining
+    share = remaining / count
+    for capacity, index in limited:
+        shares[index] = share
+    for index in unlimited:
+        shares[index] = share
+    return shares, 0
+
+
+def _tiers(indexes, priorities):
+    if priorities is None:
+        return [indexes]
+    tiers = {}
+    for index in indexes:
+        tiers.setdefault(priorities[index] or 0, []).append(index)
+    return [tiers[priority] for priority in sorted(tiers, reverse=True)]
+
+
+def distributeSizeChange(sizes, change, minSizes, maxSizes, changeable, priorities=None, integral=False):
+    """
+    Spread **change** over the panes and return the new sizes.
+
+    **sizes** The current sizes of the panes.
+
+    **change** The amount of space to add, or remove if negative.
+
+    **minSizes** and **maxSizes** The limits of the panes. `None` means no limit.
+
+    **changeable** Booleans indicating which panes may change size.
+
+    **priorities** Numbers ordering the panes into tiers. The panes with the
+    highest priority absorb the change first, the next tier only gets what
+    didn't fit. `None` puts all panes in one tier.
+
+    **integral** If `True` the changed sizes are rounded to whole numbers and
+    the rounding remainder is given to the panes with the largest fractions,
+    so the total is not changed by the rounding.
+
+    If the limits can't absorb the whole change, the rest is spread evenly
+    over the changeable panes ignoring their limits, since the panes must
+    fill the split view. Sizes never go below zero.
+    """
+    newSizes = list(sizes)
+    indexes = [index for index, flag in enumerate(changeable) if flag]
+    if not indexes or not change:
+        return newSizes
+    growing = change > 0
+    remaining = abs(change)
+    for tier in _tiers(indexes, priorities):
+        capacities = []
+        for index in tier:
+            if growing:
+                maxSize = maxSizes[index]
+                capacity = None if maxSize is None else max(maxSize - newSizes[index], 0)
+            else:
+                minSize = minSizes[index] or 0
+                capacity = max(newSizes[index] - minSize, 0)
+            capacities.append((index, capacity))
+        shares, remaining = _fill(capacities, remaining)
+        for index, share in shares.items():
+            if growing:
+                newSizes[index] += share
+            else:
+                newSizes[index] -= share
+        if remaining <= 0:
+            break
+    if remaining > 0:
+        # the limits are exceeded
+        if growing:
+            share = remaining / len(indexes)
+            for index in indexes:
+                newSizes[index] += share
+        else:
+            capacities = [(index, newSizes[index]) for index in indexes]
+            shares, remaining = _fill(capacities, remaining)
+            for index, share in shares.items():
+                newSizes[index] -= share
+    if integral:
+        roundSizes(newSizes, indexes)
+    return newSizes
+
+
+def allocateInitialSizes(paneDescriptions, available, restoredSizes=None):
+    """
+    Return the initial sizes of the panes described by **paneDescriptions**
+    so that they fill **available**, the size of the split view minus its
+    dividers. The sizes are whole numbers.
+
+    The descriptions are dictionaries with the keys *"size"*, *"minSize"*,
+    *"maxSize"* and optionally *"fixedSize"* and *"priority"*. Panes with
+    a size keep it, a size of 0 hides the pane. The other panes start at
+    their minimum size and share the remaining space.
+
+    **restoredSizes** An optional list with a size or `None` for every
+    pane, such as sizes saved earlier. Panes start at their restored size.
+    Panes without a size in their description can still change size and
+    absorb the difference between the restored sizes and **available**.
+    """
+    count = len(paneDescriptions)
+    sizes = [0] * count
+    minSizes = [None] * count
+    maxSizes = [None] * count
+    changeable = [False] * count
+    priorities = [0] * count
+    for index, paneDescription in enumerate(paneDescriptions):
+        size = paneDescription.get("size")
+        minSize = paneDescription.get("minSize")
+        maxSize = paneDescription.get("maxSize")
+        priorities[index] = paneDescription.get("priority", 0)
+        restoredSize = None
+        if restoredSizes is not None:
+            restoredSize = restoredSizes[index]
+        if restoredSize is not None and size is None and not paneDescription.get("fixedSize"):
+            sizes[index] = restoredSize
+            minSizes[index] = minSize
+            maxSizes[index] = maxSize
+            changeable[index] = True
+        elif restoredSize is not None:
+            sizes[index] = restoredSize
+        elif size is not None:
+            sizes[index] = size
+        elif paneDescription.get("fixedSize"):
+            sizes[index] = minSize
+        else:
+            sizes[index] = minSize or 0
+            minSizes[index] = minSize
+            maxSizes[index] = maxSize
+            changeable[index] = True
+    remainder = available - sum(sizes)
+    sizes = distributeSizeChange(sizes, remainder, minSizes, maxSizes, changeable, priorities)
+    roundSizes(sizes, [index for index in range(count) if changeable[index]])
+    return sizes
+
+
+def roundSizes(sizes, indexes=None):
+    """
+    Round the sizes at **indexes**, all sizes if `None`, in place to
+    whole numbers while keeping their total as close to the original
+    total as possible. The units left over after rounding down are
+    given to the sizes with the largest fractions.
+    """
+    if indexes is None:
+        indexes = range(len(sizes))
+    total = 0
+    fractions = []
+    for index in indexes:
+        size = sizes[index]
+        total += size
+        floor = math.floor(size)
+        sizes[index] = floor
+        fractions.append((size - floor, index))
+    extra = int(round(total - sum(sizes[index] for index in indexes)))
+    if extra > 0:
+        fractions.sort(key=lambda item: -item[0])
+        for fraction, index in fractions[:extra]:
+            sizes[index] += 1
+    return sizes
@@ -0,0 +1,129 @@
+"""
+Layout planning for the views in a `HorizontalStackView` or
+`VerticalStackView`.
+
+A view description (width, height, orientation) is turned into the
+content hugging and compression resistance priorities of the view and
+a list of constraint descriptions. The stack view turns these into
+`NSLayoutConstraint` objects, so a batch of views can be planned in
+Python and all constraints activated in one call. Nothing in here
+depends on AppKit.
+
+Constraint descriptions are tuples of the form
+*(anchor, relation, otherAnchor, constant)*. *anchor* is the name of
+an anchor of the view: "left", "right", "top", "bottom", "width" or
+"height". *otherAnchor* is the name of an anchor of the stack view
+or `None` if the constraint is against *constant* alone. *relation*
+is one of "==", ">=" or "<=".
+"""
+
+# the values of NSLayoutPriorityRequired, NSLayoutPriorityDefaultLow
+# and NSViewNoInstrinsicMetric
+priorityRequired = 1000
+priorityLow = 250
+noIntrinsicMetric = -1
+
+horizontal = 0
+vertical = 1
+
+
+def normalizeSize(value, isMainAxis):
+    """
+    Resolve the size shortcuts of a view description.
+
+    - "fit" lets AppKit figure out the size.
+    - "fill" in the direction of the main axis means
+      "use a flexible space", so it is left to AppKit too.
+    """
+    if value == "fit":
+        return None
+    if value == "fill" and isMainAxis:
+        return None
+    return value
+
+
+def sizePriorities(value, hasIntrinsicSize=True):
+    """
+    Return the hugging and compression resistance priorities
+    for the normalized size **value**. **hasIntrinsicSize** is
+    only used when **value** is `None`.
+    """
+    hugging = priorityRequired
+    compression = priorityRequired
+    if value is None:
+        if not hasIntrinsicSize:
+            hugging = priorityLow
+            compression = priorityLow
+    elif isinstance(value, str):
+        if value == "fill":
+            hugging = priorityLow
+            compression = priorityLow
+        elif value.startswith(">="):
+            hugging = priorityLow
+        elif value.startswith("<="):
+            compression = priorityLow
+    return hugging, compression
+
+
+def parseSizeConstraints(value):
+    """
+    Return a list of *(relation, constant)* for a number or a string
+    using the size syntax, for example `"==100"` or `">=50, <=200"`.
+    """
+    if isinstance(value, (int, float)):
+        return [("==", value)]
+    constraints = []
+    for part in value.split(","):
+        part = part.strip()
+        relation = part[:2]
+        if relation not in ("==", ">=", "<="):
+            raise ValueError("Invalid size: %r" % value)
+        constraints.append((relation, float(part[2:])))
+    return constraints
+
+
+def _axisConstraints(value, dimension, leading, trailing, leadingInset, trailingInset):
+    if value is None:
+        return []
+    if value == "fill":
+        return [
+            (leading, "==", leading, leadingInset),
+            (trailing, "==", trailing, -trailingInset)
+        ]
+    return [(dimension, relation, None, constant) for relation, constant in parseSizeConstraints(value)]
+
+
+def planStackItem(width, height, orientation, edgeInsets=(0, 0, 0, 0), getIntrinsicSize=None):
+    """
+    Plan the layout of one view in a stack view.
+
+    **width** and **height** The sizes from the view description.
+
+    **orientation** 0 for a horizontal stack, 1 for a vertical stack.
+
+    **edgeInsets** The *(bottom, left, top, right)* edge insets of the
+    stack view, in the order returned by `NSStackView.edgeInsets()`.
+
+    **getIntrinsicSize** A function returning the *(width, height)*
+    intrinsic content size of the view. It is only called when a size
+    is left to AppKit.
+
+    Returns a dictionary with the keys *"widthPriorities"* and
+    *"heightPriorities"*, both *(hugging, compression)*, and
+    *"constraints"*, a list of constraint descriptions.
+    """
+    width = normalizeSize(width, orientation == horizontal)
+    height = normalizeSize(height, orientation == vertical)
+    intrinsicSize = None
+    if (width is None or height is None) and getIntrinsicSize is not None:
+        intrinsicSize = getIntrinsicSize()
+    hasIntrinsicWidth = intrinsicSize is None or intrinsicSize[0] != noIntrinsicMetric
+    hasIntrinsicHeight = intrinsicSize is None or intrinsicSize[1] != noIntrinsicMetric
+    bottomInset, leftInset, topInset, rightInset = edgeInsets
+    constraints = _axisConstraints(width, "width", "left", "right", leftInset, rightInset)
+    constraints += _axisConstraints(height, "height", "top", "bottom", topInset, bottomInset)
+    return dict(
+        widthPriorities=sizePriorities(width, hasIntrinsicWidth),
+        heightPriorities=sizePriorities(height, hasIntrinsicHeight),
+        constraints=constraints
+    )
@@ -0,0 +1,75 @@
+"""
+Measure the import time of vanilla with `python -X importtime`.
+
+Each scenario runs in a fresh interpreter. The reported time is the
+cumulative import time of the top level modules imported by the
+scenario, as reported by the interpreter, in milliseconds. The time
+needed to start an interpreter that imports nothing is subtracted.
+
+    python benchmarkImportTime.py [repeat]
+"""
+
+import sys
+import subprocess
+
+scenarios = [
+    ("import vanilla", "import vanilla"),
+    ("three widgets", "import vanilla; vanilla.Window; vanilla.Button; vanilla.TextBox"),
+    ("List2", "import vanilla; vanilla.List2"),
+    ("everything", "from vanilla import *"),
+]
+
+
+def measureImportTime(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+    total = 0
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative = int(parts[1])
+        except ValueError:
+            # header line
+            continue
+        name = parts[2].rstrip()
+        modules.append((cumulative, name.strip()))
+        # only top level imports are not indented
+        if not name.startswith("  "):
+            total += cumulative
+    return total / 1000, len(modules)
+
+
+def bestImportTime(code, repeat):
+    times = []
+    for i in range(repeat):
+        milliseconds, moduleCount = measureImportTime(code)
+        times.append(milliseconds)
+    return min(times), moduleCount
+
+
+def main(repeat=5):
+    startupTime, startupModuleCount = bestImportTime("pass", repeat)
+    for title, code in scenarios:
+        milliseconds, moduleCount = bestImportTime(code, repeat)
+        print("%-16s %8.1f ms (best of %d)  %4d modules" % (
+            title,
+            milliseconds - startupTime,
+            repeat,
+            moduleCount - startupModuleCount
+        ))
+
+
+if __name__ == "__main__":
+    repeat = 5
+    if len(sys.argv) > 1:
+        repeat = int(sys.argv[1])
+    main(repeat)
@@ -0,0 +1,60 @@
+"""
+Measure the Python memory used per vanilla wrapper with tracemalloc.
+
+Only allocations made by Python are counted, so the numbers show the
+cost of the wrapper state (instance, __dict__, slots, callback targets)
+and not the memory of the underlying Cocoa objects. Run this with two
+versions of vanilla to compare them.
+
+    python benchmarkWrapperMemory.py [count]
+"""
+
+import sys
+import gc
+import tracemalloc
+import vanilla
+
+
+def makeObjects():
+    return [
+        ("Group", lambda: vanilla.Group("auto")),
+        ("Button", lambda: vanilla.Button("auto", "Button")),
+        ("TextBox", lambda: vanilla.TextBox("auto", "TextBox")),
+        ("EditTextList2Cell", lambda: vanilla.EditTextList2Cell()),
+        ("SliderList2Cell", lambda: vanilla.SliderList2Cell()),
+        ("CheckBoxList2Cell", lambda: vanilla.CheckBoxList2Cell()),
+        ("PopUpButtonList2Cell", lambda: vanilla.PopUpButtonList2Cell()),
+        ("ImageList2Cell", lambda: vanilla.ImageList2Cell()),
+    ]
+
+
+def measure(factory, count, isCell=False):
+    # warm up so that classes and caches are not counted
+    factory()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for i in range(count)]
+    if isCell:
+        for obj in objects:
+            # this is done by List2 for every cell
+            obj._representedColumnRow = ("value", 0)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    gc.collect()
+    # subtract the list holding the objects
+    listSize = sys.getsizeof([None] * count)
+    return (after - before - listSize) / count
+
+
+def main(count=1000):
+    for name, factory in makeObjects():
+        print("%-22s %8.0f bytes per wrapper" % (name, measure(factory, count, name.endswith("List2Cell"))))
+
+
+if __name__ == "__main__":
+    count = 1000
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    main(count)
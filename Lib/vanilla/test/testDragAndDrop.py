@@ -80,6 +80,12 @@ class DraggingSourceNSView(AppKit.NSView):
         AppKit.NSColor.greenColor().set()
         AppKit.NSRectFill(rect)
 
+    def draggingSession_sourceOperationMaskForDraggingContext_(self, session, context):
+        return AppKit.NSDragOperationCopy
+
+    def draggingSession_endedAtPoint_operation_(self, session, point, operation):
+        vanilla.endDraggingSession(session)
+
     def mouseDown_(self, event):
         width, height = self.frame().size
         x = (width * 0.5)
@@ -465,7 +471,8 @@ class Test:
         items = info["items"]
         items = sender.getDropItemValues(
             items,
-            "string"
+            "string",
+            info["draggingInfo"]
         )
         location = info["location"]
         x, y = location
@@ -506,7 +513,8 @@ class Test:
         items = info["items"]
         items = sender.getDropItemValues(
             items,
-            "plist"
+            "plist",
+            info["draggingInfo"]
         )
         location = info["location"]
         x, y = location
@@ -620,7 +628,8 @@ class Test:
             )
         ]
         dragSettings = dict(
-            makeDragDataCallback=self.plistDestListMakeDragDataCallback
+            makeDragDataCallback=self.plistDestListMakeDragDataCallback,
+            pasteboardTypes=["plist"]
         )
         dropSettings = dict(
             pasteboardTypes=["plist"],
@@ -715,18 +724,13 @@ class Test:
         items = info["items"]
         # reorder
         if source == self.stringDestList:
-            indexes = sender.getDropItemValues(items, "dev.robotools.test.stringDestListIndexes")
-            # XXX this is wrong
-            items = list(self.stringDestList.get())
-            move = [items.pop(i) for i in indexes]
-            # insert
-            if index is not None:
-                items[index:index] = move
-            # append
-            else:
-                items += move
+            indexes = sender.getDropItemValues(items, "rowIndex")
+            if index is None:
+                index = len(self.stringDestList.get())
+            self.stringDestList.moveItems(indexes, index)
+            return True
         else:
-            items = sender.getDropItemValues(items, "string")
+            items = sender.getDropItemValues(items, "string", info["draggingInfo"])
             allItems = list(self.stringDestList.get())
             # insert
             if index is not None:
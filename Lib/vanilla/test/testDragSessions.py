@@ -0,0 +1,43 @@
+from vanilla.dragSessions import DragSession, DragSessionRegistry
+
+
+def testSessionValues():
+    made = []
+
+    def makeTypesAndValues():
+        made.append(True)
+        return dict(plist=dict(name="b"))
+
+    original = dict(name="a")
+    session = DragSession(
+        "source",
+        {"0": dict(plist=original), "1": makeTypesAndValues},
+        normalizeType=lambda pasteboardType: dict(plist="x.plist").get(pasteboardType, pasteboardType)
+    )
+    assert "0" in session
+    assert "2" not in session
+    # the values are not copied
+    assert session.getValue("0", "plist") is original
+    assert session.getValue("0", "x.plist") is original
+    assert session.getValue("0", "string") is None
+    assert session.getValue("2", "plist", "default") == "default"
+    # functions are called once when needed
+    assert made == []
+    assert session.getValue("1", "plist") == dict(name="b")
+    assert session.getValue("1", "plist") == dict(name="b")
+    assert made == [True]
+
+
+def testRegistry():
+    registry = DragSessionRegistry(maxSessions=2)
+    registry.beginSession(1, "a", {})
+    registry.beginSession(2, "b", {})
+    assert registry.getSession(1).source == "a"
+    registry.beginSession(3, "c", {})
+    # the oldest session is dropped
+    assert registry.getSession(1) is None
+    assert len(registry) == 2
+    registry.endSession(2)
+    registry.endSession(2)
+    assert registry.getSession(2) is None
+    assert registry.getSession(3).source == "c"
@@ -0,0 +1,135 @@
+import gc
+from vanilla.eventBus import EventBus
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Observer:
+
+    def __init__(self, received, name):
+        self.received = received
+        self.name = name
+
+    def callback(self, sender):
+        self.received.append(self.name)
+
+
+def testPriority():
+    bus = EventBus()
+    received = []
+    bus.bind("resize", lambda sender: received.append("a"))
+    bus.bind("resize", lambda sender: received.append("b"), priority=10)
+    bus.bind("resize", lambda sender: received.append("c"))
+    bus.bind("resize", lambda sender: received.append("d"), priority=-1)
+    bus.post("resize", None)
+    assert received == ["b", "a", "c", "d"]
+
+
+def testUnbind():
+    bus = EventBus()
+    received = []
+    tokens = [bus.bind("move", lambda sender, i=i: received.append(i)) for i in range(5)]
+    bus.unbind(tokens[2])
+    tokens[4].unbind()
+    # unbinding twice does nothing
+    bus.unbind(tokens[2])
+    assert not tokens[2].isBound()
+    assert tokens[0].isBound()
+    bus.post("move", None)
+    assert received == [0, 1, 3]
+    for token in tokens:
+        token.unbind()
+    assert not bus.hasBindings("move")
+
+
+def testUnbindCallback():
+    bus = EventBus()
+    received = []
+    observer = Observer(received, "observer")
+    bus.bind("close", observer.callback)
+    bus.unbindCallback("close", observer.callback)
+    bus.post("close", None)
+    assert received == []
+
+
+def testUnbindDuringDispatch():
+    bus = EventBus()
+    received = []
+    tokens = []
+
+    def first(sender):
+        received.append("first")
+        tokens[1].unbind()
+
+    tokens.append(bus.bind("close", first))
+    tokens.append(bus.bind("close", lambda sender: received.append("second")))
+    bus.post("close", None)
+    assert received == ["first"]
+
+
+def testWeak():
+    bus = EventBus()
+    received = []
+    observer = Observer(received, "observer")
+    token = bus.bind("resize", observer.callback, weak=True)
+    bus.post("resize", None)
+    assert received == ["observer"]
+    del observer
+    gc.collect()
+    assert not token.isBound()
+    bus.post("resize", None)
+    assert received == ["observer"]
+
+
+def testCollectResults():
+    bus = EventBus()
+    bus.bind("should close", lambda sender: None)
+    bus.bind("should close", lambda sender: False)
+    assert bus.post("should close", None, collectResults=True) == [False]
+    assert bus.post("nothing", None, collectResults=True) == []
+
+
+def testWrapper():
+    bus = EventBus()
+    received = []
+    cancelled = []
+
+    class Wrapper:
+
+        def __init__(self, callback):
+            self.callback = callback
+
+        def __call__(self, sender):
+            return self.callback(sender * 2)
+
+        def cancel(self):
+            cancelled.append(True)
+
+    token = bus.bind("resize", received.append, wrapper=Wrapper)
+    bus.post("resize", 2)
+    assert received == [4]
+    token.unbind()
+    assert cancelled == [True]
+
+
+def testDispatchStats():
+    clock = FakeClock()
+    bus = EventBus(clock=clock)
+
+    def slow(sender):
+        clock.now += sender
+
+    bus.bind("resize", slow)
+    bus.post("resize", 1)
+    bus.post("resize", 3)
+    stats = bus.getDispatchStats()
+    assert stats == {"resize": dict(count=2, totalTime=4, maxTime=3)}
+    bus.resetDispatchStats()
+    assert bus.getDispatchStats() == {}
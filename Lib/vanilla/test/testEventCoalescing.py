@@ -0,0 +1,109 @@
+import pytest
+from vanilla.eventCoalescing import CoalescedCallback, normalizeCoalesceMode
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeScheduler:
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+
+    def __call__(self, delay, function):
+        self.calls.append((self.clock.now + delay, function))
+
+    def advance(self, seconds):
+        self.clock.now += seconds
+        while True:
+            due = [call for call in self.calls if call[0] <= self.clock.now]
+            if not due:
+                break
+            for call in due:
+                self.calls.remove(call)
+                call[1]()
+
+
+def makeCoalescedCallback(mode, inLiveResize=None):
+    clock = FakeClock()
+    scheduler = FakeScheduler(clock)
+    received = []
+    coalesced = CoalescedCallback(
+        received.append,
+        mode,
+        scheduleCall=scheduler,
+        clock=clock,
+        inLiveResize=inLiveResize,
+        frameInterval=0.1
+    )
+    return coalesced, scheduler, received
+
+
+def testNormalize():
+    assert normalizeCoalesceMode(None) is None
+    assert normalizeCoalesceMode("frame") == "frame"
+    assert normalizeCoalesceMode("end") == "end"
+    assert normalizeCoalesceMode(1) == 1.0
+    for value in ("foo", -1, True):
+        with pytest.raises(ValueError):
+            normalizeCoalesceMode(value)
+
+
+def testFrame():
+    coalesced, scheduler, received = makeCoalescedCallback("frame")
+    coalesced(1)
+    assert received == [1]
+    # events inside of the frame are collapsed
+    # into one trailing call
+    for sender in (2, 3, 4):
+        scheduler.advance(0.01)
+        coalesced(sender)
+    assert received == [1]
+    assert coalesced.isPending()
+    scheduler.advance(0.1)
+    assert received == [1, 4]
+    assert not coalesced.isPending()
+    # nothing happens without new events
+    scheduler.advance(1)
+    assert received == [1, 4]
+
+
+def testDebounce():
+    coalesced, scheduler, received = makeCoalescedCallback(0.5)
+    for sender in range(5):
+        coalesced(sender)
+        scheduler.advance(0.2)
+    assert received == []
+    scheduler.advance(0.3)
+    assert received == [4]
+
+
+def testEnd():
+    liveResize = [True]
+    coalesced, scheduler, received = makeCoalescedCallback("end", inLiveResize=lambda: liveResize[0])
+    for sender in range(5):
+        coalesced(sender)
+    assert received == []
+    liveResize[0] = False
+    coalesced.flush()
+    assert received == [4]
+    # outside of a live resize events are delivered immediately
+    coalesced(5)
+    assert received == [4, 5]
+
+
+def testCancel():
+    coalesced, scheduler, received = makeCoalescedCallback(0.5)
+    coalesced(1)
+    coalesced.cancel()
+    scheduler.advance(1)
+    coalesced(2)
+    scheduler.advance(1)
+    assert received == []
@@ -0,0 +1,176 @@
+from vanilla.gridViewLayout import mergeRanges, planCell, planGrid, diffRows, editColumns, noIntrinsicMetric, _longestIncreasingSubsequence
+
+
+def testMergeRanges():
+    a = dict(view="a")
+    rows = [
+        [a, a, a],
+        [a, None, None],
+        [None, a, None],
+        [a, None, a, None],
+        [None, None, a],
+    ]
+    assert mergeRanges(rows) == [
+        (1, 0, 3),
+        (2, 1, 2),
+        (3, 0, 2),
+        (3, 2, 2),
+    ]
+
+
+def fail():
+    raise AssertionError("should not be called")
+
+
+def testPlanCellIntrinsic():
+    plan = planCell(dict(view="a", width=10), lambda: (20, 20), fail, fail, fail)
+    assert plan == dict(columnPlacement=None, rowPlacement=None, rowAlignment=None, width=10, height=None)
+
+
+def testPlanCellComplete():
+    cellData = dict(
+        view="a",
+        width=10,
+        height=20,
+        columnPlacement="fill",
+        rowPlacement="fill",
+        rowAlignment="none"
+    )
+    # nothing is measured when everything is given
+    plan = planCell(cellData, fail, fail, fail, fail)
+    assert plan["width"] == 10
+    assert plan["columnPlacement"] == "fill"
+
+
+def testPlanCellNoIntrinsicSize():
+    noSize = lambda: (noIntrinsicMetric, noIntrinsicMetric)
+    plan = planCell(dict(view="a"), noSize, lambda: (30, 0), fail, lambda: 40)
+    assert plan == dict(columnPlacement="leading", rowPlacement="top", rowAlignment="none", width=30, height=40)
+    plan = planCell(dict(view="a", width=5, height=6), noSize, fail, fail, fail)
+    assert plan["width"] == 5
+    assert plan["rowAlignment"] == "none"
+
+
+def testPlanGrid():
+    measured = []
+
+    def getIntrinsicSize(view):
+        measured.append(view)
+        if view == "custom":
+            return (noIntrinsicMetric, noIntrinsicMetric)
+        return (10, 10)
+
+    rows = [
+        [dict(view="a"), dict(view="custom")],
+        [dict(view="b", width=1, height=2, columnPlacement="fill", rowPlacement="top", rowAlignment="none"), None],
+    ]
+    plan = planGrid(
+        rows,
+        getIntrinsicSize,
+        getFittingSize=lambda view: (0, 0),
+        getColumnWidth=lambda index: 100 + index,
+        getRowHeight=lambda index: 200 + index
+    )
+    assert plan["merges"] == [(1, 0, 2)]
+    assert [(rowIndex, columnIndex, view) for rowIndex, columnIndex, view, cellPlan in plan["cells"]] == [
+        (0, 0, "a"),
+        (0, 1, "custom"),
+        (1, 0, "b"),
+    ]
+    assert plan["cells"][1][3]["width"] == 101
+    assert plan["cells"][1][3]["height"] == 200
+    assert measured == ["a", "custom"]
+
+
+def applyOperations(rows, operations, newRows):
+    rows = list(rows)
+    newRows = dict(newRows)
+    for operation in operations:
+        if operation[0] == "remove":
+            del rows[operation[1]]
+        elif operation[0] == "move":
+            fromIndex, toIndex = operation[1:]
+            rows.insert(toIndex, rows.pop(fromIndex))
+        elif operation[0] == "insert":
+            index, key = operation[1:]
+            rows.insert(index, (key, newRows[key]))
+        elif operation[0] == "update":
+            index, key = operation[1:]
+            assert rows[index][0] == key
+            rows[index] = (key, newRows[key])
+    return rows
+
+
+def makeRows(keys, contents=None):
+    if contents is None:
+        contents = {}
+    return [(key, contents.get(key, 0)) for key in keys]
+
+
+def testDiffNoChange():
+    rows = makeRows("abc")
+    assert diffRows(rows, rows) == []
+
+
+def testDiffMoveToEnd():
+    oldRows = makeRows("abcde")
+    newRows = makeRows("bcdea")
+    operations = diffRows(oldRows, newRows)
+    assert operations == [("move", 0, 4)]
+    assert applyOperations(oldRows, operations, newRows) == newRows
+
+
+def testDiffMixed():
+    oldRows = makeRows("abcdef")
+    newRows = makeRows("xfbdyca", dict(d=1))
+    operations = diffRows(oldRows, newRows)
+    assert [operation[0] for operation in operations].count("remove") == 1
+    assert ("update", 3, "d") in operations
+    assert applyOperations(oldRows, operations, newRows) == newRows
+
+
+def testDiffRandom():
+    import random
+    generator = random.Random(5)
+    for i in range(200):
+        oldKeys = generator.sample(range(30), generator.randint(0, 20))
+        newKeys = generator.sample(range(30), generator.randint(0, 20))
+        oldRows = makeRows(oldKeys)
+        newRows = makeRows(newKeys, {key: 1 for key in newKeys if key % 3 == 0})
+        operations = diffRows(oldRows, newRows)
+        assert applyOperations(oldRows, operations, newRows) == newRows
+
+
+def testDiffMinimalMoves():
+    import random
+    generator = random.Random(7)
+    for i in range(100):
+        keys = list(range(generator.randint(0, 40)))
+        newKeys = list(keys)
+        generator.shuffle(newKeys)
+        operations = diffRows(makeRows(keys), makeRows(newKeys))
+        longest = len(_longestIncreasingSubsequence([newKeys.index(key) for key in keys]))
+        assert len(operations) == len(keys) - longest
+        assert applyOperations(makeRows(keys), operations, makeRows(newKeys)) == makeRows(newKeys)
+
+
+def testDiffUniqueKeys():
+    try:
+        diffRows([], makeRows("aa"))
+    except ValueError:
+        pass
+    else:
+        assert False
+
+
+def testEditColumns():
+    rows = [("a", "b", "c"), ("d", "e")]
+    assert editColumns(rows, ("move", 0, 1)) == [("b", "a", "c"), ("e", "d")]
+    assert editColumns(rows, ("move", 2, 0)) == [("c", "a", "b"), (None, "d", "e")]
+    assert editColumns(rows, ("remove", 2)) == [("a", "b"), ("d", "e")]
+    assert editColumns(rows, ("insert", 1, ["x"])) == [("a", "x", "b", "c"), ("d", None, "e")]
+    assert editColumns(rows, ("insert", 3, ["x", "y"])) == [("a", "b", "c", "x"), ("d", "e", None, "y")]
+    # rows that compared equal before a move don't after it
+    moved = [(key, contents) for key, contents in zip("pq", editColumns(rows, ("move", 0, 1)))]
+    original = [(key, contents) for key, contents in zip("pq", rows)]
+    assert diffRows(moved, original) == [("update", 0, "p"), ("update", 1, "q")]
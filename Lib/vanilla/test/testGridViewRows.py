@@ -0,0 +1,48 @@
+import pytest
+pytest.importorskip("AppKit")
+
+import vanilla
+
+
+def getContentViews(grid):
+    gridView = grid.getNSGridView()
+    return [
+        [
+            gridView.cellAtColumnIndex_rowIndex_(columnIndex, rowIndex).contentView()
+            for columnIndex in range(gridView.numberOfColumns())
+        ]
+        for rowIndex in range(gridView.numberOfRows())
+    ]
+
+
+def makeRows():
+    return [
+        [vanilla.TextBox("auto", "%s%s" % (row, column)) for column in range(2)]
+        for row in range(2)
+    ]
+
+
+def testSetRowsAfterMoveColumn():
+    rows = makeRows()
+    grid = vanilla.GridView((0, 0, 200, 200), rows)
+    grid.moveColumn(0, 1)
+    grid.setRows(rows)
+    assert getContentViews(grid) == [[view._nsObject for view in row] for row in rows]
+
+
+def testSetRowsWithIdentifiersAfterMoveColumn():
+    rows = makeRows()
+    contents = [dict(identifier=index, cells=row) for index, row in enumerate(rows)]
+    grid = vanilla.GridView((0, 0, 200, 200), contents)
+    grid.moveColumn(0, 1)
+    grid.setRows([dict(identifier=index, cells=row) for index, row in enumerate(rows)])
+    assert getContentViews(grid) == [[view._nsObject for view in row] for row in rows]
+
+
+def testSetRowsAfterRemoveColumn():
+    rows = makeRows()
+    grid = vanilla.GridView((0, 0, 200, 200), rows)
+    grid.removeColumn(0)
+    newRows = [[row[1]] for row in rows]
+    grid.setRows(newRows)
+    assert getContentViews(grid) == [[view._nsObject for view in row] for row in newRows]
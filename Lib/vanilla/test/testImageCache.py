@@ -0,0 +1,131 @@
+from vanilla.imageCache import ImageCache
+
+
+class FakeStat:
+
+    def __init__(self, st_mtime, st_size):
+        self.st_mtime = st_mtime
+        self.st_size = st_size
+
+
+class FakeFileSystem:
+
+    def __init__(self):
+        self.files = {}
+        self.loads = []
+
+    def write(self, path, size, mtime=0):
+        self.files[path] = FakeStat(mtime, size)
+
+    def stat(self, path):
+        if path not in self.files:
+            raise OSError(path)
+        return self.files[path]
+
+    def load(self, path):
+        self.loads.append(path)
+        info = self.files[path]
+        return "image:%s:%s" % (path, info.st_mtime)
+
+
+def makeCache(**kwargs):
+    fileSystem = FakeFileSystem()
+    cache = ImageCache(fileSystem.load, stat=fileSystem.stat, **kwargs)
+    return cache, fileSystem
+
+
+def testHits():
+    cache, fileSystem = makeCache()
+    fileSystem.write("a.png", 10)
+    for i in range(100):
+        assert cache.get("a.png") == "image:a.png:0"
+    assert fileSystem.loads == ["a.png"]
+    stats = cache.getStats()
+    assert stats["hits"] == 99
+    assert stats["misses"] == 1
+    assert stats["count"] == 1
+    assert stats["bytes"] == 10
+
+
+def testMissingFile():
+    cache, fileSystem = makeCache()
+    assert cache.get("missing.png") is None
+    assert cache.getStats()["failures"] == 1
+
+
+def testModifiedFile():
+    cache, fileSystem = makeCache()
+    fileSystem.write("a.png", 10)
+    cache.get("a.png")
+    fileSystem.write("a.png", 20, mtime=1)
+    assert cache.get("a.png") == "image:a.png:1"
+    stats = cache.getStats()
+    assert stats["count"] == 1
+    assert stats["bytes"] == 20
+
+
+def testCountEviction():
+    cache, fileSystem = makeCache(maxCount=2, maxBytes=None)
+    for name in "abc":
+        fileSystem.write(name, 1)
+    cache.get("a")
+    cache.get("b")
+    # a is now the most recently used
+    cache.get("a")
+    cache.get("c")
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.getStats()["evictions"] == 1
+
+
+def testByteEviction():
+    cache, fileSystem = makeCache(maxCount=None, maxBytes=100)
+    fileSystem.write("small1", 40)
+    fileSystem.write("small2", 40)
+    fileSystem.write("large", 500)
+    cache.get("small1")
+    cache.get("small2")
+    assert cache.getStats()["bytes"] == 80
+    # the most recent image is kept even if it is over budget
+    cache.get("large")
+    stats = cache.getStats()
+    assert stats["count"] == 1
+    assert stats["bytes"] == 500
+    assert stats["evictions"] == 2
+
+
+def testCost():
+    fileSystem = FakeFileSystem()
+    cache = ImageCache(fileSystem.load, stat=fileSystem.stat, cost=lambda image, fileSize: fileSize * 4)
+    fileSystem.write("a", 10)
+    cache.get("a")
+    assert cache.getStats()["bytes"] == 40
+
+
+def testInvalidate():
+    cache, fileSystem = makeCache()
+    fileSystem.write("a", 1)
+    fileSystem.write("b", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.invalidate("a")
+    assert "a" not in cache
+    assert "b" in cache
+    cache.invalidate()
+    assert cache.getStats()["count"] == 0
+    assert cache.getStats()["bytes"] == 0
+    cache.get("a")
+    assert fileSystem.loads == ["a", "b", "a"]
+
+
+def testSetLimits():
+    cache, fileSystem = makeCache()
+    for name in "abcd":
+        fileSystem.write(name, 1)
+        cache.get(name)
+    cache.setLimits(maxCount=1, maxBytes=None)
+    assert "d" in cache
+    assert cache.getStats()["count"] == 1
+    cache.resetStats()
+    assert cache.getStats()["evictions"] == 0
@@ -0,0 +1,139 @@
+import threading
+from vanilla.imageLoading import AsyncImageLoader
+
+
+class FakeFuture:
+
+    def __init__(self, function, args):
+        self.function = function
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        return True
+
+
+class FakeExecutor:
+
+    def __init__(self, maxConcurrent):
+        self.maxConcurrent = maxConcurrent
+        self.futures = []
+        self.isShutdown = False
+
+    def submit(self, function, *args):
+        future = FakeFuture(function, args)
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait):
+        self.isShutdown = True
+
+    def runAll(self):
+        futures = self.futures
+        self.futures = []
+        for future in futures:
+            if not future.cancelled:
+                future.function(*future.args)
+
+
+class Owner:
+    pass
+
+
+def makeLoader():
+    executors = []
+    mainThreadQueue = []
+
+    def executorFactory(maxConcurrent):
+        executor = FakeExecutor(maxConcurrent)
+        executors.append(executor)
+        return executor
+
+    def decode(path):
+        if path == "broken":
+            raise ValueError(path)
+        return "image:" + path
+
+    loader = AsyncImageLoader(decode, mainThreadQueue.append, maxConcurrent=2, executorFactory=executorFactory)
+    return loader, executors, mainThreadQueue
+
+
+def runMainThread(queue):
+    while queue:
+        queue.pop(0)()
+
+
+def testLoad():
+    loader, executors, mainThreadQueue = makeLoader()
+    owner = Owner()
+    received = []
+    request = loader.load(owner, "a.png", received.append)
+    assert loader.getPendingRequest(owner) is request
+    executors[0].runAll()
+    # nothing is delivered outside of the main thread
+    assert received == []
+    runMainThread(mainThreadQueue)
+    assert received == ["image:a.png"]
+    assert request.isDone()
+    assert loader.getPendingRequest(owner) is None
+
+
+def testReuseCancels():
+    loader, executors, mainThreadQueue = makeLoader()
+    owner = Owner()
+    received = []
+    first = loader.load(owner, "row1.png", received.append)
+    second = loader.load(owner, "row2.png", received.append)
+    assert first.isCancelled()
+    executors[0].runAll()
+    runMainThread(mainThreadQueue)
+    assert received == ["image:row2.png"]
+    assert second.isDone()
+
+
+def testCancelWhileWaitingForMainThread():
+    loader, executors, mainThreadQueue = makeLoader()
+    owner = Owner()
+    received = []
+    loader.load(owner, "a.png", received.append)
+    executors[0].runAll()
+    loader.cancel(owner)
+    runMainThread(mainThreadQueue)
+    assert received == []
+
+
+def testDecodeError():
+    loader, executors, mainThreadQueue = makeLoader()
+    received = []
+    loader.load(Owner(), "broken", received.append)
+    executors[0].runAll()
+    runMainThread(mainThreadQueue)
+    assert received == [None]
+
+
+def testMaxConcurrent():
+    loader, executors, mainThreadQueue = makeLoader()
+    loader.load(Owner(), "a.png", lambda image: None)
+    assert executors[0].maxConcurrent == 2
+    loader.setMaxConcurrent(8)
+    assert executors[0].isShutdown
+    loader.load(Owner(), "b.png", lambda image: None)
+    assert executors[1].maxConcurrent == 8
+    assert loader.getMaxConcurrent() == 8
+
+
+def testThreadPool():
+    results = []
+    done = threading.Event()
+
+    def callOnMainThread(function):
+        function()
+        done.set()
+
+    loader = AsyncImageLoader(lambda path: path.upper(), callOnMainThread, maxConcurrent=1)
+    owner = Owner()
+    loader.load(owner, "a.png", results.append)
+    assert done.wait(5)
+    assert results == ["A.PNG"]
+    loader.setMaxConcurrent(1)
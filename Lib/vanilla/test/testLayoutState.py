@@ -0,0 +1,66 @@
+import json
+from vanilla.layoutState import iterViewsWithPaths, collectLayoutStates, applyLayoutStates
+
+
+class View:
+    pass
+
+
+class StatefulView(View):
+
+    def __init__(self, state):
+        self.state = state
+
+    def getLayoutState(self):
+        return dict(self.state)
+
+    def setLayoutState(self, state):
+        self.state = dict(state)
+
+
+def isView(obj):
+    return isinstance(obj, View)
+
+
+def makeTree():
+    root = View()
+    root.split = StatefulView(dict(sizes=[1, 2]))
+    root.group = View()
+    root.group.list = StatefulView(dict(columns=[["a", 10]]))
+    # private references to the same view don't change its path
+    root._autoLayoutViews = {"split": root.split}
+    # views in lists of descriptions
+    root.panes = View()
+    root.panes._paneDescriptions = [dict(view=StatefulView(dict(sizes=[3])), identifier="pane")]
+    # cycles are ignored
+    root.group.parent = root
+    return root
+
+
+def testPaths():
+    root = makeTree()
+    paths = [path for path, view in iterViewsWithPaths(root, isView)]
+    assert paths == [
+        "group",
+        "group.list",
+        "panes",
+        "panes._paneDescriptions.0.view",
+        "split"
+    ]
+
+
+def testRoundTrip():
+    root = makeTree()
+    states = collectLayoutStates(root, isView)
+    assert states == {
+        "group.list": dict(columns=[["a", 10]]),
+        "panes._paneDescriptions.0.view": dict(sizes=[3]),
+        "split": dict(sizes=[1, 2]),
+    }
+    states = json.loads(json.dumps(states))
+    states["split"] = dict(sizes=[5, 6])
+    states["removed.view"] = dict(sizes=[7])
+    other = makeTree()
+    applyLayoutStates(other, states, isView)
+    assert other.split.state == dict(sizes=[5, 6])
+    assert other.group.list.state == dict(columns=[["a", 10]])
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+import vanilla
+
+
+def testSubmoduleAttribute():
+    # in a new process, so no other test imported the submodule before
+    code = "import vanilla; print(vanilla.listMoves.moveIndexes(3, [0], 3))"
+    packageParent = os.path.dirname(os.path.dirname(vanilla.__file__))
+    output = subprocess.check_output([sys.executable, "-c", code], text=True, cwd=packageParent)
+    assert output.strip() == "[1, 2, 0]"
+
+
+def testUnknownAttribute():
+    assert not hasattr(vanilla, "NoSuchThing")
+    assert not hasattr(vanilla, "_noSuchModule")
+
+
+def testGridViewAgreesWithAll():
+    if "GridView" not in vanilla.__all__:
+        assert not hasattr(vanilla, "GridView")
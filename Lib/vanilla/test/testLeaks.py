@@ -0,0 +1,38 @@
+import pytest
+pytest.importorskip("AppKit")
+
+import vanilla
+from vanilla.test.testTools import findVanillaLeaks
+
+
+class LeakTestWindow:
+
+    def __init__(self):
+        self.w = vanilla.Window((400, 400))
+        self.w.button = vanilla.Button((10, 10, 100, 20), "Button", callback=self.callback)
+        self.w.group = vanilla.Group((10, 40, -10, 100))
+        self.w.group.checkBox = vanilla.CheckBox((10, 10, 100, 20), "Check", callback=self.callback)
+        self.w.group.box = vanilla.Box((10, 40, -10, -10))
+        self.w.group.box.editText = vanilla.EditText((10, 10, -10, 20), callback=self.callback)
+        self.w.tabs = vanilla.Tabs((10, 150, -10, 100), ["One", "Two"])
+        self.w.tabs[1].slider = vanilla.Slider((10, 10, -10, 20), callback=self.callback)
+        self.w.stack = vanilla.VerticalStackView(
+            (10, 260, -10, 60),
+            views=[vanilla.Button("auto", "Stacked", callback=self.callback)]
+        )
+        self.w.list = vanilla.List2((10, 330, -10, -10), items=["a", "b", "c"], selectionCallback=self.callback)
+        self.drawer = vanilla.Drawer((100, 100), self.w)
+        self.drawer.button = vanilla.Button((10, 10, -10, 20), "Drawer", callback=self.callback)
+        self.w.open()
+
+    def callback(self, sender):
+        pass
+
+
+def testLeaks():
+    leaks = findVanillaLeaks(lambda: LeakTestWindow().w)
+    assert leaks == dict(wrappers=0, callbackWrappers=0), leaks
+
+
+if __name__ == "__main__":
+    testLeaks()
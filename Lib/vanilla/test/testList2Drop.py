@@ -0,0 +1,55 @@
+import pytest
+AppKit = pytest.importorskip("AppKit")
+
+import vanilla
+
+
+class FakeDraggingInfo:
+
+    def __init__(self):
+        self.operationMask = AppKit.NSDragOperationEvery
+        self.pasteboard = AppKit.NSPasteboard.pasteboardWithUniqueName()
+
+    def draggingSequenceNumber(self):
+        return 1
+
+    def draggingSource(self):
+        return None
+
+    def draggingPasteboard(self):
+        return self.pasteboard
+
+    def draggingLocation(self):
+        return (0, 0)
+
+    def draggingSourceOperationMask(self):
+        return self.operationMask
+
+
+def testDropCandidateCallbackOnChangeOnly():
+    calls = []
+
+    def dropCandidateCallback(info):
+        calls.append(info["index"])
+        return "copy"
+
+    list2 = vanilla.List2(
+        (0, 0, 100, 100),
+        items=["a", "b", "c"],
+        dropSettings=dict(
+            pasteboardTypes=["string"],
+            dropCandidateCallback=dropCandidateCallback,
+            dropCandidateCallbackOnChangeOnly=True,
+            performDropCallback=lambda info: True
+        )
+    )
+    draggingInfo = FakeDraggingInfo()
+    list2._dropCandidateUpdated(draggingInfo, 1, AppKit.NSTableViewDropAbove)
+    list2._dropCandidateUpdated(draggingInfo, 1, AppKit.NSTableViewDropAbove)
+    assert calls == [1]
+    list2._dropCandidateUpdated(draggingInfo, 2, AppKit.NSTableViewDropAbove)
+    assert calls == [1, 2]
+    # pressing a modifier key changes the operations of the source
+    draggingInfo.operationMask = AppKit.NSDragOperationCopy
+    list2._dropCandidateUpdated(draggingInfo, 2, AppKit.NSTableViewDropAbove)
+    assert calls == [1, 2, 2]
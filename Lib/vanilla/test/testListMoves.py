@@ -0,0 +1,56 @@
+import itertools
+import random
+from vanilla.listMoves import moveIndexes, invertOrder, rowMoves
+
+
+def applyMoves(items, moves):
+    items = list(items)
+    for fromRow, toRow in moves:
+        items.insert(toRow, items.pop(fromRow))
+    return items
+
+
+def testMoveIndexes():
+    assert moveIndexes(5, [1, 3], 0) == [1, 3, 0, 2, 4]
+    assert moveIndexes(5, [3, 1], 5) == [0, 2, 4, 1, 3]
+    assert moveIndexes(5, [0, 4], 2) == [1, 0, 4, 2, 3]
+    # moving items in place changes nothing
+    assert moveIndexes(5, [1, 2], 2) == [0, 1, 2, 3, 4]
+    assert moveIndexes(0, [], 0) == []
+
+
+def testOutOfRange():
+    for args in [(3, [3], 0), (3, [-1], 0), (3, [0], 4)]:
+        try:
+            moveIndexes(*args)
+        except IndexError:
+            pass
+        else:
+            assert False, args
+
+
+def testInvertOrder():
+    order = moveIndexes(5, [1, 3], 0)
+    newIndexes = invertOrder(order)
+    assert [order[newIndex] for newIndex in newIndexes] == list(range(5))
+
+
+def testRowMoves():
+    count = 6
+    items = list(range(count))
+    for size in range(count + 1):
+        for indexes in itertools.combinations(range(count), size):
+            for toIndex in range(count + 1):
+                expected = moveIndexes(count, indexes, toIndex)
+                assert applyMoves(items, rowMoves(indexes, toIndex)) == expected
+
+
+def testRowMovesRandom():
+    randomizer = random.Random(3)
+    count = 100
+    items = list(range(count))
+    for i in range(50):
+        indexes = randomizer.sample(range(count), randomizer.randint(0, 20))
+        toIndex = randomizer.randint(0, count)
+        expected = moveIndexes(count, indexes, toIndex)
+        assert applyMoves(items, rowMoves(indexes, toIndex)) == expected
@@ -0,0 +1,30 @@
+import pytest
+pytest.importorskip("AppKit")
+
+from vanilla.vanillaBrowser import PythonItem, BrowserSettings
+
+
+class Thing:
+
+    def method(self, a, b=1):
+        pass
+
+
+def function(x):
+    pass
+
+
+def testChildren():
+    root = PythonItem("root", dict(function=function, thing=Thing()), None, None, settings=BrowserSettings())
+    children = {root.getChild(index).name: root.getChild(index) for index in range(len(root))}
+    assert children["function"].arguments == "x"
+    assert not children["function"].isExpandable()
+    assert children["thing"].isExpandable()
+
+
+def testAsynchronousChildren():
+    settings = BrowserSettings(asynchronous=True)
+    root = PythonItem("root", [function], None, None, settings=settings)
+    root.loadMore()
+    for job in list(settings.jobs):
+        assert job.wait(5)
@@ -0,0 +1,98 @@
+import threading
+import time
+from vanilla.objectBrowserModel import ChildPager, TimedOutValue
+from vanilla.objectBrowserLoading import IntrospectionJob
+
+
+class Slow:
+
+    def __init__(self, release):
+        self._release = release
+
+    @property
+    def a(self):
+        return 1
+
+    @property
+    def b(self):
+        # blocks until the test is done
+        self._release.wait(5)
+        return 2
+
+    @property
+    def c(self):
+        return 3
+
+
+def testLoad():
+    results = []
+    job = IntrospectionJob(ChildPager(list(range(5))), results.append).start()
+    assert job.wait(5)
+    assert [(name, value) for name, value, setter in results[0]] == [(i, i) for i in range(5)]
+
+
+def testDescribeChild():
+    release = threading.Event()
+    results = []
+    job = IntrospectionJob(
+        ChildPager(Slow(release)),
+        results.append,
+        attributeTimeout=0.05,
+        describeChild=lambda value: value * 10
+    )
+    job.start()
+    try:
+        assert job.wait(5)
+    finally:
+        release.set()
+    descriptions = {name: description for name, value, setter, description in results[0]}
+    assert descriptions == {"a": 10, "b": None, "c": 30}
+
+
+def testTimeout():
+    release = threading.Event()
+    results = []
+    progress = []
+    job = IntrospectionJob(
+        ChildPager(Slow(release)),
+        results.append,
+        progressCallback=lambda done, count: progress.append((done, count)),
+        attributeTimeout=0.05
+    )
+    job.start()
+    try:
+        assert job.wait(5)
+    finally:
+        release.set()
+    children = {name: value for name, value, setter in results[0]}
+    assert children["a"] == 1
+    assert children["c"] == 3
+    assert isinstance(children["b"], TimedOutValue)
+    assert job.timedOut == ["b"]
+    # a timed out value has no children
+    assert ChildPager(children["b"]).getCount() == 0
+
+
+def testCancel():
+    release = threading.Event()
+    results = []
+    job = IntrospectionJob(ChildPager(Slow(release)), results.append, attributeTimeout=5)
+    job.start()
+    time.sleep(0.05)
+    job.cancel()
+    release.set()
+    assert job.wait(5)
+    assert results == []
+    assert job.isCancelled()
+
+
+def testMainThread():
+    calls = []
+    results = []
+    job = IntrospectionJob(ChildPager([1]), results.append, callOnMainThread=calls.append).start()
+    assert job.wait(5)
+    # the callback waits for the main thread
+    assert results == []
+    for call in calls:
+        call()
+    assert results == [[(0, 1, results[0][0][2])]]
@@ -0,0 +1,166 @@
+from vanilla.objectBrowserModel import ChildPager, ChildFilter, TimedOutValue, defaultFilterRules, loadNameSet, describeValue
+
+
+class BigSequence:
+
+    """A sequence that must not be copied."""
+
+    def __init__(self, length):
+        self.length = length
+        self.reads = 0
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        self.reads += 1
+        return index * 2
+
+    def __iter__(self):
+        raise AssertionError("should not be iterated")
+
+
+class Thing:
+
+    cls = 1
+
+    def __init__(self):
+        self.a = 1
+        self.b = "b"
+        self._private = 2
+
+    @property
+    def broken(self):
+        raise ValueError("broken")
+
+    @property
+    def missing(self):
+        raise AttributeError("missing")
+
+    def method(self):
+        pass
+
+
+def testPagedList():
+    items = list(range(2500))
+    pager = ChildPager(items, pageSize=1000)
+    assert pager.getCount() == 2500
+    page = pager.loadNextPage()
+    assert len(page) == 1000
+    assert page[0] == (0, 0, page[0][2])
+    assert pager.hasMore()
+    assert pager.loadNextPage()[0][0] == 1000
+    assert len(pager.loadNextPage()) == 500
+    assert not pager.hasMore()
+    assert pager.loadNextPage() == []
+
+
+def testSequenceIsNotCopied():
+    sequence = BigSequence(1000000)
+    pager = ChildPager(sequence, pageSize=10)
+    page = pager.loadNextPage()
+    assert [(name, value) for name, value, setter in page] == [(i, i * 2) for i in range(10)]
+    assert sequence.reads == 10
+    # the attributes of the object come after the items
+    assert pager.getCount() == 1000000 + 2
+
+
+def testDict():
+    small = {"b": 1, "a": 2, 3: 3}
+    pager = ChildPager(small)
+    # keys that can't be sorted keep their order
+    assert [name for name, value, setter in pager.loadNextPage()] == ["b", "a", 3]
+    pager = ChildPager({"b": 1, "a": 2})
+    assert [name for name, value, setter in pager.loadNextPage()] == ["a", "b"]
+    big = {i: i for i in range(2500)}
+    pager = ChildPager(big, pageSize=1000)
+    names = []
+    while pager.hasMore():
+        names.extend(name for name, value, setter in pager.loadNextPage())
+    assert names == list(range(2500))
+
+
+def testSet():
+    pager = ChildPager({"x"})
+    assert [(name, value) for name, value, setter in pager.loadNextPage()] == [(0, "x")]
+
+
+def testAttributes():
+    pager = ChildPager(Thing())
+    children = {name: value for name, value, setter in pager.loadNextPage()}
+    assert sorted(children) == ["a", "b", "broken", "cls", "method"]
+    assert isinstance(children["broken"], ValueError)
+
+
+
+def testFilterRules():
+    def getNames(childFilter):
+        return [name for name, value, setter in ChildPager(Thing(), childFilter=childFilter).loadNextPage()]
+
+    names = getNames(ChildFilter())
+    assert "_private" in names
+    assert "__init__" in names
+    rules = defaultFilterRules + [dict(names=frozenset(["cls"]))]
+    assert getNames(ChildFilter(rules)) == ["a", "b", "broken", "method"]
+    rules = [dict(private=True), dict(name="^b"), dict(type=(int, "method"))]
+    assert getNames(ChildFilter(rules)) == []
+    childFilter = ChildFilter([dict(type=str)])
+    assert childFilter.filterNames(["a", 1, "_b"]) == ["a", "_b"]
+    # type rules also hide items
+    pager = ChildPager([1, "a", 2], childFilter=childFilter)
+    assert [value for name, value, setter in pager.loadNextPage()] == [1, 2]
+
+
+def testNameSet(tmp_path):
+    calls = []
+
+    def computeNames():
+        calls.append(True)
+        return ["NSView", "NSWindow"]
+
+    assert loadNameSet(computeNames) == frozenset(["NSView", "NSWindow"])
+    path = str(tmp_path / "cache" / "names.json")
+    loadNameSet(computeNames, path, "1")
+    assert loadNameSet(computeNames, path, "1") == frozenset(["NSView", "NSWindow"])
+    assert len(calls) == 2
+    # another key computes the names again
+    loadNameSet(computeNames, path, "2")
+    assert len(calls) == 3
+
+
+def testNoChildren():
+    for obj in (None, 1, "text", Thing().method, testNoChildren):
+        pager = ChildPager(obj)
+        assert pager.getCount() == 0
+        assert not pager.hasMore()
+
+
+def testIteratorIsNotConsumed():
+    iterator = iter(range(10))
+    ChildPager(iterator).loadNextPage()
+    assert next(iterator) == 0
+
+
+def testChildValue():
+    assert ChildPager({"a": 1}).getChildValue("a", dict.__getitem__, None) == ("a", 1, None)
+    assert ChildPager(Thing()).getChildValue("missing", getattr, setattr) is None
+
+
+def testDescribeValue():
+    def function(a, b=1):
+        pass
+
+    class Point:
+        origin = None
+
+        def __init__(self, x, y):
+            pass
+
+    assert describeValue([1]) == (True, "")
+    assert describeValue([]) == (False, "")
+    assert describeValue("text") == (False, "")
+    assert describeValue(TimedOutValue("a", 1)) == (False, "")
+    assert describeValue(function) == (False, "a, b")
+    assert describeValue(Point) == (True, "x, y")
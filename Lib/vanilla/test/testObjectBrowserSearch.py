@@ -0,0 +1,75 @@
+from vanilla.objectBrowserModel import ChildFilter
+from vanilla.objectBrowserSearch import walkObjectGraph, SearchIndex, SearchJob
+
+
+class Node:
+
+    def __init__(self, name, children=None):
+        self.name = name
+        self.children = children or []
+
+
+def makeGraph():
+    leaf = Node("leaf")
+    root = Node("root", [Node("a", [leaf]), Node("b", [leaf])])
+    # a cycle
+    leaf.children.append(root)
+    return root
+
+
+def testBreadthFirst():
+    data = {"a": {"b": {"c": "deep"}}, "x": [1, 2]}
+    paths = [path for path, value in walkObjectGraph(data)]
+    assert paths == [
+        ("a",),
+        ("x",),
+        ("a", "b"),
+        ("x", 0),
+        ("x", 1),
+        ("a", "b", "c"),
+    ]
+
+
+def testCycles():
+    root = makeGraph()
+    paths = [path for path, value in walkObjectGraph(root, maxDepth=20)]
+    # every object is expanded once
+    assert paths.count(("children", 0, "children", 0, "name")) == 1
+    assert ("children", 1, "children", 0, "name") not in paths
+    assert len(paths) == len(set(paths))
+
+
+def testBudgets():
+    data = {"a": {"b": {"c": {"d": 1}}}}
+    paths = [path for path, value in walkObjectGraph(data, maxDepth=2)]
+    assert paths == [("a",), ("a", "b")]
+    data = list(range(100))
+    assert len(list(walkObjectGraph(data, maxNodes=10))) == 10
+    assert len(list(walkObjectGraph(data, maxChildren=5))) == 5
+
+
+def testIndex():
+    index = SearchIndex()
+    index.add(("fontName",), "Helvetica")
+    index.add(("size",), 12)
+    assert index.search("FONT") == [("fontName",)]
+    assert index.search("helv") == [("fontName",)]
+    assert index.search("helv", searchValues=False) == []
+    # new entries extend the cached results
+    index.add(("other", "font"), None)
+    assert index.search("font") == [("fontName",), ("other", "font")]
+
+
+def testJob():
+    data = {"settings": {"fonts": ["Helvetica", "Times"], "size": 12}, "title": "Times Report"}
+    found = []
+    calls = []
+
+    def callback(paths, finished=False):
+        found.extend(paths)
+        calls.append(finished)
+
+    job = SearchJob(data, "times", callback, childFilter=ChildFilter()).start()
+    assert job.wait(5)
+    assert found == [("title",), ("settings", "fonts", 1)]
+    assert calls[-1] is True
@@ -0,0 +1,87 @@
+import json
+from vanilla.profiling import Profiler, profile, instrument, measure, isProfiling
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+clock = FakeClock()
+
+
+@instrument("outer")
+def outer():
+    clock.now += 1
+    inner()
+    inner()
+
+
+@instrument("inner")
+def inner():
+    clock.now += 2
+
+
+def testDisabled():
+    assert not isProfiling()
+    outer()
+    with measure("nothing"):
+        pass
+
+
+def testTree():
+    profiler = Profiler(clock=clock)
+    with profile(profiler):
+        assert isProfiling()
+        outer()
+    assert not isProfiling()
+    tree = profiler.getTree()
+    assert len(tree) == 1
+    (entry,) = tree[0]["children"]
+    assert entry["name"] == "outer"
+    assert entry["count"] == 1
+    assert entry["totalTime"] == 5
+    assert entry["ownTime"] == 1
+    (child,) = entry["children"]
+    assert child["name"] == "inner"
+    assert child["count"] == 2
+    assert child["totalTime"] == 4
+    assert profiler.getTotals() == {"outer": (1, 5), "inner": (2, 4)}
+    assert "outer" in profiler.formatTree()
+
+
+def testChromeTrace():
+    profiler = Profiler(clock=clock)
+    with profile(profiler):
+        with measure("block"):
+            clock.now += 0.5
+    trace = json.loads(json.dumps(profiler.getChromeTrace()))
+    (event,) = trace["traceEvents"]
+    assert event["name"] == "block"
+    assert event["ph"] == "X"
+    assert event["dur"] == 500000
+
+
+def testRecursion():
+    profiler = Profiler(clock=clock)
+
+    @instrument("recurse")
+    def recurse(depth):
+        clock.now += 1
+        if depth:
+            recurse(depth - 1)
+
+    with profile(profiler):
+        recurse(3)
+    assert profiler.getTotals() == {"recurse": (4, 4)}
+
+
+if __name__ == "__main__":
+    testDisabled()
+    testTree()
+    testChromeTrace()
+    testRecursion()
@@ -0,0 +1,95 @@
+from vanilla.splitViewSolver import allocateInitialSizes, distributeSizeChange, roundSizes
+
+
+def testEvenGrowth():
+    sizes = distributeSizeChange([100, 100, 100], 30, [None] * 3, [None] * 3, [True] * 3)
+    assert sizes == [110, 110, 110]
+
+
+def testUnchangeable():
+    sizes = distributeSizeChange([100, 100, 100], 30, [None] * 3, [None] * 3, [True, False, True])
+    assert sizes == [115, 100, 115]
+
+
+def testMaxSize():
+    sizes = distributeSizeChange([100, 100, 100], 60, [None] * 3, [105, None, None], [True] * 3)
+    assert sizes == [105, 127.5, 127.5]
+    assert sum(sizes) == 360
+
+
+def testMinSize():
+    sizes = distributeSizeChange([100, 100, 100], -60, [95, 60, None], [None] * 3, [True] * 3)
+    assert sizes == [95, 72.5, 72.5]
+    # a pane already below its minimum doesn't shrink
+    sizes = distributeSizeChange([50, 100], -20, [60, None], [None, None], [True, True])
+    assert sizes == [50, 80]
+
+
+def testPriority():
+    sizes = distributeSizeChange([100, 100, 100], 50, [None] * 3, [None, 120, None], [True] * 3, priorities=[0, 1, 0])
+    # the high priority pane takes what it can, the rest is shared
+    assert sizes == [115, 120, 115]
+
+
+def testLimitsExceeded():
+    sizes = distributeSizeChange([100, 100], 40, [None] * 2, [110, 110], [True] * 2)
+    assert sizes == [120, 120]
+    sizes = distributeSizeChange([100, 20], -200, [90, 10], [None] * 2, [True] * 2)
+    assert sizes == [0, 0]
+
+
+def testIntegral():
+    sizes = distributeSizeChange([100, 100, 100], 10, [None] * 3, [None] * 3, [True] * 3, integral=True)
+    assert all(isinstance(size, int) for size in sizes)
+    assert sum(sizes) == 310
+    assert sorted(sizes) == [103, 103, 104]
+
+
+def testRoundSizes():
+    sizes = [10.5, 10.25, 10.25, 7]
+    roundSizes(sizes, [0, 1, 2])
+    assert sizes[3] == 7
+    assert sum(sizes[:3]) == 31
+    assert sizes[0] == 11
+
+
+def testInitialSizes():
+    panes = [
+        dict(size=100, minSize=None, maxSize=None),
+        dict(size=None, minSize=50, maxSize=80),
+        dict(size=None, minSize=None, maxSize=None),
+        dict(size=0, minSize=None, maxSize=None),
+        dict(size=None, minSize=40, maxSize=40, fixedSize=True),
+    ]
+    sizes = allocateInitialSizes(panes, 401)
+    assert sizes == [100, 80, 181, 0, 40]
+
+
+def testInitialSizesRestored():
+    panes = [
+        dict(size=100, minSize=None, maxSize=None),
+        dict(size=None, minSize=None, maxSize=None),
+        dict(size=None, minSize=None, maxSize=None),
+    ]
+    # the same space gives the restored sizes
+    assert allocateInitialSizes(panes, 400, [120, 80, 200]) == [120, 80, 200]
+    # the flexible panes absorb the difference
+    assert allocateInitialSizes(panes, 500, [120, 80, 200]) == [120, 130, 250]
+    # panes without a restored size start at their minimum size
+    assert allocateInitialSizes(panes, 400, [None, 80, None]) == [100, 190, 110]
+    # the descriptions are not changed
+    assert panes[0]["size"] == 100
+
+
+def testInitialSizesRemainder():
+    panes = [dict(size=None, minSize=None, maxSize=None) for i in range(3)]
+    sizes = allocateInitialSizes(panes, 100)
+    assert sum(sizes) == 100
+    assert sorted(sizes) == [33, 33, 34]
+
+
+def testLinear():
+    # many panes without limits don't need sorting
+    count = 10000
+    sizes = distributeSizeChange([10] * count, count, [None] * count, [None] * count, [True] * count)
+    assert sizes == [11] * count
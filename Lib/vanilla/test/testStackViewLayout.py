@@ -0,0 +1,55 @@
+from vanilla.stackViewLayout import planStackItem, parseSizeConstraints, priorityLow, priorityRequired, noIntrinsicMetric, horizontal, vertical
+
+
+def testSizeSyntax():
+    assert parseSizeConstraints(100) == [("==", 100)]
+    assert parseSizeConstraints(">=50, <=200") == [(">=", 50.0), ("<=", 200.0)]
+    try:
+        parseSizeConstraints("100")
+    except ValueError:
+        pass
+    else:
+        assert False
+
+
+def testFixedSize():
+    plan = planStackItem(100, "<=20", vertical)
+    assert plan["widthPriorities"] == (priorityRequired, priorityRequired)
+    assert plan["heightPriorities"] == (priorityRequired, priorityLow)
+    assert plan["constraints"] == [
+        ("width", "==", None, 100),
+        ("height", "<=", None, 20.0)
+    ]
+
+
+def testFill():
+    # fill across the main axis pins the view to the stack view
+    plan = planStackItem("fill", "fill", vertical, edgeInsets=(1, 2, 3, 4))
+    assert plan["widthPriorities"] == (priorityLow, priorityLow)
+    assert plan["constraints"] == [
+        ("left", "==", "left", 2),
+        ("right", "==", "right", -4)
+    ]
+    # fill along the main axis is left to AppKit
+    plan = planStackItem("fill", "fill", horizontal, edgeInsets=(1, 2, 3, 4))
+    assert plan["constraints"] == [
+        ("top", "==", "top", 3),
+        ("bottom", "==", "bottom", -1)
+    ]
+
+
+def testIntrinsicSize():
+    calls = []
+
+    def getIntrinsicSize():
+        calls.append(True)
+        return (noIntrinsicMetric, 22)
+
+    plan = planStackItem("fit", None, horizontal, getIntrinsicSize=getIntrinsicSize)
+    assert plan["widthPriorities"] == (priorityLow, priorityLow)
+    assert plan["heightPriorities"] == (priorityRequired, priorityRequired)
+    assert plan["constraints"] == []
+    assert len(calls) == 1
+    # the intrinsic size is not needed when all sizes are given
+    planStackItem(10, 10, horizontal, getIntrinsicSize=getIntrinsicSize)
+    assert len(calls) == 1
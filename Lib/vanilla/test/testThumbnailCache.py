@@ -0,0 +1,128 @@
+import os
+from vanilla.thumbnailCache import ThumbnailCache, thumbnailPixelSize, _fitSize
+
+
+class FakeStat:
+
+    def __init__(self, st_mtime, st_size):
+        self.st_mtime = st_mtime
+        self.st_size = st_size
+
+
+class FakeImages:
+
+    def __init__(self):
+        self.files = {}
+        self.renders = []
+        self.reads = []
+
+    def write(self, path, mtime=0):
+        self.files[path] = FakeStat(mtime, 100)
+
+    def stat(self, path):
+        if path not in self.files:
+            raise OSError(path)
+        return self.files[path]
+
+    def render(self, path, pixelSize, pointSize):
+        self.renders.append((path, pixelSize))
+        return "thumbnail:%s:%sx%s" % (path, pixelSize[0], pixelSize[1])
+
+    def readFile(self, filePath, pointSize):
+        self.reads.append(filePath)
+        with open(filePath) as f:
+            return f.read()
+
+    def writeFile(self, image, filePath):
+        with open(filePath, "w") as f:
+            f.write(image)
+
+
+def makeCache(directory=None, **kwargs):
+    images = FakeImages()
+    cache = ThumbnailCache(
+        images.render,
+        directory=directory,
+        readFile=images.readFile,
+        writeFile=images.writeFile,
+        stat=images.stat,
+        **kwargs
+    )
+    return cache, images
+
+
+def testPixelSize():
+    assert thumbnailPixelSize((24, 24), 1) == (24, 24)
+    assert thumbnailPixelSize((24, 24), 2) == (48, 48)
+    assert thumbnailPixelSize((10.2, 0), 1.5) == (16, 1)
+
+
+def testMemory():
+    cache, images = makeCache()
+    images.write("a.png")
+    assert cache.get("a.png", (24, 24), 2) == "thumbnail:a.png:48x48"
+    assert cache.get("a.png", (24, 24), 2) == "thumbnail:a.png:48x48"
+    # another scale factor is another thumbnail
+    assert cache.get("a.png", (24, 24), 1) == "thumbnail:a.png:24x24"
+    assert images.renders == [("a.png", (48, 48)), ("a.png", (24, 24))]
+    assert ("a.png", (24, 24), 2) in cache
+    stats = cache.getStats()
+    assert stats["memoryHits"] == 1
+    assert stats["renders"] == 2
+    assert stats["count"] == 2
+    assert stats["bytes"] == (48 * 48 + 24 * 24) * 4
+
+
+def testMissingFile():
+    cache, images = makeCache()
+    assert cache.get("missing.png", (24, 24)) is None
+    assert cache.getStats()["failures"] == 1
+
+
+def testModifiedFile():
+    cache, images = makeCache()
+    images.write("a.png")
+    cache.get("a.png", (24, 24))
+    cache.get("a.png", (48, 48))
+    images.write("a.png", mtime=1)
+    cache.get("a.png", (24, 24))
+    # the thumbnails of the old file are dropped
+    assert cache.getStats()["count"] == 1
+    assert len(images.renders) == 3
+
+
+def testEviction():
+    cache, images = makeCache(maxCount=None, maxBytes=24 * 24 * 4 * 2)
+    for name in "abc":
+        images.write(name)
+        cache.get(name, (24, 24))
+    assert ("a", (24, 24), 1) not in cache
+    assert ("c", (24, 24), 1) in cache
+    assert cache.getStats()["evictions"] == 1
+
+
+def testDisk(tmp_path):
+    directory = tmp_path / "thumbnails"
+    cache, images = makeCache(directory)
+    images.write("a.png")
+    images.write("b.png")
+    cache.get("a.png", (24, 24), 2)
+    cache.get("b.png", (24, 24), 2)
+    assert len(os.listdir(directory)) == 2
+    # a new cache, as in a new session, reads from disk
+    cache, otherImages = makeCache(directory)
+    otherImages.files = images.files
+    assert cache.get("a.png", (24, 24), 2) == "thumbnail:a.png:48x48"
+    assert otherImages.renders == []
+    assert cache.getStats()["diskHits"] == 1
+    cache.invalidate("a.png")
+    assert len(os.listdir(directory)) == 1
+    assert ("a.png", (24, 24), 2) not in cache
+    cache.invalidate()
+    assert os.listdir(directory) == []
+
+
+def testFitSize():
+    assert _fitSize((200, 100), (50, 50)) == (50, 25)
+    assert _fitSize((0, 100), (50, 50)) is None
+    assert _fitSize((100, 0), (50, 50)) is None
@@ -0,0 +1,90 @@
+import pytest
+from vanilla.toolbarModel import OrderedIdentifierSet, OrderedIdentifierList, ToolbarModel, isStandardIdentifier
+
+
+def testOrderedIdentifierSet():
+    identifiers = OrderedIdentifierSet(["a", "b", "c"])
+    assert identifiers.getList() == ["a", "b", "c"]
+    identifiers.add("b")
+    assert len(identifiers) == 3
+    identifiers.add("d", before="a")
+    assert identifiers.getList() == ["d", "a", "b", "c"]
+    identifiers.remove("a")
+    assert identifiers.getList() == ["d", "b", "c"]
+    identifiers.move("d")
+    assert identifiers.getList() == ["b", "c", "d"]
+    identifiers.move("d", before="c")
+    assert identifiers.getList() == ["b", "d", "c"]
+    identifiers.insert(0, "c")
+    assert identifiers.getList() == ["c", "b", "d"]
+    identifiers.insert(100, "e")
+    assert identifiers.getList() == ["c", "b", "d", "e"]
+    assert identifiers.index("d") == 2
+    assert "e" in identifiers
+    identifiers.discard("x")
+    with pytest.raises(KeyError):
+        identifiers.remove("x")
+    with pytest.raises(KeyError):
+        identifiers.move("c", before="x")
+    for identifier in list(identifiers):
+        identifiers.remove(identifier)
+    assert identifiers.getList() == []
+    identifiers.add("a")
+    assert identifiers.getList() == ["a"]
+
+
+def testListIsCached():
+    identifiers = OrderedIdentifierSet(["a", "b"])
+    assert identifiers.getList() is identifiers.getList()
+    before = identifiers.getList()
+    identifiers.add("c")
+    assert identifiers.getList() is not before
+
+
+def testToolbarModel():
+    model = ToolbarModel()
+    model.addItem("open", "openItem", callbackWrapper="openTarget")
+    model.addItem("save", "saveItem", selectable=True)
+    model.addItem("hidden", "hiddenItem", visibleByDefault=False)
+    model.addItem("new", "newItem", before="open")
+    model.addAllowedIdentifier("NSToolbarSpaceItem")
+    assert model.defaultIdentifiers.getList() == ["new", "open", "save"]
+    assert model.allowedIdentifiers.getList() == ["open", "save", "hidden", "new", "NSToolbarSpaceItem"]
+    assert model.selectableIdentifiers.getList() == ["save"]
+    assert model.getDefaultIndex("save") == 2
+    assert model.removeItem("open") == "openItem"
+    assert "open" not in model
+    assert model.callbackWrappers == {}
+    assert model.defaultIdentifiers.getList() == ["new", "save"]
+    model.moveItem("new")
+    assert model.defaultIdentifiers.getList() == ["save", "new"]
+
+
+def testRepeatedStandardIdentifiers():
+    model = ToolbarModel()
+    model.addItem("open", "openItem")
+    model.addItem("NSToolbarFlexibleSpaceItem")
+    model.addItem("save", "saveItem")
+    model.addItem("NSToolbarFlexibleSpaceItem")
+    model.addItem("help", "helpItem")
+    assert model.defaultIdentifiers.getList() == ["open", "NSToolbarFlexibleSpaceItem", "save", "NSToolbarFlexibleSpaceItem", "help"]
+    assert model.allowedIdentifiers.getList() == ["open", "NSToolbarFlexibleSpaceItem", "save", "help"]
+    # custom identifiers are still unique
+    model.addItem("open", "openItem")
+    assert len(model.defaultIdentifiers) == 5
+    model.moveItem("open")
+    assert model.defaultIdentifiers.getList() == ["NSToolbarFlexibleSpaceItem", "save", "NSToolbarFlexibleSpaceItem", "help", "open"]
+    model.removeItem("save")
+    assert model.defaultIdentifiers.getList() == ["NSToolbarFlexibleSpaceItem", "NSToolbarFlexibleSpaceItem", "help", "open"]
+
+
+def testOrderedIdentifierListKeys():
+    identifiers = OrderedIdentifierList(["a", "NSSpace"], isRepeatable=isStandardIdentifier)
+    key = identifiers.insert(0, "NSSpace")
+    assert identifiers.getList() == ["NSSpace", "a", "NSSpace"]
+    identifiers.insertKey(2, key)
+    assert identifiers.getList() == ["a", "NSSpace", "NSSpace"]
+    assert identifiers.getIdentifier(key) == "NSSpace"
+    identifiers.insert(5, "a")
+    assert identifiers.getList() == ["NSSpace", "NSSpace", "a"]
+    assert identifiers.index("a") == 2
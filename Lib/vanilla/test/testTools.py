@@ -2,6 +2,9 @@ from Foundation import NSObject
 from AppKit import NSApplication, NSMenu, NSMenuItem, NSBundle
 from PyObjCTools import AppHelper
 import asyncio
+import gc
+import objc
+from vanilla.vanillaBase import VanillaBaseObject, getLiveCallbackWrapperCount
 
 try:
     from corefoundationasyncio import CoreFoundationEventLoop
@@ -73,3 +76,38 @@ def executeVanillaTest(cls, nibPath=None, calls=None, **kwargs):
             loop.close()
     else:
         AppHelper.runEventLoop()
+
+
+def countLiveVanillaObjects():
+    """
+    Return a dictionary with the number of live vanilla
+    wrappers and VanillaCallbackWrapper objects.
+    """
+    gc.collect()
+    wrappers = 0
+    for obj in gc.get_objects():
+        if isinstance(obj, VanillaBaseObject):
+            wrappers += 1
+    return dict(
+        wrappers=wrappers,
+        callbackWrappers=getLiveCallbackWrapperCount()
+    )
+
+
+def findVanillaLeaks(build):
+    """
+    Call *build*, which must return an open vanilla Window,
+    close the window and return a dictionary with the number
+    of wrappers and VanillaCallbackWrapper objects that are
+    still alive afterwards. Zero values mean nothing leaked.
+    """
+    before = countLiveVanillaObjects()
+    with objc.autorelease_pool():
+        window = build()
+        window.close()
+        del window
+    after = countLiveVanillaObjects()
+    return {
+        key: after[key] - before[key]
+        for key in before
+    }
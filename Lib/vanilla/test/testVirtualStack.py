@@ -0,0 +1,99 @@
+from vanilla.virtualStack import RowHeights, visibleRowRange, RecyclingPool, VirtualRows
+
+
+def testRowHeights():
+    heights = RowHeights(5, lambda index: 10 * (index + 1))
+    assert heights.getTotalHeight() == 150
+    assert [heights.getRowOffset(index) for index in range(5)] == [0, 10, 30, 60, 100]
+    assert heights.rowAtOffset(-5) == 0
+    assert heights.rowAtOffset(0) == 0
+    assert heights.rowAtOffset(9.5) == 0
+    assert heights.rowAtOffset(10) == 1
+    assert heights.rowAtOffset(99) == 3
+    assert heights.rowAtOffset(1000) == 4
+    assert heights.setRowHeight(1, 5)
+    assert not heights.setRowHeight(1, 5)
+    assert heights.getRowOffset(2) == 15
+    assert heights.rowAtOffset(12) == 1
+    assert heights.getTotalHeight() == 135
+
+
+def testRowCount():
+    heights = RowHeights(3, 20)
+    heights.setRowHeight(0, 30)
+    heights.setRowCount(6)
+    assert heights.getTotalHeight() == 130
+    heights.setRowCount(1)
+    assert heights.getTotalHeight() == 30
+    heights.setRowCount(0)
+    assert heights.rowAtOffset(0) == -1
+    assert visibleRowRange(heights, 0, 100) == (0, 0)
+
+
+def testVisibleRange():
+    heights = RowHeights(2000, 20)
+    assert visibleRowRange(heights, 0, 100) == (0, 5)
+    assert visibleRowRange(heights, 10, 100) == (0, 6)
+    assert visibleRowRange(heights, 1000, 100, overscan=2) == (48, 57)
+    assert visibleRowRange(heights, 39990, 100, overscan=2) == (1997, 2000)
+
+
+def testPool():
+    discarded = []
+    pool = RecyclingPool(maxSize=2, discard=discarded.append)
+    assert pool.take() is None
+    for view in "abc":
+        pool.put(view)
+    assert len(pool) == 2
+    assert discarded == ["c"]
+    assert pool.take() == "b"
+    pool.clear()
+    assert discarded == ["c", "a"]
+
+
+class Builder:
+
+    def __init__(self):
+        self.created = 0
+        self.calls = []
+
+    def __call__(self, index, view):
+        self.calls.append((index, view))
+        if view is None:
+            self.created += 1
+            view = dict()
+        view["index"] = index
+        return view
+
+
+def testRecycling():
+    builder = Builder()
+    rows = VirtualRows(RowHeights(2000, 20), builder, overscan=1)
+    removed, added = rows.update(0, 100)
+    assert removed == []
+    assert [index for index, view in added] == list(range(6))
+    assert builder.created == 6
+    # scroll through all rows
+    for top in range(0, 40000, 35):
+        rows.update(top, 100)
+        views = rows.getViews()
+        assert all(view["index"] == index for index, view in views.items())
+    start, stop = rows.getRange()
+    assert stop == 2000
+    # views were reused instead of built
+    assert builder.created <= 9
+    assert len(rows.getViews()) + len(rows.pool) == builder.created
+
+
+def testReload():
+    builder = Builder()
+    rows = VirtualRows(RowHeights(10, 20), builder)
+    rows.update(0, 40)
+    view = rows.getView(1)
+    reloaded = rows.reload([1, 5])
+    assert reloaded == [(1, view, view)]
+    assert builder.calls[-1] == (1, view)
+    removed = rows.recycleAll()
+    assert [index for index, view in removed] == [0, 1]
+    assert len(rows.pool) == 2
+    assert rows.getView(0) is None
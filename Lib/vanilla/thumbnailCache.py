@@ -0,0 +1,341 @@
+"""
+Downsampled thumbnails of image files.
+
+Showing a large image in a small list row keeps the full resolution
+image in memory. `ThumbnailCache` renders a thumbnail with the pixel
+size needed for the displayed size and backing scale factor once,
+keeps it in memory and, optionally, writes it to a cache directory so
+that it survives the process.
+
+Entries are keyed by the path, modification time and size of the
+source file together with the pixel size and scale of the thumbnail,
+so an edited file gets new thumbnails. Files in the cache directory
+are named after hashes of the path and the key, which lets
+`invalidate` find the files of a path without an index.
+
+`ThumbnailCache` doesn't depend on AppKit: the functions that render,
+read and write thumbnails are given to it.
+"""
+
+import os
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+defaultMaxCount = 2048
+defaultMaxBytes = 64 * 1024 * 1024
+
+
+def thumbnailPixelSize(pointSize, scale):
+    """
+    Return the pixel size `(width, height)` needed to show
+    an image at **pointSize** with the backing **scale** factor.
+    """
+    width, height = pointSize
+    return (max(int(math.ceil(width * scale)), 1), max(int(math.ceil(height * scale)), 1))
+
+
+def _hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _pixelCost(image, pixelSize):
+    width, height = pixelSize
+    return width * height * 4
+
+
+class ThumbnailCache(object):
+
+    """
+    A least recently used cache of thumbnails.
+
+    **render** A function with the signature `render(path, pixelSize, pointSize)`
+    that returns a thumbnail of the image at *path* no larger than *pixelSize*,
+    or `None` if the file can't be read.
+
+    **directory** A directory where rendered thumbnails are stored. Optional.
+
+    **readFile** A function with the signature `readFile(filePath, pointSize)`
+    that reads a thumbnail from the cache directory, or returns `None`.
+    Required if **directory** is given.
+
+    **writeFile** A function with the signature `writeFile(image, filePath)`
+    that writes a thumbnail to the cache directory.
+    Required if **directory** is given.
+
+    **maxCount** The maximum number of thumbnails kept in memory, or `None` for no limit.
+
+    **maxBytes** The maximum number of bytes used by the thumbnails in memory, or
+    `None` for no limit. A thumbnail is counted with 4 bytes per pixel.
+
+    **stat** A function that is given a path and returns an object with
+    `st_mtime` and `st_size` attributes. The default is `os.stat`.
+    """
+
+    fileExtension = ".png"
+
+    def __init__(self, render, directory=None, readFile=None, writeFile=None,
+            maxCount=defaultMaxCount, maxBytes=defaultMaxBytes, stat=os.stat):
+        self._render = render
+        self._readFile = readFile
+        self._writeFile = writeFile
+        self._stat = stat
+        self._maxCount = maxCount
+        self._maxBytes = maxBytes
+        self._directory = None
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()  # { key : (image, cost) }
+        self._pathKeys = {}  # { path : set(keys) }
+        self._totalBytes = 0
+        self._memoryHits = 0
+        self._diskHits = 0
+        self._renders = 0
+        self._evictions = 0
+        self._failures = 0
+        self.setDirectory(directory)
+
+    def setDirectory(self, directory):
+        """
+        Set the directory where thumbnails are stored,
+        or `None` to keep them in memory only.
+        """
+        if directory is not None:
+            directory = os.fspath(directory)
+            os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+
+    def getDirectory(self):
+        return self._directory
+
+    def _makeKey(self, path, pointSize, scale):
+        try:
+            info = self._stat(path)
+        except OSError:
+            return None
+        pixelSize = thumbnailPixelSize(pointSize, scale)
+        return (path, info.st_mtime, info.st_size, pixelSize, scale)
+
+    def _getFilePath(self, key):
+        path = key[0]
+        fileName = "%s-%s%s" % (_hash(path), _hash(repr(key)), self.fileExtension)
+        return os.path.join(self._directory, fileName)
+
+    def __contains__(self, item):
+        path, pointSize, scale = item
+        key = self._makeKey(os.fspath(path), pointSize, scale)
+        with self._lock:
+            return key in self._entries
+
+    def get(self, path, pointSize, scale=1.0):
+        """
+        Return a thumbnail of the image at **path** to be shown at
+        **pointSize** `(width, height)` with the backing **scale** factor.
+        `None` is returned if the file can't be read.
+        """
+        path = os.fspath(path)
+        key = self._makeKey(path, pointSize, scale)
+        if key is None:
+            with self._lock:
+                self._failures += 1
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._memoryHits += 1
+                return entry[0]
+        pixelSize = key[3]
+        image = None
+        filePath = None
+        directory = self._directory
+        if directory is not None:
+            filePath = self._getFilePath(key)
+            if os.path.exists(filePath):
+                image = self._readFile(filePath, pointSize)
+                if image is not None:
+                    with self._lock:
+                        self._diskHits += 1
+        if image is None:
+            image = self._render(path, pixelSize, pointSize)
+            if image is None:
+                with self._lock:
+                    self._failures += 1
+                return None
+            with self._lock:
+                self._renders += 1
+            if filePath is not None:
+                try:
+                    self._writeFile(image, filePath)
+                except OSError:
+                    pass
+        self._store(key, image, _pixelCost(image, pixelSize))
+        return image
+
+    def _store(self, key, image, cost):
+        with self._lock:
+            if key in self._entries:
+                return
+            path = key[0]
+            # drop thumbnails of older versions of the file
+            for oldKey in list(self._pathKeys.get(path, ())):
+                if oldKey[1:3] != key[1:3]:
+                    self._removeKey(oldKey)
+            self._entries[key] = (image, cost)
+            self._pathKeys.setdefault(path, set()).add(key)
+            self._totalBytes += cost
+            self._evict()
+
+    def _removeKey(self, key):
+        image, cost = self._entries.pop(key)
+        self._totalBytes -= cost
+        keys = self._pathKeys[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._pathKeys[key[0]]
+
+    def _evict(self):
+        entries = self._entries
+        maxCount = self._maxCount
+        maxBytes = self._maxBytes
+        while len(entries) > 1 and (
+                (maxCount is not None and len(entries) > maxCount)
+                or (maxBytes is not None and self._totalBytes > maxBytes)
+            ):
+            key = next(iter(entries))
+            self._removeKey(key)
+            self._evictions += 1
+
+    def invalidate(self, path=None):
+        """
+        Remove the thumbnails of **path**, or all thumbnails if **path**
+        is `None`, from memory and from the cache directory.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._pathKeys.clear()
+                self._totalBytes = 0
+            else:
+                path = os.fspath(path)
+                for key in list(self._pathKeys.get(path, ())):
+                    self._removeKey(key)
+        directory = self._directory
+        if directory is None:
+            return
+        if path is None:
+            prefix = ""
+        else:
+            prefix = _hash(path) + "-"
+        for fileName in os.listdir(directory):
+            if fileName.startswith(prefix) and fileName.endswith(self.fileExtension):
+                try:
+                    os.remove(os.path.join(directory, fileName))
+                except OSError:
+                    pass
+
+    def getStats(self):
+        """
+        Return a dictionary with the keys `memoryHits`, `diskHits`,
+        `renders`, `evictions`, `failures`, `count` and `bytes`.
+        """
+        with self._lock:
+            return dict(
+                memoryHits=self._memoryHits,
+                diskHits=self._diskHits,
+                renders=self._renders,
+                evictions=self._evictions,
+                failures=self._failures,
+                count=len(self._entries),
+                bytes=self._totalBytes
+            )
+
+
+# ------------
+# Shared cache
+# ------------
+
+def _renderThumbnail(path, pixelSize, pointSize):
+    # ImageIO reads only what is needed for the thumbnail
+    # instead of decoding the full image
+    import Quartz
+    from Foundation import NSURL
+    from AppKit import NSImage
+    url = NSURL.fileURLWithPath_(path)
+    source = Quartz.CGImageSourceCreateWithURL(url, None)
+    if source is None:
+        return None
+    options = {
+        Quartz.kCGImageSourceCreateThumbnailFromImageAlways: True,
+        Quartz.kCGImageSourceCreateThumbnailWithTransform: True,
+        Quartz.kCGImageSourceShouldCacheImmediately: True,
+        Quartz.kCGImageSourceThumbnailMaxPixelSize: max(pixelSize)
+    }
+    thumbnail = Quartz.CGImageSourceCreateThumbnailAtIndex(source, 0, options)
+    if thumbnail is None:
+        return None
+    size = _fitSize((Quartz.CGImageGetWidth(thumbnail), Quartz.CGImageGetHeight(thumbnail)), pointSize)
+    if size is None:
+        return None
+    return NSImage.alloc().initWithCGImage_size_(thumbnail, size)
+
+
+def _fitSize(size, pointSize):
+    # scale size to fit in pointSize, None for an image without pixels
+    width, height = size
+    if not width or not height:
+        return None
+    maxWidth, maxHeight = pointSize
+    factor = min(maxWidth / width, maxHeight / height)
+    return (width * factor, height * factor)
+
+
+def _readThumbnail(filePath, pointSize):
+    from AppKit import NSImage
+    image = NSImage.alloc().initWithContentsOfFile_(filePath)
+    if image is None:
+        return None
+    size = _fitSize(image.size(), pointSize)
+    if size is None:
+        return None
+    image.setSize_(size)
+    return image
+
+
+def _writeThumbnail(image, filePath):
+    from AppKit import NSBitmapImageRep, NSPNGFileType
+    cgImage = image.CGImageForProposedRect_context_hints_(None, None, None)[0]
+    representation = NSBitmapImageRep.alloc().initWithCGImage_(cgImage)
+    data = representation.representationUsingType_properties_(NSPNGFileType, {})
+    if not data.writeToFile_atomically_(filePath, True):
+        raise OSError("can't write %r" % filePath)
+
+
+_sharedThumbnailCache = None
+_sharedThumbnailCacheLock = threading.Lock()
+
+
+def getSharedThumbnailCache():
+    """
+    Return the `ThumbnailCache` used by vanilla.
+    """
+    global _sharedThumbnailCache
+    if _sharedThumbnailCache is None:
+        with _sharedThumbnailCacheLock:
+            if _sharedThumbnailCache is None:
+                _sharedThumbnailCache = ThumbnailCache(
+                    _renderThumbnail,
+                    readFile=_readThumbnail,
+                    writeFile=_writeThumbnail
+                )
+    return _sharedThumbnailCache
+
+
+def setThumbnailCacheDirectory(directory):
+    """
+    Store the thumbnails shown by vanilla in **directory**
+    so that they don't have to be rendered again in later
+    sessions. `None` keeps them in memory only.
+    """
+    getSharedThumbnailCache().setDirectory(directory)
@@ -0,0 +1,396 @@
+"""
+The bookkeeping behind `Window` toolbars.
+
+NSToolbar asks its delegate for the default, allowed and selectable
+item identifiers over and over again, and vanilla changes these lists
+whenever items are added or removed. The identifiers are kept in
+ordered sets so that adding, removing and moving an identifier
+doesn't have to scan or rebuild the lists. The default identifiers
+can repeat the standard AppKit identifiers, such as the flexible
+space, so they are kept in an ordered list of unique entries.
+
+Nothing in here depends on AppKit.
+"""
+
+
+class OrderedIdentifierSet(object):
+
+    """
+    A set of hashable identifiers that remembers their order.
+
+    Membership tests, adding, removing and moving an identifier
+    relative to another identifier are O(1). Converting to a list
+    is cached until the set changes.
+    """
+
+    __slots__ = ("_links", "_first", "_last", "_list")
+
+    def __init__(self, identifiers=()):
+        self._links = {}  # { identifier : [previous, next] }
+        self._first = None
+        self._last = None
+        self._list = None
+        for identifier in identifiers:
+            self.add(identifier)
+
+    def __len__(self):
+        return len(self._links)
+
+    def __contains__(self, identifier):
+        return identifier in self._links
+
+    def __iter__(self):
+        return iter(self.getList())
+
+    def __repr__(self):
+        return "OrderedIdentifierSet(%r)" % (self.getList(),)
+
+    def _link(self, identifier, before):
+        links = self._links
+        if before is None:
+            previous = self._last
+            links[identifier] = [previous, None]
+            if previous is None:
+                self._first = identifier
+            else:
+                links[previous][1] = identifier
+            self._last = identifier
+        else:
+            beforeLink = links[before]
+            previous = beforeLink[0]
+            links[identifier] = [previous, before]
+            beforeLink[0] = identifier
+            if previous is None:
+                self._first = identifier
+            else:
+                links[previous][1] = identifier
+        self._list = None
+
+    def _unlink(self, identifier):
+        links = self._links
+        previous, next = links.pop(identifier)
+        if previous is None:
+            self._first = next
+        else:
+            links[previous][1] = next
+        if next is None:
+            self._last = previous
+        else:
+            links[next][0] = previous
+        self._list = None
+
+    def add(self, identifier, before=None):
+        """
+        Add **identifier** at the end or in front of the identifier
+        **before**. Adding an identifier that is already in the set
+        does nothing.
+        """
+        if identifier in self._links:
+            return
+        if before is not None and before not in self._links:
+            raise KeyError(before)
+        self._link(identifier, before)
+
+    def remove(self, identifier):
+        """
+        Remove **identifier**. A `KeyError` is raised if it is not in the set.
+        """
+        self._unlink(identifier)
+
+    def discard(self, identifier):
+        """
+        Remove **identifier** if it is in the set.
+        """
+        if identifier in self._links:
+            self._unlink(identifier)
+
+    def move(self, identifier, before=None):
+        """
+        Move **identifier** to the end or in front of the identifier **before**.
+        """
+        if identifier == before:
+            return
+        if identifier not in self._links:
+            raise KeyError(identifier)
+        if before is not None and before not in self._links:
+            raise KeyError(before)
+        self._unlink(identifier)
+        self._link(identifier, before)
+
+    def insert(self, index, identifier):
+        """
+        Insert or move **identifier** so that it ends up at **index**.
+        This needs to walk the set up to **index**.
+        """
+        self.discard(identifier)
+        if index < 0:
+            index = max(len(self._links) + index, 0)
+        before = self._first
+        for i in range(index):
+            if before is None:
+                break
+            before = self._links[before][1]
+        self._link(identifier, before)
+
+    def index(self, identifier):
+        """
+        Return the position of **identifier**.
+        """
+        if identifier not in self._links:
+            raise ValueError("%r is not in the set" % (identifier,))
+        return self.getList().index(identifier)
+
+    def clear(self):
+        self._links = {}
+        self._first = None
+        self._last = None
+        self._list = None
+
+    def getList(self):
+        """
+        Return the identifiers as a list. The list is shared
+        until the set changes and must not be modified.
+        """
+        if self._list is None:
+            identifiers = []
+            links = self._links
+            identifier = self._first
+            while identifier is not None:
+                identifiers.append(identifier)
+                identifier = links[identifier][1]
+            self._list = identifiers
+        return self._list
+
+
+def isStandardIdentifier(identifier):
+    """
+    Return `True` for the identifiers of the standard
+    AppKit items, which may appear more than once.
+    """
+    return identifier.startswith("NS")
+
+
+class OrderedIdentifierList(object):
+
+    """
+    An ordered list of identifiers in which only the identifiers for
+    which **isRepeatable** returns `True` can appear more than once.
+
+    Every occurrence is an entry with a unique key, kept in an
+    `OrderedIdentifierSet`. The key of a unique identifier is the
+    identifier itself. Where an identifier is used to find a position
+    and it is repeated, the first occurrence that was added is used.
+    """
+
+    __slots__ = ("_entries", "_keys", "_identifiers", "_isRepeatable", "_counter", "_list")
+
+    def __init__(self, identifiers=(), isRepeatable=None):
+        self._entries = OrderedIdentifierSet()
+        self._keys = {}  # { identifier : [key] }
+        self._identifiers = {}  # { key : identifier }
+        self._isRepeatable = isRepeatable
+        self._counter = 0
+        self._list = None
+        for identifier in identifiers:
+            self.add(identifier)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, identifier):
+        return identifier in self._keys
+
+    def __iter__(self):
+        return iter(self.getList())
+
+    def __repr__(self):
+        return "OrderedIdentifierList(%r)" % (self.getList(),)
+
+    def _getKey(self, identifier):
+        keys = self._keys.get(identifier)
+        if not keys:
+            raise KeyError(identifier)
+        return keys[0]
+
+    def _makeKey(self, identifier):
+        if self._isRepeatable is not None and self._isRepeatable(identifier):
+            self._counter += 1
+            key = (identifier, self._counter)
+        else:
+            key = identifier
+        self._keys.setdefault(identifier, []).append(key)
+        self._identifiers[key] = identifier
+        self._list = None
+        return key
+
+    def add(self, identifier, before=None):
+        """
+        Add **identifier** at the end or in front of the identifier
+        **before** and return the key of the entry. Adding a unique
+        identifier that is already in the list does nothing.
+        """
+        if identifier in self._keys and not (self._isRepeatable is not None and self._isRepeatable(identifier)):
+            return self._getKey(identifier)
+        if before is not None:
+            before = self._getKey(before)
+        key = self._makeKey(identifier)
+        self._entries.add(key, before)
+        return key
+
+    def insert(self, index, identifier):
+        """
+        Insert **identifier**, or move it if it is unique and already
+        in the list, so that it ends up at **index**. Returns the key.
+        """
+        if identifier in self._keys and not (self._isRepeatable is not None and self._isRepeatable(identifier)):
+            key = self._getKey(identifier)
+        else:
+            key = self._makeKey(identifier)
+        self._entries.insert(index, key)
+        self._list = None
+        return key
+
+    def insertKey(self, index, key):
+        """
+        Move the entry with **key** so that it ends up at **index**.
+        """
+        self._entries.insert(index, key)
+        self._list = None
+
+    def remove(self, identifier):
+        """
+        Remove all occurrences of **identifier**. A `KeyError`
+        is raised if it is not in the list.
+        """
+        for key in self._keys.pop(identifier):
+            self._entries.remove(key)
+            del self._identifiers[key]
+        self._list = None
+
+    def discard(self, identifier):
+        if identifier in self._keys:
+            self.remove(identifier)
+
+    def move(self, identifier, before=None):
+        """
+        Move **identifier** to the end or in front of the identifier **before**.
+        """
+        key = self._getKey(identifier)
+        if before is not None:
+            before = self._getKey(before)
+        self._entries.move(key, before)
+        self._list = None
+
+    def index(self, identifier):
+        """
+        Return the position of **identifier**.
+        """
+        if identifier not in self._keys:
+            raise ValueError("%r is not in the list" % (identifier,))
+        return self._entries.index(self._getKey(identifier))
+
+    def getIdentifier(self, key):
+        return self._identifiers[key]
+
+    def getKeys(self):
+        """
+        Return the keys of the entries in order. The list is
+        shared until the list changes and must not be modified.
+        """
+        return self._entries.getList()
+
+    def clear(self):
+        self._entries.clear()
+        self._keys = {}
+        self._identifiers = {}
+        self._list = None
+
+    def getList(self):
+        """
+        Return the identifiers as a list. The list is shared
+        until the list changes and must not be modified.
+        """
+        if self._list is None:
+            identifiers = self._identifiers
+            self._list = [identifiers[key] for key in self._entries.getList()]
+        return self._list
+
+
+class ToolbarModel(object):
+
+    """
+    The items and identifier lists of a toolbar.
+
+    Items are stored by identifier together with the identifier
+    lists NSToolbar asks for. The items themselves are opaque
+    to the model.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.callbackWrappers = {}
+        self.defaultIdentifiers = OrderedIdentifierList(isRepeatable=isStandardIdentifier)
+        self.allowedIdentifiers = OrderedIdentifierSet()
+        self.selectableIdentifiers = OrderedIdentifierSet()
+
+    def __contains__(self, identifier):
+        return identifier in self.allowedIdentifiers
+
+    def addItem(self, identifier, item=None, visibleByDefault=True, selectable=False, callbackWrapper=None, before=None):
+        """
+        Add an item. **item** may be `None` for identifiers that
+        AppKit creates the item for, such as the standard items.
+        Standard items can be added more than once.
+
+        Returns the key of the entry in the default identifiers
+        or `None` if the item is not visible by default.
+        """
+        self.allowedIdentifiers.add(identifier)
+        defaultKey = None
+        if visibleByDefault:
+            if before is not None and before not in self.defaultIdentifiers:
+                before = None
+            defaultKey = self.defaultIdentifiers.add(identifier, before)
+        if selectable:
+            self.selectableIdentifiers.add(identifier)
+        if item is not None:
+            self.items[identifier] = item
+        if callbackWrapper is not None:
+            self.callbackWrappers[identifier] = callbackWrapper
+        return defaultKey
+
+    def addAllowedIdentifier(self, identifier):
+        """
+        Allow **identifier** in the customization palette
+        without showing it by default.
+        """
+        self.allowedIdentifiers.add(identifier)
+
+    def removeItem(self, identifier):
+        """
+        Remove an item and return it.
+        """
+        self.allowedIdentifiers.discard(identifier)
+        self.defaultIdentifiers.discard(identifier)
+        self.selectableIdentifiers.discard(identifier)
+        self.callbackWrappers.pop(identifier, None)
+        return self.items.pop(identifier, None)
+
+    def moveItem(self, identifier, before=None):
+        """
+        Move a default item to the end or in front of the identifier **before**.
+        """
+        self.defaultIdentifiers.move(identifier, before)
+
+    def getDefaultIndex(self, identifier):
+        """
+        Return the position of **identifier** in the default identifiers.
+        """
+        return self.defaultIdentifiers.index(identifier)
+
+    def clear(self):
+        self.items.clear()
+        self.callbackWrappers.clear()
+        self.defaultIdentifiers.clear()
+        self.allowedIdentifiers.clear()
+        self.selectableIdentifiers.clear()
@@ -1,4 +1,6 @@
 import platform
+import threading
+import weakref
 from objc import super
 
 from Foundation import NSObject
@@ -17,6 +19,7 @@ except ImportError:
     NSLayoutAttributeFirstBaseline = 12
 
 from vanilla.nsSubclasses import getNSSubclass
+from vanilla.profiling import instrument, measure
 
 def version(versionString):
     parts = [int(p) for p in versionString.split(".")]
@@ -59,6 +62,19 @@ osVersion10_6 = version("10.6")
 
 class VanillaBaseObject(object):
 
+    # The state every wrapper has is kept in slots.
+    # __dict__ remains available for subviews and
+    # anything else set by subclasses or callers.
+    __slots__ = (
+        "_nsObject",
+        "_posSize",
+        "_autoLayoutViews",
+        "_target",
+        "_wrapperRegistry",
+        "__dict__",
+        "__weakref__"
+    )
+
     frameAdjustments = None
 
     def __setattr__(self, attr, value):
@@ -67,6 +83,7 @@ class VanillaBaseObject(object):
     def __delattr__(self, attr):
         _delAttr(VanillaBaseObject, self, attr)
 
+    @instrument()
     def _setupView(self, classOrName, posSize, callback=None):
         cls = getNSSubclass(classOrName)
         view = cls(self)
@@ -118,6 +135,7 @@ class VanillaBaseObject(object):
             mask |= NSViewMinYMargin
         self._nsObject.setAutoresizingMask_(mask)
 
+    @instrument()
     def _setFrame(self, parentFrame, animate=False):
         if self._posSize == "auto":
             return
@@ -349,6 +367,8 @@ _reverseSizeStyleMap = {
 
 class VanillaBaseControl(VanillaBaseObject):
 
+    __slots__ = ()
+
     def _setSizeStyle(self, value):
         value = _sizeStyleMap[value]
         self._nsObject.cell().setControlSize_(value)
@@ -390,25 +410,34 @@ class VanillaBaseControl(VanillaBaseObject):
 # -------------------
 
 def _recursiveSetFrame(view):
+    # measured once for the whole tree, not for every subview
+    with measure("_recursiveSetFrame"):
+        _setSubviewFrames(view)
+
+def _setSubviewFrames(view):
     for subview in view.subviews():
         if hasattr(subview, "vanillaWrapper"):
             obj = subview.vanillaWrapper()
             if obj is not None and hasattr(obj, "_posSize"):
                 obj.setPosSize(obj.getPosSize())
-        _recursiveSetFrame(subview)
+        _setSubviewFrames(subview)
 
 def _setAttr(cls, obj, attr, value):
+    # every attribute goes through here, only adding
+    # a subview is measured, the rest is too cheap
     if hasattr(value, "getPosSize") and value.getPosSize() == "auto":
         view = value._nsObject
         view.setTranslatesAutoresizingMaskIntoConstraints_(False)
         obj._autoLayoutViews[attr] = view
     if isinstance(value, VanillaBaseObject) and hasattr(value, "_posSize"):
         assert not hasattr(obj, attr), "can't replace vanilla attribute"
-        view = obj._getContentView()
-        frame = view.frame()
-        value._setFrame(frame)
-        view.addSubview_(value._nsObject)
-        _recursiveSetFrame(value._nsObject)
+        with measure("_setAttr"):
+            view = obj._getContentView()
+            frame = view.frame()
+            value._setFrame(frame)
+            view.addSubview_(value._nsObject)
+            _recursiveSetFrame(value._nsObject)
+            _adoptWrapper(obj, value)
     #elif isinstance(value, NSView) and not attr.startswith("_"):
     #    assert not hasattr(obj, attr), "can't replace vanilla attribute"
     #    view = obj._getContentView()
@@ -422,6 +451,7 @@ def _delAttr(cls, obj, attr):
     value = getattr(obj, attr)
     if isinstance(value, VanillaBaseObject):
         value._nsObject.removeFromSuperview()
+        _getWrapperRegistry(obj).remove(value)
     #elif isinstance(value, NSView):
     #    value.removeFromSuperview()
     super(cls, obj).__delattr__(attr)
@@ -453,6 +483,7 @@ _layoutRelationMap = {
     ">=" : NSLayoutRelationGreaterThanOrEqual
 }
 
+@instrument()
 def _addAutoLayoutRules(obj, rules, metrics=None):
     view = obj._getContentView()
     if metrics is None:
@@ -522,6 +553,18 @@ def _flipFrame(parentFrame, objFrame):
 # Callback Support
 # ----------------
 
+_liveCallbackWrapperCount = 0
+# wrappers can be freed on any thread
+_liveCallbackWrapperCountLock = threading.Lock()
+
+def getLiveCallbackWrapperCount():
+    """
+    Return the number of VanillaCallbackWrapper objects that are alive.
+    This is meant for leak detection in tests.
+    """
+    return _liveCallbackWrapperCount
+
+
 class VanillaCallbackWrapper(NSObject):
 
     def __new__(cls, callback):
@@ -530,8 +573,16 @@ class VanillaCallbackWrapper(NSObject):
     def initWithCallback_(self, callback):
         self = self.init()
         self.callback = callback
+        global _liveCallbackWrapperCount
+        with _liveCallbackWrapperCountLock:
+            _liveCallbackWrapperCount += 1
         return self
 
+    def __del__(self):
+        global _liveCallbackWrapperCount
+        with _liveCallbackWrapperCountLock:
+            _liveCallbackWrapperCount -= 1
+
     def action_(self, sender):
         if hasattr(sender, "vanillaWrapper"):
             sender = sender.vanillaWrapper()
@@ -539,9 +590,105 @@ class VanillaCallbackWrapper(NSObject):
             self.callback(sender)
 
 
+# ------------------
+# Wrapper Ownership
+# ------------------
+
+class _WrapperRegistry(object):
+
+    """
+    The vanilla wrappers living in one view hierarchy.
+
+    Every wrapper that is added to another wrapper is recorded in the
+    registry of its parent and the registry of the child is merged into
+    it, so the top level object (a window or a popover) ends up owning
+    one registry that knows about all of the wrappers below it. Clearing
+    that registry breaks the cycles of all of them without walking the
+    NSView hierarchy.
+
+    The wrappers are referenced weakly. Merged registries forward to the
+    registry they were merged into.
+    """
+
+    __slots__ = ("_wrappers", "_parent")
+
+    def __init__(self):
+        self._wrappers = {} # { id(wrapper) : weakref }
+        self._parent = None
+
+    def _getRoot(self):
+        root = self
+        while root._parent is not None:
+            root = root._parent
+        # shorten the path for the next lookup
+        registry = self
+        while registry._parent is not None and registry._parent is not root:
+            registry._parent, registry = root, registry._parent
+        return root
+
+    def add(self, wrapper):
+        self._getRoot()._wrappers[id(wrapper)] = weakref.ref(wrapper)
+
+    def remove(self, wrapper):
+        self._getRoot()._wrappers.pop(id(wrapper), None)
+
+    def merge(self, other):
+        root = self._getRoot()
+        otherRoot = other._getRoot()
+        if root is otherRoot:
+            return
+        root._wrappers.update(otherRoot._wrappers)
+        otherRoot._wrappers = {}
+        otherRoot._parent = root
+
+    def getWrappers(self):
+        wrappers = []
+        for ref in list(self._getRoot()._wrappers.values()):
+            wrapper = ref()
+            if wrapper is not None:
+                wrappers.append(wrapper)
+        return wrappers
+
+    def clear(self):
+        """
+        Break the cycles of all wrappers and forget them.
+        """
+        root = self._getRoot()
+        wrappers = root._wrappers
+        root._wrappers = {}
+        for ref in wrappers.values():
+            wrapper = ref()
+            if wrapper is not None:
+                wrapper._breakCycles()
+
+
+def _getWrapperRegistry(obj):
+    registry = getattr(obj, "_wrapperRegistry", None)
+    if registry is None:
+        registry = obj._wrapperRegistry = _WrapperRegistry()
+    return registry
+
+
+def _adoptWrapper(parent, child):
+    """
+    Make **parent** responsible for breaking the cycles of **child**
+    and everything **child** owns. This is done automatically for
+    wrappers set as attributes. Objects that manage their subviews in
+    other ways, such as stack views, and code adding the view of a
+    wrapper with `addSubview_` must call this, a closing window only
+    breaks the cycles of the wrappers in its registry.
+    """
+    registry = _getWrapperRegistry(parent)
+    registry.add(child)
+    registry.merge(_getWrapperRegistry(child))
+
+
 def _breakCycles(view):
     """
     Break cyclic references by deleting _target attributes.
+
+    This walks the view hierarchy. It is only needed for views that
+    aren't owned by a vanilla wrapper, the others are registered.
     """
     if hasattr(view, "vanillaWrapper"):
         obj = view.vanillaWrapper()
@@ -1,6 +1,6 @@
 from objc import super
 from AppKit import NSBox, NSColor, NSFont, NSSmallControlSize, NSNoTitle, NSLineBorder, NSBoxSeparator, NSBoxCustom
-from vanilla.vanillaBase import VanillaBaseObject, _breakCycles, osVersionCurrent, osVersion10_10
+from vanilla.vanillaBase import VanillaBaseObject, osVersionCurrent, osVersion10_10
 
 
 class Box(VanillaBaseObject):
@@ -96,12 +96,6 @@ class Box(VanillaBaseObject):
     def _getContentView(self):
         return self._nsObject.contentView()
 
-    def _breakCycles(self):
-        super()._breakCycles()
-        view = self._nsObject.contentView()
-        if view is not None:
-            _breakCycles(view)
-
     def setTitle(self, title):
         """
         Set the title of the box.
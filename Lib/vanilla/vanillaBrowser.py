@@ -4,13 +4,19 @@ I beleive that demo was written by Just van Rossum.
 """
 
 import AppKit
-from objc import python_method
-from operator import getitem, setitem
+from objc import python_method, super
 
+import functools
 import inspect
+import os
+import weakref
 
 from vanilla.vanillaBase import VanillaBaseObject
 from vanilla.nsSubclasses import getNSSubclass
+from vanilla.objectBrowserModel import ChildPager, ChildFilter, TimedOutValue, SIMPLE_TYPES, \
+    defaultPageSize, defaultFilterRules, loadNameSet, getArguments, describeValue
+from vanilla.objectBrowserLoading import IntrospectionJob, defaultAttributeTimeout
+from vanilla.objectBrowserSearch import SearchJob, defaultMaxDepth, defaultMaxNodes
 
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
@@ -35,10 +41,37 @@ class ObjectBrowser(VanillaBaseObject):
     size of the browser.
 
     **obj** The object to be displayed.
+
+    **pageSize** The number of children of an object that are loaded
+    at once. A *Load More* row is shown below the loaded children,
+    double click it to load the next page.
+
+    **asynchronous** If `True` the children of an object are read in a
+    background thread when it is expanded. A *Loading* row is shown
+    until they are ready.
+
+    **attributeTimeout** The time in seconds reading a single child may
+    take when **asynchronous** is `True`. Children that take longer are
+    shown as timed out and skipped.
+
+    **filterRules** A list of rules hiding children. `None` hides private
+    attributes and the internals of PyObjC. Rules are dictionaries with
+    one of these keys:
+
+    * **private** `True` hides attributes starting with an underscore.
+    * **name** A regular expression. Matching attributes are hidden.
+    * **names** A collection of attribute names to hide.
+    * **type** A class, a tuple of classes or a class name. Children
+      that are instances of it are hidden.
+
+    Attributes with the name of an AppKit or Foundation object are hidden too.
+
+    The objects can be searched by name and value with `search`.
     """
 
-    def __init__(self, posSize, obj):
-        self._model = PythonBrowserModel.alloc().initWithObject_(obj)
+    def __init__(self, posSize, obj, pageSize=defaultPageSize, asynchronous=False, attributeTimeout=defaultAttributeTimeout, filterRules=None):
+        self._settings = BrowserSettings(pageSize=pageSize, asynchronous=asynchronous, attributeTimeout=attributeTimeout, filterRules=filterRules)
+        self._model = PythonBrowserModel.alloc().initWithObject_settings_(obj, self._settings)
 
         self._posSize = posSize
 
@@ -76,28 +109,215 @@ class ObjectBrowser(VanillaBaseObject):
 
         self._outlineView.setDataSource_(self._model)
         self._outlineView.setDelegate_(self._model)
+        self._outlineView.setTarget_(self._model)
+        self._outlineView.setDoubleAction_("outlineViewDoubleClick:")
+
+        self._settings.outlineView = self._outlineView
+        self._searchJob = None
 
         self._nsObject.setDocumentView_(self._outlineView)
         self._setAutosizingFromPosSize(posSize)
 
+    def _breakCycles(self):
+        super()._breakCycles()
+        self._settings.cancelJobs()
+        self._searchJob = None
+        self._settings.outlineView = None
+
     def getNSScrollView(self):
         return self._nsObject
 
     def getNSOutlineView(self):
         return self._outlineView
 
+    def getFilterRules(self):
+        """
+        Get the rules hiding children.
+        """
+        return list(self._settings.filterRules)
+
+    def setFilterRules(self, rules):
+        """
+        Set the rules hiding children. See *filterRules* in the
+        constructor. `None` restores the default rules.
+        """
+        self._settings.setFilterRules(rules)
+        self._searchJob = None
+        self._model.setObject_(self._model.root.object)
+        self._outlineView.reloadData()
+
+    def search(self, query, callback=None, maxDepth=defaultMaxDepth, maxNodes=defaultMaxNodes, searchValues=True, revealLimit=100):
+        """
+        Search the objects for children with a name, or a simple value
+        if **searchValues** is `True`, containing **query**, ignoring case.
+
+        The objects are walked breadth first in a background thread, up to
+        **maxDepth** levels deep and **maxNodes** children. Every object is
+        only looked at once. Matches are revealed in the browser as they are
+        found, up to **revealLimit** of them, and the first one is selected.
+        Matches below children that are still loading are revealed when the
+        children are loaded. A running search is cancelled.
+
+        **callback** Optional, called with a list of the paths of new matches
+        while the search runs and with `finished=True` as keyword argument when
+        it is done. A path is a tuple with the names of the children leading
+        to the match and can be given to `revealPath`.
+        """
+        self.cancelSearch()
+        revealed = []
+
+        def found(paths, finished=False):
+            for path in paths:
+                if len(revealed) >= revealLimit:
+                    break
+                # reveals can be delayed, so only the first is selected
+                self.revealPath(path, select=not revealed)
+                revealed.append(path)
+            if finished:
+                self._settings.jobs.discard(job)
+                if self._searchJob is job:
+                    self._searchJob = None
+            if callback is not None:
+                callback(paths, finished=finished)
+
+        job = SearchJob(
+            self._model.root.object,
+            query,
+            found,
+            childFilter=self._settings.getChildFilter(True),
+            maxDepth=maxDepth,
+            maxNodes=maxNodes,
+            searchValues=searchValues,
+            callOnMainThread=_callOnMainThread
+        )
+        self._searchJob = job
+        self._settings.jobs.add(job)
+        job.start()
+
+    def cancelSearch(self):
+        """
+        Stop a running search.
+        """
+        if self._searchJob is not None:
+            self._searchJob.cancel()
+            self._settings.jobs.discard(self._searchJob)
+            self._searchJob = None
+
+    def isSearching(self):
+        return self._searchJob is not None
+
+    def revealPath(self, path, select=True):
+        """
+        Expand the items leading to the child at **path**, a tuple with
+        the names of the children from the root down, and scroll it into view.
+        If **select** is `True` the child is selected.
+
+        If the children of an item on the path are being loaded in the
+        background, the path is revealed once they are loaded.
+
+        Returns `True` if the child was revealed.
+        """
+        item = self._model.root
+        items = []
+        for name in path:
+            index = item._findChild(name)
+            if index is None:
+                return False
+            if index is _childrenLoading:
+                selfRef = weakref.ref(self)
+                root = self._model.root
+
+                def reveal():
+                    browser = selfRef()
+                    if browser is not None and browser._model.root is root:
+                        browser.revealPath(path, select)
+
+                item._callWhenLoaded(reveal)
+                return False
+            item = item.getChild(index)
+            items.append(item)
+        if not items:
+            return False
+        outlineView = self._outlineView
+        for parentItem in items[:-1]:
+            outlineView.expandItem_(parentItem)
+        row = outlineView.rowForItem_(items[-1])
+        if row < 0:
+            return False
+        if select:
+            outlineView.selectRowIndexes_byExtendingSelection_(AppKit.NSIndexSet.indexSetWithIndex_(row), False)
+        outlineView.scrollRowToVisible_(row)
+        return True
+
+
+class BrowserSettings(object):
+
+    """The settings shared by the items of one browser."""
+
+    def __init__(self, pageSize=defaultPageSize, asynchronous=False, attributeTimeout=defaultAttributeTimeout, filterRules=None):
+        self.pageSize = pageSize
+        self.asynchronous = asynchronous
+        self.attributeTimeout = attributeTimeout
+        self.outlineView = None
+        self.rootItem = None
+        self.jobs = set()
+        self.setFilterRules(filterRules)
+
+    def setFilterRules(self, rules):
+        if rules is None:
+            rules = defaultFilterRules
+        self.filterRules = list(rules)
+        # compiled when first needed
+        self._childFilters = {}
+
+    def getChildFilter(self, ignoreAppKit=True):
+        childFilter = self._childFilters.get(ignoreAppKit)
+        if childFilter is None:
+            rules = self.filterRules
+            if ignoreAppKit:
+                rules = rules + [dict(names=getAppKitNames())]
+            childFilter = self._childFilters[ignoreAppKit] = ChildFilter(rules)
+        return childFilter
+
+    def reloadItem(self, item, reloadChildren=True):
+        outlineView = self.outlineView
+        if outlineView is None:
+            return
+        if item is self.rootItem:
+            outlineView.reloadData()
+        else:
+            outlineView.reloadItem_reloadChildren_(item, reloadChildren)
+
+    def cancelJobs(self):
+        for job in list(self.jobs):
+            job.cancel()
+        self.jobs.clear()
+
 
 class PythonBrowserModel(AppKit.NSObject):
 
     """This is a delegate as well as a data source for NSOutlineViews."""
 
     def initWithObject_(self, obj):
+        return self.initWithObject_settings_(obj, BrowserSettings())
+
+    def initWithObject_settings_(self, obj, settings):
         self = self.init()
+        self.settings = settings
         self.setObject_(obj)
         return self
 
     def setObject_(self, obj):
-        self.root = PythonItem("<root>", obj, None, None)
+        self.settings.cancelJobs()
+        self.root = PythonItem("<root>", obj, None, None, settings=self.settings)
+        self.settings.rootItem = self.root
+
+    def outlineViewDoubleClick_(self, view):
+        item = view.itemAtRow_(view.clickedRow())
+        if isinstance(item, LoadMorePythonItem):
+            parentItem = item.parentItem
+            parentItem.loadMore()
+            self.settings.reloadItem(parentItem)
 
     # NSOutlineViewDataSource  methods
 
@@ -133,41 +353,6 @@ class PythonBrowserModel(AppKit.NSObject):
         ## addig a tooltip, use the __doc__ from the object
         return item.getDoc(), rect
 
-# objects of these types are not eligable for expansion in the outline view
-SIMPLE_TYPES = (str, int, float, complex)
-
-def getChilderen(root):
-    childeren = []
-
-    for name, obj in inspect.getmembers(root):
-        ## ignore private methods and attributes
-        if name.startswith("_"):
-            continue
-        ## ignore imported modules
-        #elif inspect.ismodule(obj):
-        #    continue
-        ## ignore methods and attributed usind in pyobjc
-        elif name.startswith("pyobjc_"):
-            continue
-        ## ignore methods and attributed usind in pyobjc
-        elif type(obj).__name__ in ["native_selector"]:
-            continue
-        childeren.append(name)
-
-    return childeren
-
-
-def getArguments(obj):
-    """
-    Return all arguments for a method of function
-    and leave 'self' out.
-    """
-    try:
-        sig = inspect.signature(obj)
-        arguments = ", ".join(sig.parameters.keys())
-    except TypeError:
-        arguments = ""
-    return arguments.replace("self, ", "").replace("self", "")
 
 class PythonItem(AppKit.NSObject):
 
@@ -184,7 +369,7 @@ class PythonItem(AppKit.NSObject):
         # "Pythonic" constructor
         return cls.alloc().init()
 
-    def __init__(self, name, obj, parent, setvalue, ignoreAppKit=True):
+    def __init__(self, name, obj, parent, setvalue, ignoreAppKit=True, pageSize=defaultPageSize, settings=None, description=None):
         self.realName = name
         self.name = str(name)
         self.parent = parent
@@ -192,6 +377,9 @@ class PythonItem(AppKit.NSObject):
         self.type = type(obj).__name__
         if obj is None:
             self.value = "None"
+        elif isinstance(obj, TimedOutValue):
+            self.type = ""
+            self.value = "Timed Out"
         elif not isinstance(obj, SIMPLE_TYPES):
             self.value = ""
         else:
@@ -202,79 +390,164 @@ class PythonItem(AppKit.NSObject):
             obj = obj.callable
 
         self.object = obj
+        self.ignoreAppKit = ignoreAppKit
+        if settings is None:
+            settings = BrowserSettings(pageSize=pageSize)
+        self.settings = settings
+        self.pageSize = settings.pageSize
+        # the children are loaded a page at a time when they are first needed
         self.children = []
-
-        self.getters = dict()
         self.setters = dict()
-        if isinstance(obj, dict):
-            self.children = sorted(obj.keys())
-            self._setGetters(self.children, getitem)
-            self._setSetters(self.children, setitem)
-        elif obj is None or isinstance(obj, SIMPLE_TYPES):
-            pass
-        elif isinstance(obj, (list, tuple, set)):
-            self.children = list(range(len(obj)))
-            self._setGetters(self.children, getitem)
-            self._setSetters(self.children, setitem)
-        elif isinstance(obj, property):
-            pass
-        elif inspect.ismethod(obj):
-            self.arguments = getArguments(obj)
-        elif inspect.isfunction(obj):
+        self._childValues = []
+        self._childPager = None
+        self._firstPageLoaded = False
+        self._loadMoreItem = None
+        self._loadingItem = None
+        self._job = None
+        self._whenLoaded = []
+        self._childDescriptions = []
+        self._expandable = None
+
+        if description is not None:
+            # computed with the value by the introspection job
+            self._expandable, self.arguments = description
+        elif settings.asynchronous:
+            # don't run code of the object on the main thread,
+            # anything but a simple value may have children
+            self._expandable = not (obj is None or isinstance(obj, SIMPLE_TYPES + (TimedOutValue,)))
+        elif inspect.ismethod(obj) or inspect.isfunction(obj):
             self.arguments = getArguments(obj)
-        else:
-            try:
-                l = list(obj)
-                self.children = list(range(len(l)))
-                self._setGetters(self.children, getitem)
-                self._setSetters(self.children, setitem)
-            except:
-                pass
-
-            try:
-                d = dict(obj)
-                self.children = sorted(d.keys())
-                self._setGetters(self.children, getitem)
-                self._setSetters(self.children, setitem)
-            except:
-                pass
-            children = getChilderen(obj)
-            self._setGetters(children, getattr)
-            self._setSetters(children, setattr)
-            self.children += children
-
-            if inspect.isclass(obj) and hasattr(obj, "__init__"):
-                self.arguments = getArguments(getattr(obj, "__init__"))
-
-        if ignoreAppKit:
-            self.children = [child for child in self.children if not (isinstance(child, str) and hasattr(AppKit, child))]
+        elif inspect.isclass(obj) and hasattr(obj, "__init__"):
+            self.arguments = getArguments(getattr(obj, "__init__"))
 
         self._childRefs = {}
 
     @python_method
-    def _setSetters(self, names, callback):
-        for name in names:
-            self.setters[name] = callback
+    def _getChildPager(self):
+        if self._childPager is None:
+            childFilter = self.settings.getChildFilter(self.ignoreAppKit)
+            self._childPager = ChildPager(self.object, self.pageSize, childFilter)
+        return self._childPager
+
+    @python_method
+    def _loadFirstPage(self):
+        if not self._firstPageLoaded:
+            self._firstPageLoaded = True
+            self.loadMore()
+
+    @python_method
+    def _addChildren(self, children):
+        for child in children:
+            name, value, setter = child[:3]
+            self.children.append(name)
+            self._childValues.append(value)
+            self._childDescriptions.append(child[3] if len(child) > 3 else None)
+            self.setters[name] = setter
+
+    @python_method
+    def loadMore(self):
+        """
+        Load the next page of children. In asynchronous
+        mode this returns before the page is loaded.
+        """
+        pager = self._getChildPager()
+        if not self.settings.asynchronous:
+            self._addChildren(pager.loadNextPage())
+            return
+        if self._job is not None:
+            return
+        self._job = IntrospectionJob(
+            pager,
+            self._pageLoaded,
+            progressCallback=self._pageProgress,
+            attributeTimeout=self.settings.attributeTimeout,
+            describeChild=functools.partial(describeValue, childFilter=pager.childFilter),
+            callOnMainThread=_callOnMainThread
+        )
+        self.settings.jobs.add(self._job)
+        self._job.start()
+
+    @python_method
+    def _findChild(self, name):
+        # Return the index of the child with name, loading pages
+        # until it is found. In asynchronous mode the next page is
+        # loaded in the background and _childrenLoading is returned,
+        # use _callWhenLoaded to try again.
+        self._loadFirstPage()
+        start = 0
+        while True:
+            for index in range(start, len(self.children)):
+                if self.children[index] == name:
+                    return index
+            start = len(self.children)
+            if self.isLoading():
+                return _childrenLoading
+            if not self.hasMore():
+                return None
+            if self.settings.asynchronous:
+                self.loadMore()
+                return _childrenLoading
+            self._addChildren(self._getChildPager().loadNextPage())
+            self.settings.reloadItem(self)
+
+    @python_method
+    def _callWhenLoaded(self, function):
+        # call function after the page that is loading is loaded
+        self._whenLoaded.append(function)
+
+    @python_method
+    def _pageLoaded(self, children):
+        self.settings.jobs.discard(self._job)
+        self._job = None
+        self._addChildren(children)
+        self.settings.reloadItem(self)
+        whenLoaded = self._whenLoaded
+        self._whenLoaded = []
+        for function in whenLoaded:
+            function()
 
     @python_method
-    def _setGetters(self, names, callback):
-        for name in names:
-            self.getters[name] = callback
+    def _pageProgress(self, done, count):
+        if self._loadingItem is not None:
+            self._loadingItem.value = "%s of %s" % (done, count)
+            self.settings.reloadItem(self._loadingItem, False)
+
+    @python_method
+    def isLoading(self):
+        return self._job is not None
+
+    @python_method
+    def hasMore(self):
+        return self._getChildPager().hasMore()
 
     def isExpandable(self):
-        return bool(self.children)
+        # this doesn't load the children
+        if self._expandable is None:
+            self._expandable = self._getChildPager().getCount() > 0
+        return self._expandable
 
     @python_method
     def getChild(self, child):
         if child in self._childRefs:
             return self._childRefs[child]
 
+        self._loadFirstPage()
+        if child >= len(self.children):
+            if self.isLoading():
+                if self._loadingItem is None:
+                    self._loadingItem = LoadingPythonItem(self)
+                return self._loadingItem
+            if self._loadMoreItem is None:
+                self._loadMoreItem = LoadMorePythonItem(self)
+            self._loadMoreItem.update()
+            return self._loadMoreItem
+
         name = self.children[child]
-        getter = self.getters.get(name)
         setter = self.setters.get(name)
-        obj = getter(self.object, name)
+        obj = self._childValues[child]
+        description = self._childDescriptions[child]
 
-        childObj = self.__class__(name, obj, self.object, setter)
+        childObj = self.__class__(name, obj, self.object, setter, ignoreAppKit=self.ignoreAppKit, settings=self.settings, description=description)
         self._childRefs[child] = childObj
         return childObj
 
@@ -285,7 +558,106 @@ class PythonItem(AppKit.NSObject):
         return None
 
     def __len__(self):
-        return len(self.children)
+        self._loadFirstPage()
+        count = len(self.children)
+        if self.isLoading() or self.hasMore():
+            # the loading or load more row
+            count += 1
+        return count
+
+
+class PlaceholderPythonItem(PythonItem):
+
+    """A row below the children of an item that isn't a child."""
+
+    title = ""
+
+    def __init__(self, parentItem):
+        super().__init__(self.title, None, parentItem.object, None, settings=parentItem.settings)
+        self.parentItem = parentItem
+        self.value = ""
+        self.type = ""
+
+    def isExpandable(self):
+        return False
+
+    def getDoc(self):
+        return None
+
+    def __len__(self):
+        return 0
+
+
+class LoadingPythonItem(PlaceholderPythonItem):
+
+    """The row shown below the loaded children while a page loads."""
+
+    title = "Loading\u2026"
+
+
+class LoadMorePythonItem(PlaceholderPythonItem):
+
+    """The row shown below the loaded children when there are more."""
+
+    title = "Load More\u2026"
+
+    @python_method
+    def update(self):
+        pager = self.parentItem._getChildPager()
+        remaining = pager.getCount() - len(self.parentItem.children)
+        if remaining > 0:
+            self.value = "%s more" % remaining
+        else:
+            self.value = ""
+
+    def getDoc(self):
+        return "Double click to load the next %s children." % self.parentItem.pageSize
+
+
+# returned by PythonItem._findChild while the children load
+_childrenLoading = object()
+
+
+def _callOnMainThread(function):
+    from PyObjCTools.AppHelper import callAfter
+    callAfter(function)
+
+
+_appKitNames = None
+_appKitNameCacheDirectory = None
+
+
+def setAppKitNameCacheDirectory(directory):
+    """
+    Store the names of the AppKit and Foundation objects in **directory**
+    so later sessions don't have to collect them again. `None` turns
+    storing them off.
+    """
+    global _appKitNameCacheDirectory
+    _appKitNameCacheDirectory = directory
+
+
+def getAppKitNames():
+    """
+    Return a frozenset with the names of the AppKit and Foundation
+    objects. It is built once, asking the lazy PyObjC modules about
+    every name is much slower.
+    """
+    global _appKitNames
+    if _appKitNames is None:
+        import objc
+        import platform
+        import Foundation
+
+        def computeNames():
+            return set(dir(AppKit)) | set(dir(Foundation))
+
+        cachePath = None
+        if _appKitNameCacheDirectory is not None:
+            cachePath = os.path.join(_appKitNameCacheDirectory, "objectBrowserAppKitNames.json")
+        cacheKey = "%s-%s" % (objc.__version__, platform.mac_ver()[0])
+        _appKitNames = loadNameSet(computeNames, cachePath, cacheKey)
+    return _appKitNames
 
 
 if __name__ == "__main__":
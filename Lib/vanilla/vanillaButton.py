@@ -1,5 +1,6 @@
 from AppKit import NSButton, NSImage, NSBundle, NSRoundedBezelStyle, NSShadowlessSquareBezelStyle, NSHelpButtonBezelStyle, NSMomentaryPushInButton, NSCommandKeyMask, NSControlKeyMask, NSAlternateKeyMask, NSShiftKeyMask, NSAlphaShiftKeyMask, NSHelpFunctionKey, NSHomeFunctionKey, NSEndFunctionKey, NSPageUpFunctionKey, NSPageDownFunctionKey, NSDeleteFunctionKey, NSLeftArrowFunctionKey, NSRightArrowFunctionKey, NSUpArrowFunctionKey, NSDownArrowFunctionKey, NSImageLeft, NSImageRight, NSImageAbove, NSImageBelow, NSImageOnly, NSTextAlignmentRight, NSTextAlignmentLeft, NSNoCellMask
 from vanilla.vanillaBase import VanillaBaseControl
+from vanilla.imageCache import imageFromPath
 try:
     from AppKit import (
         NSEventModifierFlagCapsLock,
@@ -313,7 +314,7 @@ class ImageButton(SquareButton):
         super().__init__(posSize, title=title, callback=callback, sizeStyle=sizeStyle)
         image = None
         if imagePath is not None:
-            image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+            image = imageFromPath(imagePath)
         elif imageNamed is not None:
             image = NSImage.imageNamed_(imageNamed)
         elif imageObject is not None:
@@ -346,7 +347,7 @@ class ImageButton(SquareButton):
         .. note:: Only one of *imagePath*, *imageNamed*, *imageObject* should be set.
         """
         if imagePath is not None:
-            image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+            image = imageFromPath(imagePath)
         elif imageNamed is not None:
             image = NSImage.imageNamed_(imageNamed)
         elif imageObject is not None:
@@ -1,6 +1,6 @@
 from Foundation import NSMaxXEdge, NSMaxYEdge, NSMinXEdge, NSMinYEdge
 from AppKit import NSDrawer
-from vanilla.vanillaBase import VanillaBaseObject, _breakCycles
+from vanilla.vanillaBase import VanillaBaseObject, _adoptWrapper
 
 
 _drawerEdgeMap = {
@@ -96,6 +96,8 @@ class Drawer(VanillaBaseObject):
         if maxSize:
             drawer.setMaxContentSize_(maxSize)
         if isinstance(parentWindow, Window):
+            # the window breaks the cycles of the drawer's controls
+            _adoptWrapper(parentWindow, self)
             parentWindow = parentWindow._window
         drawer.setParentWindow_(parentWindow)
 
@@ -110,12 +112,6 @@ class Drawer(VanillaBaseObject):
     def _getContentView(self):
         return self._nsObject.contentView()
 
-    def _breakCycles(self):
-        super()._breakCycles()
-        view = self._getContentView()
-        if view is not None:
-            _breakCycles(view)
-
     def open(self):
         """
         Open the drawer.
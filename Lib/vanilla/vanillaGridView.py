@@ -1,5 +1,7 @@
 import AppKit
 from vanilla import VanillaBaseObject
+from vanilla.vanillaBase import _adoptWrapper
+from vanilla.gridViewLayout import planGrid, planCell, mergeRanges, diffRows, editColumns
 
 columnPlacements = dict(
     leading=AppKit.NSGridCellPlacementLeading,
@@ -125,6 +127,9 @@ class GridView(VanillaBaseObject):
       overrides the GridView level row placement.
     * **rowAlignment** (optional) An alignment for the row that
       overrides the GridView level row placement.
+    * **identifier** (optional) A hashable object identifying the
+      row in `setRows`. Rows without an identifier are identified
+      by their views.
 
     Cells are defined with either a Vanilla object, a NSView
     (or NSView subclass) object, None, or a dictionary with
@@ -236,12 +241,6 @@ class GridView(VanillaBaseObject):
         if columnPlacement is not None:
             column.setXPlacement_(columnPlacements[columnPlacement])
 
-    def _populateColumns(self, columns):
-        gridView = self.getNSGridView()
-        for columnIndex, cells in enumerate(columns):
-            column = gridView.columnAtIndex_(columnIndex)
-            self._populateColumn(column, cells)
-
     def _populateColumn(self, column, cells):
         gridView = self.getNSGridView()
         columnIndex = gridView.indexOfColumn_(column)
@@ -251,48 +250,35 @@ class GridView(VanillaBaseObject):
     def _buildRows(self, rows):
         gridView = self.getNSGridView()
         rows = self._normalizeRows(rows)
-        for rowIndex in range(len(rows)):
-            gridView.addRowWithViews_([])
-        # set row attributes
-        for rowIndex, rowData in enumerate(rows):
-            row = gridView.rowAtIndex_(rowIndex)
+        self._rowModel = [self._getRowModelItem(rowData) for rowData in rows]
+        # add the rows with their views, one call per row
+        emptyContentView = AppKit.NSGridCell.emptyContentView()
+        for rowData in rows:
+            views = [
+                emptyContentView if cellData is None else self._adoptView(cellData["view"])
+                for cellData in rowData["cells"]
+            ]
+            row = gridView.addRowWithViews_(views)
             self._setRowAttributes(row, rowData)
+        # plan the merges and cells. the sizes of the columns
+        # and rows are only requested for views that need them.
+        plan = planGrid(
+            [rowData["cells"] for rowData in rows],
+            getIntrinsicSize=lambda view: _getNSView(view).intrinsicContentSize(),
+            getFittingSize=lambda view: _getNSView(view).fittingSize(),
+            getColumnWidth=lambda columnIndex: gridView.columnAtIndex_(columnIndex).width(),
+            getRowHeight=lambda rowIndex: gridView.rowAtIndex_(rowIndex).height()
+        )
         # merge cells
-        mergers = {}
-        for rowIndex, rowData in enumerate(rows):
-            rowMergers = [[]]
-            for columnIndex, cell in enumerate(rowData["cells"]):
-                if cell is None:
-                    rowMergers[-1].append(columnIndex)
-                else:
-                    if rowMergers[-1]:
-                        rowMergers.append([])
-            if rowMergers[0]:
-                mergers[rowIndex] = rowMergers
-        for rowIndex, rowMergers in sorted(mergers.items()):
-            for merger in rowMergers:
-                if not merger:
-                    continue
-                start = merger[0] - 1
-                # can't merge first column with a nonexistent previous column
-                if start == -1:
-                    continue
-                end = merger[-1] + 1
-                length = end - start
-                gridView.mergeCellsInHorizontalRange_verticalRange_(
-                    AppKit.NSMakeRange(start, length),
-                    AppKit.NSMakeRange(rowIndex, 1)
-                )
-        # populate columns
-        columns = {}
-        for rowData in rows:
-            cells = rowData["cells"]
-            for columnIndex, view in enumerate(cells):
-                if columnIndex not in columns:
-                    columns[columnIndex] = []
-                columns[columnIndex].append(view)
-        columns = [cells for columnIndex, cells in sorted(columns.items())]
-        self._populateColumns(columns)
+        for rowIndex, start, length in plan["merges"]:
+            gridView.mergeCellsInHorizontalRange_verticalRange_(
+                AppKit.NSMakeRange(start, length),
+                AppKit.NSMakeRange(rowIndex, 1)
+            )
+        # cell attributes and size constraints
+        for rowIndex, columnIndex, view, cellPlan in plan["cells"]:
+            cell = gridView.cellAtColumnIndex_rowIndex_(columnIndex, rowIndex)
+            self._applyCellPlan(cell, _getNSView(view), cellPlan)
 
     def _setRowAttributes(self, row, rowData):
         height = rowData["height"]
@@ -308,6 +294,98 @@ class GridView(VanillaBaseObject):
         if rowAlignment is not None:
             row.setRowAlignment_(rowAlignments[rowAlignment])
 
+    def _getCellSignature(self, cellData):
+        # views are held by the keys, so their ids can't be reused.
+        if cellData is None:
+            return None
+        return (
+            _ViewKey(cellData["view"]),
+            cellData.get("width"),
+            cellData.get("height"),
+            cellData.get("columnPlacement"),
+            cellData.get("rowPlacement"),
+            cellData.get("rowAlignment")
+        )
+
+    def _getRowModelItem(self, rowData):
+        # (identifier, signature) of a normalized row. the signature
+        # holds everything that is applied to the grid for the row.
+        signature = (
+            tuple(self._getCellSignature(cellData) for cellData in rowData["cells"]),
+            rowData.get("height"),
+            tuple(rowData["rowPadding"]),
+            rowData.get("rowPlacement"),
+            rowData.get("rowAlignment")
+        )
+        return rowData.get("identifier"), signature
+
+    def _getRowModelKeys(self, rowModel):
+        # rows without an identifier are keyed by their views.
+        # rows without views can have the same base key,
+        # so the keys are made unique with an occurrence count
+        counts = {}
+        keyed = []
+        for key, signature in rowModel:
+            if key is None:
+                key = tuple(None if cell is None else cell[0] for cell in signature[0])
+            count = counts.get(key, 0)
+            counts[key] = count + 1
+            keyed.append(((key, count), signature))
+        return keyed
+
+    def _insertRowData(self, index, rowData):
+        gridView = self.getNSGridView()
+        emptyContentView = AppKit.NSGridCell.emptyContentView()
+        views = [
+            emptyContentView if cellData is None else self._adoptView(cellData["view"])
+            for cellData in rowData["cells"]
+        ]
+        row = gridView.insertRowAtIndex_withViews_(index, views)
+        self._setRowAttributes(row, rowData)
+        for rowIndex, start, length in mergeRanges([rowData["cells"]]):
+            gridView.mergeCellsInHorizontalRange_verticalRange_(
+                AppKit.NSMakeRange(start, length),
+                AppKit.NSMakeRange(index, 1)
+            )
+        for columnIndex, cellData in enumerate(rowData["cells"]):
+            if cellData is None:
+                continue
+            self._planAndApplyCell(columnIndex, index, _getNSView(cellData["view"]), cellData)
+
+    def _updateRowData(self, index, oldSignature, rowData):
+        gridView = self.getNSGridView()
+        newSignature = self._getRowModelItem(rowData)[1]
+        oldCells = oldSignature[0]
+        newCells = newSignature[0]
+        mergePattern = [cell is None for cell in newCells]
+        if len(oldCells) != len(newCells) or [cell is None for cell in oldCells] != mergePattern:
+            # merged cells can't be split, replace the row
+            self._removeRow(index)
+            self._insertRowData(index, rowData)
+            return
+        # attributes that are not given anymore go back to the defaults
+        row = gridView.rowAtIndex_(index)
+        row.setHeight_(AppKit.NSGridViewSizeForContent)
+        row.setYPlacement_(AppKit.NSGridCellPlacementInherited)
+        row.setRowAlignment_(AppKit.NSGridRowAlignmentInherited)
+        self._setRowAttributes(row, rowData)
+        for columnIndex, cellData in enumerate(rowData["cells"]):
+            if oldCells[columnIndex] != newCells[columnIndex]:
+                cell = gridView.cellAtColumnIndex_rowIndex_(columnIndex, index)
+                cell.setXPlacement_(AppKit.NSGridCellPlacementInherited)
+                cell.setYPlacement_(AppKit.NSGridCellPlacementInherited)
+                cell.setRowAlignment_(AppKit.NSGridRowAlignmentInherited)
+                cell.setCustomPlacementConstraints_([])
+                self._populateCell(columnIndex, index, cellData)
+
+    def _editRowModelColumns(self, operation):
+        # keep the cells of the model in the order of the columns
+        cellRows = editColumns([signature[0] for key, signature in self._rowModel], operation)
+        self._rowModel = [
+            (key, (cells,) + signature[1:])
+            for (key, signature), cells in zip(self._rowModel, cellRows)
+        ]
+
     def _populateRow(self, row, cells):
         gridView = self.getNSGridView()
         rowIndex = gridView.indexOfRow_(row)
@@ -318,36 +396,35 @@ class GridView(VanillaBaseObject):
         if cellData is None:
             return
         gridView = self.getNSGridView()
-        view = cellData["view"]
-        if isinstance(view, VanillaBaseObject):
-            view = view._nsObject
+        view = self._adoptView(cellData["view"])
         cell = gridView.cellAtColumnIndex_rowIndex_(columnIndex, rowIndex)
         cell.setContentView_(view)
-        columnPlacement = cellData.get("columnPlacement")
-        rowPlacement = cellData.get("rowPlacement")
-        rowAlignment = cellData.get("rowAlignment")
-        width = cellData.get("width")
-        height = cellData.get("height")
-        # special handling and defaults for
-        # views without an intrinsic size
-        if view.intrinsicContentSize() == (-1, -1):
-            w, h = view.fittingSize()
-            if width is None:
-                if w > 0:
-                    width = w
-                else:
-                    width = gridView.columnAtIndex_(columnIndex).width()
-            if height is None:
-                if h > 0:
-                    height = h
-                else:
-                    height = gridView.rowAtIndex_(rowIndex).height()
-            if rowAlignment is None:
-                rowAlignment = "none"
-            if columnPlacement is None:
-                columnPlacement = "leading"
-            if rowPlacement is None:
-                rowPlacement = "top"
+        self._planAndApplyCell(columnIndex, rowIndex, view, cellData)
+
+    def _planAndApplyCell(self, columnIndex, rowIndex, view, cellData):
+        gridView = self.getNSGridView()
+        cell = gridView.cellAtColumnIndex_rowIndex_(columnIndex, rowIndex)
+        cellPlan = planCell(
+            cellData,
+            getIntrinsicSize=view.intrinsicContentSize,
+            getFittingSize=view.fittingSize,
+            getColumnWidth=lambda: gridView.columnAtIndex_(columnIndex).width(),
+            getRowHeight=lambda: gridView.rowAtIndex_(rowIndex).height()
+        )
+        self._applyCellPlan(cell, view, cellPlan)
+
+    def _adoptView(self, view):
+        if isinstance(view, VanillaBaseObject):
+            _adoptWrapper(self, view)
+            view = view._nsObject
+        return view
+
+    def _applyCellPlan(self, cell, view, cellPlan):
+        columnPlacement = cellPlan["columnPlacement"]
+        rowPlacement = cellPlan["rowPlacement"]
+        rowAlignment = cellPlan["rowAlignment"]
+        width = cellPlan["width"]
+        height = cellPlan["height"]
         if columnPlacement is not None:
             cell.setXPlacement_(columnPlacements[columnPlacement])
         if rowPlacement is not None:
@@ -424,6 +501,11 @@ class GridView(VanillaBaseObject):
         self._setColumnAttributes(column, columnDescription)
         cells = self._normalizeCells(cells)
         self._populateColumn(column, cells)
+        self._editRowModelColumns((
+            "insert",
+            gridView.numberOfColumns() - 1,
+            [self._getCellSignature(cellData) for cellData in cells]
+        ))
 
     def insertColumn(self, index, cells, columnWidth=None, columnPadding=None, columnPlacement=None):
         """
@@ -442,6 +524,11 @@ class GridView(VanillaBaseObject):
         self._setColumnAttributes(column, columnDescription)
         cells = self._normalizeCells(cells)
         self._populateColumn(column, cells)
+        self._editRowModelColumns((
+            "insert",
+            index,
+            [self._getCellSignature(cellData) for cellData in cells]
+        ))
 
     def removeColumn(self, index):
         """
@@ -449,6 +536,7 @@ class GridView(VanillaBaseObject):
         """
         gridView = self.getNSGridView()
         gridView.removeColumnAtIndex_(index)
+        self._editRowModelColumns(("remove", index))
 
     def moveColumn(self, fromIndex, toIndex):
         """
@@ -456,6 +544,7 @@ class GridView(VanillaBaseObject):
         """
         gridView = self.getNSGridView()
         gridView.moveColumnAtIndex_toIndex_(fromIndex, toIndex)
+        self._editRowModelColumns(("move", fromIndex, toIndex))
 
     # ----
     # Rows
@@ -505,6 +594,7 @@ class GridView(VanillaBaseObject):
         row = gridView.addRowWithViews_([])
         self._setRowAttributes(row, rowDescription)
         self._populateRow(row, rowDescription["cells"])
+        self._rowModel.append(self._getRowModelItem(rowDescription))
 
     def insertRow(self, index, cells, rowHeight=None, rowPadding=None, rowPlacement=None, rowAlignment=None):
         """
@@ -527,11 +617,16 @@ class GridView(VanillaBaseObject):
         row = gridView.insertRowAtIndex_withViews_(index, [])
         self._setRowAttributes(row, rowDescription)
         self._populateRow(row, rowDescription["cells"])
+        self._rowModel.insert(index, self._getRowModelItem(rowDescription))
 
     def removeRow(self, index):
         """
         Remove row at *index*.
         """
+        self._removeRow(index)
+        del self._rowModel[index]
+
+    def _removeRow(self, index):
         gridView = self.getNSGridView()
         # XXX
         # removeRowAtIndex_ doesn't remove the
@@ -547,3 +642,62 @@ class GridView(VanillaBaseObject):
         """
         gridView = self.getNSGridView()
         gridView.moveRowAtIndex_toIndex_(fromIndex, toIndex)
+        self._rowModel.insert(toIndex, self._rowModel.pop(fromIndex))
+
+    def setRows(self, rows):
+        """
+        Set the rows of the grid. The rows must have the same structure
+        as the *contents* defined in *__init__*.
+
+        The new rows are compared to the current rows by their identifier,
+        or their views if they don't have one. Only the rows that are new
+        are created and only the rows that are gone are removed. Rows that
+        changed position are moved and the cells of rows with new views or
+        attributes are updated.
+        """
+        gridView = self.getNSGridView()
+        rows = self._normalizeRows(rows)
+        newRowModel = [self._getRowModelItem(rowData) for rowData in rows]
+        oldRows = self._getRowModelKeys(self._rowModel)
+        newRows = self._getRowModelKeys(newRowModel)
+        oldSignatures = dict(oldRows)
+        rowsByKey = {key: rowData for (key, signature), rowData in zip(newRows, rows)}
+        for operation in diffRows(oldRows, newRows):
+            kind = operation[0]
+            if kind == "remove":
+                self._removeRow(operation[1])
+            elif kind == "move":
+                fromIndex, toIndex = operation[1:]
+                gridView.moveRowAtIndex_toIndex_(fromIndex, toIndex)
+            elif kind == "insert":
+                index, key = operation[1:]
+                self._insertRowData(index, rowsByKey[key])
+            elif kind == "update":
+                index, key = operation[1:]
+                self._updateRowData(index, oldSignatures[key], rowsByKey[key])
+        self._rowModel = newRowModel
+
+
+class _ViewKey(object):
+
+    # Compares views by identity and keeps them alive.
+
+    __slots__ = ("view",)
+
+    def __init__(self, view):
+        self.view = view
+
+    def __eq__(self, other):
+        return isinstance(other, _ViewKey) and other.view is self.view
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return id(self.view)
+
+
+def _getNSView(view):
+    if isinstance(view, VanillaBaseObject):
+        return view._nsObject
+    return view
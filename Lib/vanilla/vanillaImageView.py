@@ -1,5 +1,8 @@
+import weakref
 from AppKit import NSImageView, NSImage, NSImageAlignCenter, NSImageAlignLeft, NSImageAlignRight, NSImageAlignTop, NSImageAlignTopLeft, NSImageAlignTopRight, NSImageAlignBottom, NSImageAlignBottomLeft, NSImageAlignBottomRight, NSScaleProportionally, NSScaleNone, NSScaleToFit
 from vanilla.vanillaBase import VanillaBaseObject
+from vanilla.imageCache import imageFromPath, getSharedImageCache
+from vanilla.imageLoading import getSharedImageLoader, cancelImageLoad
 
 _imageAlignmentMap = {
     ("center", "center") : NSImageAlignCenter,
@@ -105,7 +108,26 @@ class ImageView(VanillaBaseObject):
         """
         return self._nsObject
 
-    def setImage(self, imagePath=None, imageNamed=None, imageObject=None):
+    def _breakCycles(self):
+        cancelImageLoad(self)
+        super()._breakCycles()
+
+    def _loadImageAsynchronously(self, imagePath, placeholder=None, completionCallback=None, decode=None):
+        self._nsObject.setImage_(placeholder)
+        selfRef = weakref.ref(self)
+
+        def imageLoaded(image):
+            imageView = selfRef()
+            if image is None or imageView is None:
+                return
+            imageView._nsObject.setImage_(image)
+            if completionCallback is not None:
+                completionCallback(imageView)
+
+        getSharedImageLoader().load(self, imagePath, imageLoaded, decode=decode)
+
+    def setImage(self, imagePath=None, imageNamed=None, imageObject=None,
+            asynchronous=False, placeholder=None, completionCallback=None):
         """
         Set the image in the view.
 
@@ -116,13 +138,31 @@ class ImageView(VanillaBaseObject):
 
         **imageObject** A `NSImage`_ object.
 
+        **asynchronous** If `True` an image given with *imagePath* is decoded
+        in a background thread and set when it is ready. Images that are
+        already in the image cache are set immediately. Setting another image
+        before the decoding has finished cancels it.
+
+        **placeholder** A `NSImage`_ object that is shown while an
+        asynchronous image is decoded. Optional.
+
+        **completionCallback** Called on the main thread when an asynchronous
+        image has been set. It should accept a *sender* argument which will be
+        this object. It is not called if the image can't be read or the load is
+        cancelled. The number of images decoded at the same time can be
+        changed with `vanilla.setMaxConcurrentImageLoads`.
+
         .. note::
            Only one of *imagePath*, *imageNamed*, *imageObject* should be set.
 
         .. _NSImage: https://developer.apple.com/documentation/appkit/nsimage?language=objc
         """
+        cancelImageLoad(self)
+        if asynchronous and imagePath is not None and imagePath not in getSharedImageCache():
+            self._loadImageAsynchronously(imagePath, placeholder, completionCallback)
+            return
         if imagePath is not None:
-            image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+            image = imageFromPath(imagePath)
         elif imageNamed is not None:
             image = NSImage.imageNamed_(imageNamed)
         elif imageObject is not None:
@@ -2,6 +2,7 @@ from AppKit import NSLevelIndicator, NSLevelIndicatorCell, NSTickMarkAbove, NSTi
         NSDiscreteCapacityLevelIndicatorStyle, NSContinuousCapacityLevelIndicatorStyle, \
         NSRatingLevelIndicatorStyle, NSRelevancyLevelIndicatorStyle, NSImage
 from vanilla.vanillaBase import VanillaBaseControl
+from vanilla.imageCache import imageFromPath
 
 # This control is available in OS 10.4+.
 # Cause a NameError if in an earlier OS.
@@ -279,7 +280,7 @@ def LevelIndicatorListCell(style="discrete",
     if criticalValue is not None:
         cell.setCriticalValue_(criticalValue)
     if imagePath is not None:
-        image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+        image = imageFromPath(imagePath)
     elif imageNamed is not None:
         image = NSImage.imageNamed_(imageNamed)
     elif imageObject is not None:
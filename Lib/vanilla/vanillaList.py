@@ -7,6 +7,7 @@ from objc import super
 from vanilla.nsSubclasses import getNSSubclass
 from vanilla.vanillaBase import VanillaBaseObject, VanillaError, VanillaCallbackWrapper
 from vanilla.vanillaMenuBuilder import VanillaMenuBuilder
+from vanilla.imageCache import imageFromPath
 
 
 class VanillaTableViewSubclass(NSTableView):
@@ -1401,7 +1402,7 @@ def SegmentedButtonListCell(segmentDescriptions):
         imageObject = segmentDescription.get("imageObject")
         # create the NSImage if needed
         if imagePath is not None:
-            image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+            image = imageFromPath(imagePath)
         elif imageNamed is not None:
             image = NSImage.imageNamed_(imageNamed)
         elif imageObject is not None:
@@ -6,10 +6,16 @@ from objc import python_method
 from objc import super
 import AppKit
 from vanilla.nsSubclasses import getNSSubclass
-from vanilla.vanillaBase import VanillaBaseObject, VanillaCallbackWrapper, osVersionCurrent, osVersion10_16
+from vanilla.vanillaBase import VanillaBaseObject, VanillaCallbackWrapper, _adoptWrapper, osVersionCurrent, osVersion10_16
 from vanilla.vanillaScrollView import ScrollView
-from vanilla.dragAndDrop import DropTargetProtocolMixIn, dropOperationMap, makePasteboardItem
+from vanilla.dragAndDrop import DropTargetProtocolMixIn, dropOperationMap, makePasteboardItem, makePromisedPasteboardItem, \
+    dragItemPasteboardType, dragSessionRegistry
 from vanilla.vanillaMenuBuilder import VanillaMenuBuilder
+from vanilla.profiling import measure
+from vanilla.imageCache import imageFromPath
+from vanilla.thumbnailCache import getSharedThumbnailCache
+from vanilla.imageLoading import cancelImageLoad
+from vanilla.listMoves import moveIndexes, invertOrder, rowMoves
 
 
 simpleDataTypes = (
@@ -109,6 +115,44 @@ class VanillaList2DataSourceAndDelegate(AppKit.NSObject):
                 self._groupRowIndexes.append(index)
         self._updateArrangedIndexes()
 
+    # above this the table is reloaded instead of moving every row
+    maxAnimatedRowMoves = 500
+
+    @python_method
+    def moveItems(self, indexes, toIndex):
+        items = self._items
+        order = moveIndexes(len(items), indexes, toIndex)
+        newIndexes = invertOrder(order)
+        items[:] = [items[index] for index in order]
+        self._groupRowIndexes = sorted(newIndexes[index] for index in self._groupRowIndexes)
+        tableView = self._tableView
+        if tableView.sortDescriptors():
+            # the rows of a sorted list show the same items
+            self._arrangedIndexes = [newIndexes[index] for index in self._arrangedIndexes]
+        else:
+            self._arrangedIndexes = list(range(len(items)))
+            moves = rowMoves(indexes, toIndex)
+            if len(moves) > self.maxAnimatedRowMoves:
+                # the selection is kept on the moved items
+                selection = [newIndexes[row] for row in tableView.selectedRowIndexes()]
+                tableView.reloadData()
+                tableView.selectRowIndexes_byExtendingSelection_(makeIndexSet(selection), False)
+            elif moves:
+                tableView.beginUpdates()
+                for fromRow, toRow in moves:
+                    tableView.moveRowAtIndex_toIndex_(fromRow, toRow)
+                tableView.endUpdates()
+                # the moved cell views still know their old rows,
+                # reload the rows in the moved range to update them
+                rows = list(indexes) + [toIndex]
+                firstRow = min(rows)
+                lastRow = min(max(rows), len(items) - 1)
+                tableView.reloadDataForRowIndexes_columnIndexes_(
+                    AppKit.NSIndexSet.indexSetWithIndexesInRange_((firstRow, lastRow - firstRow + 1)),
+                    AppKit.NSIndexSet.indexSetWithIndexesInRange_((0, len(tableView.tableColumns())))
+                )
+        return [newIndexes[index] for index in sorted(set(indexes))]
+
     @python_method
     def arrangedIndexes(self):
         return self._arrangedIndexes
@@ -207,41 +251,47 @@ class VanillaList2DataSourceAndDelegate(AppKit.NSObject):
         return len(self._arrangedIndexes)
 
     def tableView_objectValueForTableColumn_row_(self, tableView, column, row):
-        isGroupRow = column is None
-        if isGroupRow:
-            return self.getGroupValueForRow(row)
-        identifier = column.identifier()
-        value = self.getItemValueForColumnAndRow(identifier, row)
-        return value
+        with measure("List2.objectValueForTableColumn"):
+            isGroupRow = column is None
+            if isGroupRow:
+                return self.getGroupValueForRow(row)
+            identifier = column.identifier()
+            value = self.getItemValueForColumnAndRow(identifier, row)
+            return value
 
     def tableView_sortDescriptorsDidChange_(self, tableView, sortDescriptors):
-        self._updateArrangedIndexes()
+        with measure("List2.sortDescriptorsDidChange"):
+            self._updateArrangedIndexes()
 
     # Delegate
 
     def tableView_viewForTableColumn_row_(self, tableView, column, row):
-        isGroupRow = column is None
-        if isGroupRow:
-            view = self._groupRowCellClass(**self._groupRowCellClassKwargs)
-            view.set(self.getGroupValueForRow(row))
-            return view._nsObject
-        identifier = column.identifier()
-        value = self.getItemValueForColumnAndRow(identifier, row)
-        nsView = tableView.makeViewWithIdentifier_owner_(
-            column.identifier(),
-            self
-        )
-        if nsView is not None:
-            view = self._cellWrappers[nsView]
-        else:
-            cellClass, kwargs = self._cellClasses[identifier]
-            view = cellClass(**kwargs)
-            nsView = view._nsObject
-            self._cellWrappers[nsView] = view
-            nsView.setIdentifier_(identifier)
-        view._representedColumnRow = (identifier, row)
-        view.set(value)
-        return nsView
+        with measure("List2.viewForTableColumn"):
+            isGroupRow = column is None
+            if isGroupRow:
+                with measure("List2 cell creation"):
+                    view = self._groupRowCellClass(**self._groupRowCellClassKwargs)
+                view.set(self.getGroupValueForRow(row))
+                return view._nsObject
+            identifier = column.identifier()
+            value = self.getItemValueForColumnAndRow(identifier, row)
+            nsView = tableView.makeViewWithIdentifier_owner_(
+                column.identifier(),
+                self
+            )
+            if nsView is not None:
+                view = self._cellWrappers[nsView]
+            else:
+                cellClass, kwargs = self._cellClasses[identifier]
+                with measure("List2 cell creation"):
+                    view = cellClass(**kwargs)
+                nsView = view._nsObject
+                self._cellWrappers[nsView] = view
+                _adoptWrapper(self.vanillaWrapper(), view)
+                nsView.setIdentifier_(identifier)
+            view._representedColumnRow = (identifier, row)
+            view.set(value)
+            return nsView
 
     def tableViewSelectionDidChange_(self, notification):
         wrapper = self.vanillaWrapper()
@@ -289,6 +339,25 @@ class VanillaList2DataSourceAndDelegate(AppKit.NSObject):
         index = self._arrangedIndexes[row]
         return self.vanillaWrapper()._getPasteboardDataForIndex(index)
 
+    def tableView_draggingSession_willBeginAtPoint_forRowIndexes_(
+            self,
+            tableView,
+            session,
+            point,
+            rowIndexes
+        ):
+        indexes = [self._arrangedIndexes[row] for row in rowIndexes]
+        self.vanillaWrapper()._dragSessionBegan(session, indexes)
+
+    def tableView_draggingSession_endedAtPoint_operation_(
+            self,
+            tableView,
+            session,
+            point,
+            operation
+        ):
+        self.vanillaWrapper()._dragSessionEnded(session)
+
     # Drop
 
     def tableView_validateDrop_proposedRow_proposedDropOperation_(
@@ -519,6 +588,27 @@ class List2(ScrollView, DropTargetProtocolMixIn):
     **autosaveName** A string representing a unique name for the list. If given,
     this name will be used to store the column states in the application preferences.
 
+    **dragSettings** A drag settings dictionary with these keys:
+
+    - `makeDragDataCallback` A method called with the index of a dragged
+      item that must return a `typesAndValues` dictionary for the item.
+    - `dragCandidateCallback` Optional. A method called with the row
+      indexes about to be dragged that must return a boolean indicating
+      if they can be dragged.
+    - `unpackDragDataCallback` Optional. A method called with the value
+      and pasteboard type of a dropped item that returns the unpacked value.
+    - `pasteboardTypes` Optional. The pasteboard types returned by
+      `makeDragDataCallback`. If given, the data of the items is promised
+      and `makeDragDataCallback` is only called for the items a drop target
+      asks data for, when it asks for it.
+
+    Dragged items always carry the index of their item with the "rowIndex"
+    pasteboard type. Drop targets in the same application can get the
+    items themselves with `getDropSourceItems` and get the values returned
+    by `makeDragDataCallback` from `getDropItemValues`, given the
+    `draggingInfo` of the drop, without anything being written to or read
+    from the pasteboard. These values are not copies.
+
     **dropSettings** A drop settings dictionary.
 
     Differences from the standard vanilla drag and drop API:
@@ -534,6 +624,12 @@ class List2(ScrollView, DropTargetProtocolMixIn):
     `dropCandidateCallback` should return a boolean indicating if the
     drop is acceptable instead of a drop operation.
 
+    If the drop settings contain `dropCandidateCallbackOnChangeOnly` set
+    to `True`, `dropCandidateCallback` is only called when the proposed
+    index or drop position changes, or when a modifier key changes the
+    operations allowed by the source, not every time the mouse moves.
+    The result of the previous call is used in between.
+
     The dragging info dictionary will contain an `index` key that specifies
     where in the list the is proposed for insertion. If the list doesn't
     allow dropping on or between rows, index will be `None`.
@@ -643,6 +739,7 @@ class List2(ScrollView, DropTargetProtocolMixIn):
             self._dragCandidateCallback = dragSettings.get("dragCandidateCallback")
             self._dragStartedCallback = dragSettings.get("dragStartedCallback")
             self._makeDragDataCallback = dragSettings.get("makeDragDataCallback")
+            self._dragPasteboardTypes = dragSettings.get("pasteboardTypes")
             self._dragEndedCallback = dragSettings.get("dragEndedCallback")
             self._unpackDragDataCallback = dragSettings.get("unpackDragDataCallback")
         if dropSettings is not None:
@@ -674,6 +771,59 @@ class List2(ScrollView, DropTargetProtocolMixIn):
         """
         return [column.identifier() for column in self._tableView.tableColumns()]
 
+    def getLayoutState(self):
+        """
+        Return the order, widths and visibility of the columns and the
+        sort order as a dictionary that can be given to *setLayoutState*.
+        The dictionary only contains lists, strings, numbers and booleans::
+
+            {
+                "columns": [["name", 120.0], ["size", 60.0]],
+                "hidden": ["size"],
+                "sort": [["name", True]]
+            }
+        """
+        columns = []
+        hidden = []
+        for column in self._tableView.tableColumns():
+            identifier = column.identifier()
+            columns.append([identifier, column.width()])
+            if column.isHidden():
+                hidden.append(identifier)
+        sort = [
+            [sortDescriptor.key(), bool(sortDescriptor.ascending())]
+            for sortDescriptor in self._tableView.sortDescriptors()
+        ]
+        return dict(columns=columns, hidden=hidden, sort=sort)
+
+    def setLayoutState(self, state):
+        """
+        Restore the order, widths and visibility of the columns and the
+        sort order from a dictionary returned by *getLayoutState*.
+        Unknown columns are ignored.
+        """
+        tableView = self._tableView
+        hidden = set(state.get("hidden", []))
+        index = 0
+        for identifier, width in state.get("columns", []):
+            column = tableView.tableColumnWithIdentifier_(identifier)
+            if column is None:
+                continue
+            currentIndex = tableView.columnWithIdentifier_(identifier)
+            if currentIndex != index:
+                tableView.moveColumn_toColumn_(currentIndex, index)
+            column.setWidth_(width)
+            column.setHidden_(identifier in hidden)
+            index += 1
+        sort = state.get("sort")
+        if sort and self._allowsSorting:
+            sortDescriptors = [
+                AppKit.NSSortDescriptor.sortDescriptorWithKey_ascending_selector_(key, ascending, "compare:")
+                for key, ascending in sort
+                if tableView.tableColumnWithIdentifier_(key) is not None
+            ]
+            tableView.setSortDescriptors_(sortDescriptors)
+
     def appendColumn(self, columnDescription):
         """
         Append a column discription.
@@ -849,6 +999,21 @@ class List2(ScrollView, DropTargetProtocolMixIn):
             items = [item["value"] for item in items]
         return items
 
+    def moveItems(self, indexes, toIndex):
+        """
+        Move the items at **indexes** so they are inserted before the item
+        at **toIndex**, as the items are before the move. Give the number of
+        items as **toIndex** to move them to the end. This is the index a
+        drop between rows gives in the dragging info.
+
+        The moved items and the other items keep their order. The rows
+        are moved in the table instead of reloading it, the selection moves
+        along. The rows of a sorted list stay where they are.
+
+        Returns the new indexes of the moved items.
+        """
+        return self._dataSourceAndDelegate.moveItems(indexes, toIndex)
+
     def getArrangedIndexes(self):
         """
         Get the indexes of the items as they appear
@@ -998,6 +1163,7 @@ class List2(ScrollView, DropTargetProtocolMixIn):
     _dragCandidateCallback = None
     _dragStartedCallback = None
     _makeDragDataCallback = None
+    _dragPasteboardTypes = None
     _dragEndedCallback = None
 
     def _validateRowsForDrag(self, indexes):
@@ -1010,11 +1176,55 @@ class List2(ScrollView, DropTargetProtocolMixIn):
     def _getPasteboardDataForIndex(self, index):
         if self._makeDragDataCallback is None:
             return None
+        # in process drops look the item up by index
+        indexTypesAndValues = {
+            "rowIndex" : str(index),
+            dragItemPasteboardType : str(index)
+        }
+        if self._dragPasteboardTypes is not None:
+            return makePromisedPasteboardItem(
+                self._dragPasteboardTypes,
+                _makeDragDataGetter(self._makeDragDataCallback, index),
+                indexTypesAndValues
+            )
         typesAndValues = self._makeDragDataCallback(index)
         if not typesAndValues:
             return None
+        # kept for the drag session, so they aren't made twice
+        if self._pendingDragData is None:
+            self._pendingDragData = {}
+        self._pendingDragData[index] = typesAndValues
+        typesAndValues = dict(typesAndValues)
+        typesAndValues.update(indexTypesAndValues)
         return makePasteboardItem(typesAndValues)
 
+    _pendingDragData = None
+
+    def _dragSessionBegan(self, session, indexes):
+        pendingDragData = self._pendingDragData or {}
+        self._pendingDragData = {}
+        makeDragDataCallback = self._makeDragDataCallback
+        if makeDragDataCallback is None:
+            return
+        items = {}
+        for index in indexes:
+            typesAndValues = pendingDragData.get(index)
+            if typesAndValues is None:
+                typesAndValues = _makeDragDataGetter(makeDragDataCallback, index)
+            items[str(index)] = typesAndValues
+        dragSessionRegistry.beginSession(session.draggingSequenceNumber(), self, items)
+
+    def _dragSessionEnded(self, session):
+        self._pendingDragData = {}
+        dragSessionRegistry.endSession(session.draggingSequenceNumber())
+
+    def _getDraggedItemsForIndexes(self, indexes):
+        items = self._dataSourceAndDelegate.items()
+        draggedItems = [items[index] for index in indexes if 0 <= index < len(items)]
+        if not self._itemsWereDict:
+            draggedItems = [item["value"] for item in draggedItems]
+        return draggedItems
+
     # key down
 
     def _keyDown(self, event):
@@ -1068,27 +1278,38 @@ class List2(ScrollView, DropTargetProtocolMixIn):
 
     _allowDropOnRow = None
     _allowDropBetweenRows = None
+    _dropCandidateCallbackOnChangeOnly = False
 
     def setDropSettings(self, settings):
         self._allowDropOnRow = settings.get("allowDropOnRow", False)
         self._allowDropBetweenRows = settings.get("allowDropBetweenRows", True)
+        self._dropCandidateCallbackOnChangeOnly = settings.get("dropCandidateCallbackOnChangeOnly", False)
         super().setDropSettings(settings)
 
     def _dropCandidateUpdated(self, draggingInfo, index, operation):
         if self._dropCandidateCallback is None:
             return AppKit.NSDragOperationNone
-        info = self._unpackDropCandidateInfo(draggingInfo)
-        info["index"] = index
+        proposedIndex = index
+        dropPosition = operation
         if not self._allowDropOnRow and not self._allowDropBetweenRows:
             index = None
         elif not self._allowDropOnRow and operation == AppKit.NSTableViewDropOn:
             return AppKit.NSDragOperationNone
         elif not self._allowDropBetweenRows and operation == AppKit.NSTableViewDropAbove:
             return AppKit.NSDragOperationNone
-        if not len(self.get()):
+        if not self._dataSourceAndDelegate.items():
             index = None
-        operation = self._dropCandidateCallback(info)
-        operation = dropOperationMap.get(operation, operation)
+        cache = self._getDropCandidateCache(draggingInfo)
+        key = (proposedIndex, dropPosition, draggingInfo.draggingSourceOperationMask())
+        lastUpdate = cache.get("lastUpdate")
+        if self._dropCandidateCallbackOnChangeOnly and lastUpdate is not None and lastUpdate[0] == key:
+            operation = lastUpdate[1]
+        else:
+            info = self._unpackDropCandidateInfo(draggingInfo)
+            info["index"] = proposedIndex
+            operation = self._dropCandidateCallback(info)
+            operation = dropOperationMap.get(operation, operation)
+            cache["lastUpdate"] = (key, operation)
         # highlight the whole table instead of a single spot
         if index is None:
             self._tableView.setDropRow_dropOperation_(-1, operation)
@@ -1105,6 +1326,12 @@ class List2(ScrollView, DropTargetProtocolMixIn):
 # Tools
 # -----
 
+def _makeDragDataGetter(makeDragDataCallback, index):
+    def getter():
+        return makeDragDataCallback(index)
+    return getter
+
+
 class List2GroupRow:
 
     def __init__(self, value=None):
@@ -1166,6 +1393,8 @@ class EditTextList2Cell(Group):
        This is never constructed directly.
     """
 
+    __slots__ = ("_externalCallback", "_representedColumnRow")
+
     # Implementation Note:
     # Using NSTextField directly as the row view doesn't
     # allow for vertically positioning the text anywhere
@@ -1292,6 +1521,8 @@ class GroupTitleList2Cell(EditTextList2Cell):
        This is never constructed directly.
     """
 
+    __slots__ = ()
+
     def __init__(self,
             font=None,
             textColor=None,
@@ -1338,6 +1569,8 @@ class SliderList2Cell(Slider):
        This is never constructed directly.
     """
 
+    __slots__ = ("_representedColumnRow",)
+
     def __init__(self,
             minValue=0,
             maxValue=100,
@@ -1375,6 +1608,8 @@ class CheckBoxList2Cell(CheckBox):
        This is never constructed directly.
     """
 
+    __slots__ = ("_representedColumnRow",)
+
     def __init__(self,
             title=None,
             editable=False,
@@ -1404,6 +1639,8 @@ class PopUpButtonList2Cell(PopUpButton):
        This is never constructed directly.
     """
 
+    __slots__ = ("_representedColumnRow",)
+
     def __init__(self,
             items=[],
             editable=False,
@@ -1462,18 +1699,38 @@ class ImageList2Cell(ImageView):
     | "none"         | Do not scale the image.                      |
     +----------------+----------------------------------------------+
 
+    The value of the cell may be a `NSImage` or a file path to an image.
+    Images loaded from file paths are shared between all cells.
+
+    **asynchronous** If `True` images given as file paths are decoded in
+    a background thread. If the cell is reused for another row before the
+    image is ready, the load is cancelled.
+
+    **placeholder** A `NSImage` shown while an asynchronous image is decoded.
+
+    **thumbnailSize** A tuple of form *(width, height)*. If given, images given
+    as file paths are downsampled to this size in points, at the backing scale
+    factor of the screen, and the thumbnails are cached. The full resolution
+    images are not kept in memory. Use `vanilla.setThumbnailCacheDirectory`
+    to keep the thumbnails on disk between sessions.
+
     .. note::
        This class should only be used in the *columnDescriptions*
        *cellClass* argument during the construction of a List.
        This is never constructed directly.
     """
 
+    __slots__ = ("_representedColumnRow", "_asynchronous", "_placeholder", "_thumbnailSize")
+
     def __init__(self,
             horizontalAlignment="center",
             verticalAlignment="center",
             scale="proportional",
             editable=False,
-            callback=None
+            callback=None,
+            asynchronous=False,
+            placeholder=None,
+            thumbnailSize=None
         ):
         super().__init__(
             "auto",
@@ -1481,9 +1738,40 @@ class ImageList2Cell(ImageView):
             verticalAlignment=verticalAlignment,
             scale=scale
         )
+        self._asynchronous = asynchronous
+        self._placeholder = placeholder
+        self._thumbnailSize = thumbnailSize
 
     def set(self, image):
-        self.setImage(imageObject=image)
+        if not isinstance(image, str):
+            self.setImage(imageObject=image)
+        elif self._thumbnailSize is None:
+            self.setImage(imagePath=image, asynchronous=self._asynchronous, placeholder=self._placeholder)
+        else:
+            self._setThumbnail(image)
+
+    def _getBackingScaleFactor(self):
+        window = self._nsObject.window()
+        if window is not None:
+            return window.backingScaleFactor()
+        screen = AppKit.NSScreen.mainScreen()
+        if screen is not None:
+            return screen.backingScaleFactor()
+        return 1.0
+
+    def _setThumbnail(self, path):
+        thumbnailSize = self._thumbnailSize
+        scale = self._getBackingScaleFactor()
+        cache = getSharedThumbnailCache()
+        if self._asynchronous and (path, thumbnailSize, scale) not in cache:
+            self._loadImageAsynchronously(
+                path,
+                placeholder=self._placeholder,
+                decode=lambda path: cache.get(path, thumbnailSize, scale)
+            )
+        else:
+            cancelImageLoad(self)
+            self._nsObject.setImage_(cache.get(path, thumbnailSize, scale))
 
     def get(self):
         return self.getNSImageView().image()
@@ -1519,6 +1807,8 @@ class SegmentedButtonList2Cell(SegmentedButton):
        This is never constructed directly.
     """
 
+    __slots__ = ("_representedColumnRow",)
+
     def __init__(self,
             segmentDescriptions=[],
             selectionStyle="one",
@@ -1550,6 +1840,8 @@ class ColorWellList2Cell(ColorWell):
        This is never constructed directly.
     """
 
+    __slots__ = ("_representedColumnRow",)
+
     def __init__(self,
             editable=False,
             callback=None,
@@ -1580,6 +1872,8 @@ class LevelIndicatorList2Cell(LevelIndicator):
        This is never constructed directly.
     """
 
+    __slots__ = ("_representedColumnRow",)
+
     def __init__(self,
             style="discrete",
             value=5,
@@ -1613,7 +1907,7 @@ class LevelIndicatorList2Cell(LevelIndicator):
         self.enable(editable)
         cell = self._nsObject.cell()
         if imagePath is not None:
-            image = AppKit.NSImage.alloc().initWithContentsOfFile_(imagePath)
+            image = imageFromPath(imagePath)
         elif imageNamed is not None:
             image = AppKit.NSImage.imageNamed_(imageNamed)
         elif imageObject is not None:
@@ -1636,6 +1930,8 @@ class ComboBoxList2Cell(ComboBox):
        This is never constructed directly.
     """
 
+    __slots__ = ("_representedColumnRow",)
+
     def __init__(self,
             items=[],
             completes=True,
@@ -4,8 +4,9 @@ from AppKit import NSView, NSViewController, NSPopover, NSMinXEdge, NSMaxXEdge,
     NSMinYEdge, NSMaxYEdge, NSPopoverBehaviorApplicationDefined, NSPopoverBehaviorTransient, \
     NSPopoverBehaviorSemitransient
 
-from vanilla.vanillaBase import VanillaBaseObject, _breakCycles, _addAutoLayoutRules
+from vanilla.vanillaBase import VanillaBaseObject, _getWrapperRegistry, _addAutoLayoutRules
 from vanilla.nsSubclasses import getNSSubclass
+from vanilla.eventBus import EventBus, EventBinding
 
 _edgeMap = {
     "left": NSMinXEdge,
@@ -129,7 +130,7 @@ class Popover(VanillaBaseObject):
         self._delegate = VanillaPopoverDelegate.alloc().init()
         self._delegate.vanillaWrapper = weakref.ref(self)
         self._popover.setDelegate_(self._delegate)
-        self._bindings = {}
+        self._eventBus = EventBus()
         self._autoLayoutViews = {}
 
     def __del__(self):
@@ -137,9 +138,9 @@ class Popover(VanillaBaseObject):
 
     def _breakCycles(self):
         super()._breakCycles()
-        view = self._getContentView()
-        if view is not None:
-            _breakCycles(view)
+        if hasattr(self, "_eventBus"):
+            self._eventBus.clear()
+        _getWrapperRegistry(self).clear()
         self._contentViewController = None
         self._popover = None
         self._parentView = None
@@ -186,7 +187,7 @@ class Popover(VanillaBaseObject):
         """
         self._popover.setContentSize_((width, height))
 
-    def bind(self, event, callback):
+    def bind(self, event, callback, priority=0, weak=False):
         """
         Bind a callback to an event.
 
@@ -201,10 +202,15 @@ class Popover(VanillaBaseObject):
         +----------------+-----------------------------------------------+
         | *"did close"*  | Called immediately after the popover closes.  |
         +----------------+-----------------------------------------------+
+
+        **priority** Callbacks with a higher priority are called first.
+
+        **weak** If `True` only a weak reference to the callback is kept.
+
+        Refer to :meth:`Window.bind` for details. This returns a token
+        that can be given to *unbind*.
         """
-        if event not in self._bindings:
-            self._bindings[event] = []
-        self._bindings[event].append(callback)
+        return self._eventBus.bind(event, callback, priority=priority, weak=weak)
 
     def unbind(self, event, callback):
         """
@@ -213,16 +219,23 @@ class Popover(VanillaBaseObject):
         **event** A string representing the desired event.
         Refer to :meth:`Popover.bind` for the options.
 
-        **callback** The callback that has been bound to the event.
+        **callback** The callback that has been bound to the event
+        or the token returned by *bind*.
+        """
+        if isinstance(callback, EventBinding):
+            self._eventBus.unbind(callback)
+        else:
+            self._eventBus.unbindCallback(event, callback)
+
+    def getEventBus(self):
+        """
+        Return the `EventBus` holding the bindings of the popover.
         """
-        self._bindings[event].remove(callback)
+        return self._eventBus
 
     def _alertBindings(self, key):
-        if hasattr(self, "_bindings"):
-            if key in self._bindings:
-                for callback in self._bindings[key]:
-                    # XXX why return? there could be more than one binding.
-                    return callback(self)
+        if hasattr(self, "_eventBus"):
+            self._eventBus.post(key, self)
 
     def addAutoPosSizeRules(self, rules, metrics=None):
         """
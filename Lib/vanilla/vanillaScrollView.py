@@ -1,5 +1,5 @@
 from AppKit import NSScrollView, NSBezelBorder
-from vanilla.vanillaBase import VanillaBaseObject
+from vanilla.vanillaBase import VanillaBaseObject, _adoptWrapper, _breakCycles
 
 
 class ScrollView(VanillaBaseObject):
@@ -66,6 +66,25 @@ class ScrollView(VanillaBaseObject):
         if backgroundColor:
             self._nsObject.setBackgroundColor_(backgroundColor)
         self._nsObject.setDrawsBackground_(drawsBackground)
+        # if the document view belongs to a vanilla object,
+        # take ownership of it. otherwise the document view
+        # has to be walked when breaking cycles.
+        wrapper = None
+        if hasattr(nsView, "vanillaWrapper"):
+            wrapper = nsView.vanillaWrapper()
+        if wrapper is None:
+            self._walkDocumentView = True
+        elif wrapper is not self:
+            _adoptWrapper(self, wrapper)
+
+    _walkDocumentView = False
+
+    def _breakCycles(self):
+        super()._breakCycles()
+        if self._walkDocumentView:
+            view = self._nsObject.documentView()
+            if view is not None:
+                _breakCycles(view)
 
     def _testForDeprecatedAttributes(self):
         super()._testForDeprecatedAttributes()
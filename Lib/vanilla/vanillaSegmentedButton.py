@@ -1,6 +1,7 @@
 from AppKit import NSSegmentedControl, NSSegmentedCell, NSImage, NSSegmentSwitchTrackingSelectOne, NSSegmentSwitchTrackingSelectAny, NSSegmentSwitchTrackingMomentary
 
 from vanilla.vanillaBase import VanillaBaseControl
+from vanilla.imageCache import imageFromPath
 
 
 _trackingModeMap = {
@@ -124,7 +125,7 @@ class SegmentedButton(VanillaBaseControl):
             imageObject = segmentDescription.get("imageObject")
             # create the NSImage if needed
             if imagePath is not None:
-                image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+                image = imageFromPath(imagePath)
             elif imageNamed is not None:
                 image = NSImage.imageNamed_(imageNamed)
             elif imageObject is not None:
@@ -135,8 +136,11 @@ class SegmentedButton(VanillaBaseControl):
             nsObject.setLabel_forSegment_(title, segmentIndex)
             nsObject.setEnabled_forSegment_(enabled, segmentIndex)
             if image is not None:
-                if imageTemplate is not None:
+                if imageTemplate is not None and image.isTemplate() != imageTemplate:
                     # only change the image template setting if its either True or False
+                    # images from the cache are shared, so change a copy
+                    if imagePath is not None:
+                        image = image.copy()
                     image.setTemplate_(imageTemplate)
                 nsObject.setImage_forSegment_(image, segmentIndex)
 
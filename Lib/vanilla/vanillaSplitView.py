@@ -5,7 +5,8 @@ from objc import python_method
 from objc import super
 
 import vanilla
-from vanilla.vanillaBase import VanillaBaseObject, _breakCycles
+from vanilla.vanillaBase import VanillaBaseObject, _breakCycles, _adoptWrapper
+from vanilla.splitViewSolver import allocateInitialSizes, distributeSizeChange
 
 
 _dividerStyleMap = {
@@ -106,78 +107,38 @@ class VanillaSplitViewDelegate(NSObject):
         # pane sizes to make sure that they aren't doing anything crazy.
         wrapper = splitView.vanillaWrapper()
         paneDescriptions = wrapper._paneDescriptions
-        identifierToPane = wrapper._identifierToPane
-        # make a storage location for all view sizes
-        viewSizes = {}
-        # figure out the desired size, gather views into groups
-        # depending on their size settings
-        if splitView.isVertical():
+        isVertical = splitView.isVertical()
+        if isVertical:
             splitViewSize = splitView.frame().size[0]
         else:
             splitViewSize = splitView.frame().size[1]
-        hiddenViews = []
-        fixedSizeViews = []
-        minMaxViews = []
-        flexibleViews = []
+        # hidden panes keep their size for when they are shown again
+        visiblePaneDescriptions = [
+            paneDescription
+            for paneDescription in paneDescriptions
+            if not paneDescription["nsView"].isHidden()
+        ]
+        dividerThickness = (len(visiblePaneDescriptions) - 1) * splitView.dividerThickness()
+        # sizes from setLayoutState are only used once
+        restoredSizes = wrapper._restoredPaneSizes or {}
+        if splitView.window() is not None:
+            wrapper._restoredPaneSizes = None
+        sizes = allocateInitialSizes(
+            visiblePaneDescriptions,
+            splitViewSize - dividerThickness,
+            [restoredSizes.get(paneDescription["identifier"]) for paneDescription in visiblePaneDescriptions]
+        )
+        paneSizes = []
         for paneDescription in paneDescriptions:
-            identifier = paneDescription["identifier"]
-            size = paneDescription["size"]
-            if size == 0:
-                hiddenViews.append(identifier)
-                viewSizes[identifier] = size
-            elif paneDescription["fixedSize"]:
-                fixedSizeViews.append(identifier)
-                viewSizes[identifier] = size
-            elif size is not None:
-                fixedSizeViews.append(identifier)
-                viewSizes[identifier] = size
-            elif paneDescription["minSize"] or paneDescription["maxSize"]:
-                if paneDescription["minSize"]:
-                    viewSizes[identifier] = paneDescription["minSize"]
-                else:
-                    viewSizes[identifier] = 0
-                minMaxViews.append(identifier)
-            else:
-                flexibleViews.append(identifier)
-                viewSizes[identifier] = 0
-        # calculate the amount of space needed to balance everything out
-        dividerThickness = (len(paneDescriptions) - 1) * splitView.dividerThickness()
-        desiredSize = sum(viewSizes.values()) + dividerThickness
-        remainder = splitViewSize - desiredSize
-        totalNonFixedViews = len(minMaxViews) + len(flexibleViews)
-        if totalNonFixedViews:
-            viewAdjustment = int(round(remainder / totalNonFixedViews))
-        else:
-            viewAdjustment = 0
-        # now apply the difference to minMaxViews respecting the min/max values
-        for identifier in minMaxViews:
-            for paneDescription in paneDescriptions:
-                if paneDescription["identifier"] == identifier:
-                    break
-            minSize = paneDescription["minSize"]
-            if minSize is None:
-                minSize = 0
-            maxSize = paneDescription["maxSize"]
-            size = viewSizes[identifier]
-            test = size + viewAdjustment
-            if test < minSize:
+            if not paneDescription["nsView"].isHidden():
                 continue
-            elif maxSize is not None and test > maxSize:
-                continue
-            viewSizes[identifier] = test
-        # recalculate the remainder
-        remainder = splitViewSize - desiredSize
-        if totalNonFixedViews:
-            viewAdjustment = int(round(remainder / totalNonFixedViews))
-        else:
-            viewAdjustment = 0
-        # apply to the flexible views
-        for identifier in flexibleViews:
-            viewSizes[identifier] += viewAdjustment
+            size = restoredSizes.get(paneDescription["identifier"], paneDescription["size"])
+            if size:
+                paneSizes.append((paneDescription, size))
+        paneSizes.extend(zip(visiblePaneDescriptions, sizes))
         # now set the view sizes
-        isVertical = splitView.isVertical()
-        for identifier, size in viewSizes.items():
-            view = identifierToPane[identifier]["nsView"]
+        for paneDescription, size in paneSizes:
+            view = paneDescription["nsView"]
             w, h = view.frame().size
             if isVertical:
                 w = size
@@ -288,71 +249,39 @@ class VanillaSplitViewDelegate(NSObject):
             return
         # gather the panes
         wrapper = splitView.vanillaWrapper()
-        changablePanes = {}
-        unchangablePanes = {}
-        for paneDescription in wrapper._paneDescriptions:
-            identifier = paneDescription["identifier"]
-            if paneDescription["nsView"] == ignoreSubview:
-                unchangablePanes[identifier] = paneDescription
-            elif paneDescription["nsView"].isHidden():
-                unchangablePanes[identifier] = paneDescription
-            elif not paneDescription["resizeFlexibility"]:
-                unchangablePanes[identifier] = paneDescription
-            else:
-                changablePanes[identifier] = paneDescription
-        # calculate the change difference
+        paneDescriptions = wrapper._paneDescriptions
         coordIndex = self._splitViewCoordinateIndex_(splitView)
-        difference = sizeChange
-        evenChange = difference / len(changablePanes)
-        # determine tha pane size changes
-        paneSizeChanges = dict.fromkeys(unchangablePanes.keys(), 0)
-        # handle min/max limited panes
-        for identifier, paneDescription in changablePanes.items():
-            currentSize = paneDescription["nsView"].frame().size[coordIndex]
-            paneChange = None
-            # shrinking
-            if difference < 0:
-                if paneDescription["minSize"] is not None:
-                    test = currentSize + evenChange
-                    if test == paneDescription["minSize"]:
-                        paneChange = 0
-                    elif test < paneDescription["minSize"]:
-                        paneChange = paneDescription["minSize"] - currentSize
-                    else:
-                        paneChange = evenChange
-            # expanding
-            if difference > 0:
-                if paneDescription["maxSize"] is not None:
-                    test = currentSize + evenChange
-                    if test == paneDescription["maxSize"]:
-                        paneChange = 0
-                    elif test > paneDescription["maxSize"]:
-                        paneChange = paneDescription["maxSize"] - currentSize
-                    else:
-                        paneChange = evenChange
-            if paneChange is not None:
-                paneSizeChanges[identifier] = paneChange
-        # handle the remaining panes
-        evenChange = (difference - sum(paneSizeChanges.values())) / len(changablePanes)
-        for identifier, paneDescription in changablePanes.items():
-            if identifier in paneSizeChanges:
-                continue
-            paneSizeChanges[identifier] = evenChange
+        sizes = []
+        changeable = []
+        for paneDescription in paneDescriptions:
+            view = paneDescription["nsView"]
+            sizes.append(view.frame().size[coordIndex])
+            changeable.append(
+                view != ignoreSubview
+                and not view.isHidden()
+                and paneDescription["resizeFlexibility"]
+            )
+        # determine tha pane sizes
+        newSizes = distributeSizeChange(
+            sizes,
+            sizeChange,
+            wrapper._paneMinSizes,
+            wrapper._paneMaxSizes,
+            changeable,
+            wrapper._panePriorities,
+            integral=float(sizeChange).is_integer()
+        )
         # apply the changes to the views
-        isVertical = coordIndex == 0
         isVertical = splitView.isVertical()
-        paneDescriptions = changablePanes
-        paneDescriptions.update(unchangablePanes)
-        for identifier, paneDescription in paneDescriptions.items():
-            paneChange = paneSizeChanges[identifier]
+        for paneDescription, size in zip(paneDescriptions, newSizes):
             view = paneDescription["nsView"]
             frame = view.frame()
             if isVertical:
-                frame.size.width += paneChange
+                frame.size.width = size
                 frame.size.height = frameSize.height
             else:
                 frame.size.width = frameSize.width
-                frame.size.height += paneChange
+                frame.size.height = size
             view.setFrame_(frame)
         splitView.adjustSubviews()
 
@@ -427,6 +356,9 @@ class SplitView(VanillaBaseObject):
     |                       | SplitView size changes. Optional. The default is *True* unless the pane has a |
     |                       | fixed size.                                                                   |
     +-----------------------+-------------------------------------------------------------------------------+
+    | *"priority"*          | A number. When the SplitView size changes, panes with a higher priority       |
+    |                       | absorb the change first. Optional. The default is 0.                          |
+    +-----------------------+-------------------------------------------------------------------------------+
 
     **isVertical** Boolean representing if the split view is vertical.
     Default is *True*.
@@ -481,13 +413,18 @@ class SplitView(VanillaBaseObject):
         self._nsObject.setDelegate_(self._delegate)
         # panes
         self._paneDescriptions = paneDescriptions
+        self._restoredPaneSizes = None
         self._setupPanes()
 
     def _breakCycles(self):
         splitView = self.getNSSplitView()
         for view in list(splitView.subviews()):
             view.removeFromSuperview()
-            _breakCycles(view)
+            # vanilla panes are registered through _adoptWrapper.
+            # only NSView panes need to be walked.
+            if view not in self._adoptedPaneViews:
+                _breakCycles(view)
+        self._adoptedPaneViews = None
         self._nsObject.setDelegate_(None)
         self._delegate = None
         self._paneDescriptions = None
@@ -496,6 +433,10 @@ class SplitView(VanillaBaseObject):
 
     def _setupPanes(self):
         self._identifierToPane = {}
+        self._adoptedPaneViews = []
+        self._paneMinSizes = []
+        self._paneMaxSizes = []
+        self._panePriorities = []
         splitView = self.getNSSplitView()
         splitViewFrame = splitView.frame()
         mask = NSViewWidthSizable | NSViewHeightSizable
@@ -508,14 +449,17 @@ class SplitView(VanillaBaseObject):
             maxSize = paneDescription.get("maxSize")
             canCollapse = paneDescription.get("canCollapse", True)
             resizeFlexibility = paneDescription.get("resizeFlexibility", True)
+            priority = paneDescription.get("priority", 0)
             # unwrap the view if necessary
             if isinstance(view, VanillaBaseObject):
                 group = vanilla.Group((0, 0, -0, -0))
                 group.splitViewContentView = view
+                _adoptWrapper(self, group)
                 view = group
                 view._setFrame(splitViewFrame)
                 view = view._nsObject
                 view.setAutoresizingMask_(mask)
+                self._adoptedPaneViews.append(view)
             # push all of the items into the description
             # so that we can reduce the get calls and
             # centralize the default values here.
@@ -529,6 +473,10 @@ class SplitView(VanillaBaseObject):
             if resizeFlexibility and paneDescription["fixedSize"]:
                 resizeFlexibility = False
             paneDescription["resizeFlexibility"] = resizeFlexibility
+            paneDescription["priority"] = priority
+            self._paneMinSizes.append(minSize)
+            self._paneMaxSizes.append(maxSize)
+            self._panePriorities.append(priority)
             # store the view
             assert identifier is not None
             assert identifier not in self._identifierToPane
@@ -581,6 +529,50 @@ class SplitView(VanillaBaseObject):
         self.getNSSplitView().setState_forPane_(onOff, identifier)
         self._nsObject.setNeedsDisplay_(True)
 
+    def getLayoutState(self):
+        """
+        Return the sizes and visibility of the panes as a dictionary
+        that can be given to *setLayoutState*. The dictionary only
+        contains lists, strings and numbers::
+
+            {"sizes": {"pane1": 120, "pane2": 300}, "hidden": ["pane2"]}
+        """
+        splitView = self.getNSSplitView()
+        coordIndex = 0 if splitView.isVertical() else 1
+        sizes = {}
+        hidden = []
+        for paneDescription in self._paneDescriptions:
+            identifier = paneDescription["identifier"]
+            view = paneDescription["nsView"]
+            sizes[identifier] = view.frame().size[coordIndex]
+            if view.isHidden():
+                hidden.append(identifier)
+        return dict(sizes=sizes, hidden=hidden)
+
+    def setLayoutState(self, state):
+        """
+        Restore the sizes and visibility of the panes from a dictionary
+        returned by *getLayoutState*. Unknown panes are ignored.
+
+        If this is called before the split view is in a window, the sizes
+        are used for the initial layout, so the panes are only laid out once.
+        Panes without a size in their description absorb the difference
+        when the split view has a different size than when the state was
+        saved. The restored sizes are only used for that one layout.
+        """
+        sizes = state.get("sizes", {})
+        hidden = set(state.get("hidden", []))
+        restoredSizes = {}
+        for paneDescription in self._paneDescriptions:
+            identifier = paneDescription["identifier"]
+            if identifier in sizes:
+                restoredSizes[identifier] = sizes[identifier]
+            paneDescription["nsView"].setHidden_(identifier in hidden)
+        self._restoredPaneSizes = restoredSizes
+        splitView = self.getNSSplitView()
+        if splitView.window() is not None:
+            splitView.delegate().splitViewInitialSizing_(splitView)
+
     def togglePane(self, identifier, animate=False):
         """
         Toggle the visibility of the pane with *identifier*.
@@ -1,4 +1,10 @@
-from vanilla.vanillaBase import VanillaBaseObject
+from vanilla.vanillaBase import VanillaBaseObject, _adoptWrapper, _getWrapperRegistry, _breakCycles, \
+    _calcFrame, _recursiveSetFrame
+from vanilla.nsSubclasses import getNSSubclass
+from vanilla.vanillaScrollView import ScrollView
+from vanilla.stackViewLayout import planStackItem
+from vanilla.virtualStack import RowHeights, RecyclingPool, VirtualRows
+from objc import super
 import AppKit
 
 NSUserInterfaceLayoutOrientationHorizontal = 0
@@ -116,10 +122,10 @@ class _StackView(VanillaBaseObject):
         stackView.setAlignment_(alignment)
         stackView.setDistribution_(distribution)
         self.setEdgeInsets(edgeInsets)
-        for view in views:
-            if not isinstance(view, dict):
-                view = dict(view=view)
-            self.appendView(**view)
+        self._arrangedViews = {}
+        self._viewGravities = {}
+        self._gravityCounts = {}
+        self.appendViews(views)
 
     def getNSStackView(self):
         return self._nsObject
@@ -135,55 +141,58 @@ class _StackView(VanillaBaseObject):
         """
         Append a view.
         """
-        index = len(self._nsObject.viewsInGravity_(self._gravities.get(gravity, gravity)))
-        self.insertView(index, view=view, width=width, height=height, spacing=spacing, gravity=gravity)
+        self.appendViews([dict(view=view, width=width, height=height, spacing=spacing, gravity=gravity)])
+
+    def appendViews(self, views):
+        """
+        Append a list of views. The views are defined as in the
+        *views* argument of the constructor. The layout of all
+        views is planned first and their constraints are activated
+        in one batch, which is much faster than appending the views
+        one by one.
+        """
+        constraints = []
+        for view in views:
+            if not isinstance(view, dict):
+                view = dict(view=view)
+            gravity = self._gravities.get(view.get("gravity", "center"), view.get("gravity", "center"))
+            index = self._gravityCounts.get(gravity, 0)
+            constraints.extend(self._insertView(index, **view))
+        AppKit.NSLayoutConstraint.activateConstraints_(constraints)
+
+    def setViews(self, views):
+        """
+        Replace all views with a list of views. The views are defined
+        as in the *views* argument of the constructor.
+        """
+        for view in list(self._arrangedViews.values()):
+            self.removeView(view)
+        self.appendViews(views)
 
     def insertView(self, index, view, width=None, height=None, spacing=None, gravity="center"):
         """
         Insert a view.
         """
+        constraints = self._insertView(index, view, width=width, height=height, spacing=spacing, gravity=gravity)
+        AppKit.NSLayoutConstraint.activateConstraints_(constraints)
+
+    def _insertView(self, index, view, width=None, height=None, spacing=None, gravity="center"):
+        # Insert the view and return its constraints without activating them.
         gravity = self._gravities.get(gravity, gravity)
+        wrapper = view
         if isinstance(view, VanillaBaseObject):
+            _adoptWrapper(self, view)
             view = view._nsObject
         stackView = self.getNSStackView()
-        stackView.insertView_atIndex_inGravity_(view, index, gravity)
-        if isinstance(view, VanillaBaseObject):
-            view = view._nsObject
-        stackView = self.getNSStackView()
-        # size shortcuts
-        # - when "fill" if used in the direction of the main axis,
-        #   it means "use a flexible space"
-        # - when "fit" is used, let AppKit figure out the width.
-        #   (note: this previously used view.fittingSize()
-        #   to get an absolute size, but it was unreliable.)
-        if width == "fit":
-            width = None
-        elif width == "fill" and self._orientation == NSUserInterfaceLayoutOrientationHorizontal:
-            width = None
-        if height == "fit":
-            height = None
-        elif height == "fill" and self._orientation == NSUserInterfaceLayoutOrientationVertical:
-            height = None
-        # hugging and compression
-        widthHuggingPriority = AppKit.NSLayoutPriorityRequired
-        widthCompressionPriority = AppKit.NSLayoutPriorityRequired
-        if width is None:
-            intrinsicWidth = view.intrinsicContentSize()[0]
-            if intrinsicWidth == AppKit.NSViewNoInstrinsicMetric:
-                widthHuggingPriority = AppKit.NSLayoutPriorityDefaultLow
-                widthCompressionPriority = AppKit.NSLayoutPriorityDefaultLow
-        elif isinstance(width, (float, int)):
-            pass
-        elif isinstance(width, str):
-            if width == "fill":
-                widthHuggingPriority = AppKit.NSLayoutPriorityDefaultLow
-                widthCompressionPriority = AppKit.NSLayoutPriorityDefaultLow
-            elif width.startswith("=="):
-                pass
-            elif width.startswith(">="):
-                widthHuggingPriority = AppKit.NSLayoutPriorityDefaultLow
-            elif width.startswith("<="):
-                widthCompressionPriority = AppKit.NSLayoutPriorityDefaultLow
+        plan = planStackItem(
+            width,
+            height,
+            self._orientation,
+            edgeInsets=stackView.edgeInsets(),
+            getIntrinsicSize=view.intrinsicContentSize
+        )
+        widthHuggingPriority, widthCompressionPriority = plan["widthPriorities"]
+        heightHuggingPriority, heightCompressionPriority = plan["heightPriorities"]
         view.setContentHuggingPriority_forOrientation_(
             widthHuggingPriority,
             AppKit.NSLayoutConstraintOrientationHorizontal
@@ -192,25 +201,6 @@ class _StackView(VanillaBaseObject):
             widthCompressionPriority,
             AppKit.NSLayoutConstraintOrientationHorizontal
         )
-        heightHuggingPriority = AppKit.NSLayoutPriorityRequired
-        heightCompressionPriority = AppKit.NSLayoutPriorityRequired
-        if height is None:
-            intrinsicHeight = view.intrinsicContentSize()[1]
-            if intrinsicHeight == AppKit.NSViewNoInstrinsicMetric:
-                heightHuggingPriority = AppKit.NSLayoutPriorityDefaultLow
-                heightCompressionPriority = AppKit.NSLayoutPriorityDefaultLow
-        elif isinstance(height, (float, int)):
-            pass
-        elif isinstance(height, str):
-            if height == "fill":
-                heightHuggingPriority = AppKit.NSLayoutPriorityDefaultLow
-                heightCompressionPriority = AppKit.NSLayoutPriorityDefaultLow
-            elif height.startswith("=="):
-                pass
-            elif height.startswith(">="):
-                heightHuggingPriority = AppKit.NSLayoutPriorityDefaultLow
-            elif height.startswith("<="):
-                heightCompressionPriority = AppKit.NSLayoutPriorityDefaultLow
         view.setContentHuggingPriority_forOrientation_(
             heightHuggingPriority,
             AppKit.NSLayoutConstraintOrientationVertical
@@ -219,52 +209,26 @@ class _StackView(VanillaBaseObject):
             heightCompressionPriority,
             AppKit.NSLayoutConstraintOrientationVertical
         )
-        # constraints
-        bottomInset, leftInset, topInset, rightInset = self._nsObject.edgeInsets()
-        if width is not None:
-            if width == "fill":
-                _setAnchorConstraint(
-                    anchor=view.leftAnchor(),
-                    otherAnchor=stackView.leftAnchor(),
-                    constant=leftInset
-                )
-                _setAnchorConstraint(
-                    anchor=view.rightAnchor(),
-                    otherAnchor=stackView.rightAnchor(),
-                    constant=-rightInset
-                )
-            else:
-                _setAnchorConstraint(
-                    view.widthAnchor(),
-                    width
-                )
-        if height is not None:
-            if height == "fill":
-                _setAnchorConstraint(
-                    anchor=view.topAnchor(),
-                    otherAnchor=stackView.topAnchor(),
-                    constant=topInset
-                )
-                _setAnchorConstraint(
-                    anchor=view.bottomAnchor(),
-                    otherAnchor=stackView.bottomAnchor(),
-                    constant=-bottomInset
-                )
-            else:
-                _setAnchorConstraint(
-                    view.heightAnchor(),
-                    height
-                )
+        stackView.insertView_atIndex_inGravity_(view, index, gravity)
+        self._arrangedViews[view] = wrapper
+        self._viewGravities[view] = gravity
+        self._gravityCounts[gravity] = self._gravityCounts.get(gravity, 0) + 1
         # spacing
         if spacing is not None:
             stackView.setCustomSpacing_afterView_(spacing, view)
+        return _makeConstraints(view, stackView, plan["constraints"])
 
     def removeView(self, view):
         """
         Remove a view.
         """
         if isinstance(view, VanillaBaseObject):
+            _getWrapperRegistry(self).remove(view)
             view = view._nsObject
+        self._arrangedViews.pop(view, None)
+        gravity = self._viewGravities.pop(view, None)
+        if gravity is not None:
+            self._gravityCounts[gravity] -= 1
         self.getNSStackView().removeView_(view)
 
 
@@ -375,48 +339,285 @@ class VerticalStackView(_StackView):
         width=AppKit.NSLayoutAttributeWidth
     )
 
-def _setAnchorConstraint(
-        anchor,
-        value=None,
-        otherAnchor=None,
-        constant=0
-    ):
-    if isinstance(value, str) and "," in value:
-        for v in value.split(","):
-            v = v.strip()
-            _setAnchorConstraint(
-                anchor,
-                value=v,
-                otherAnchor=otherAnchor,
-                constant=constant
-            )
-        return
-    for existing in anchor.constraintsAffectingLayout():
-        existing.setActive_(False)
-    if otherAnchor is not None:
-        anchorMethods = {
-            "==" : anchor.constraintEqualToAnchor_constant_,
-            ">=" : anchor.constraintGreaterThanOrEqualToAnchor_constant_,
-            "<=" : anchor.constraintLessThanOrEqualToAnchor_constant_,
-        }
-        args = [otherAnchor, constant]
-        if not isinstance(value, str):
-            value = "=="
-        relation = value[:2]
-        method = anchorMethods[relation]
-    else:
-        assert value is not None, "A value must be given if otherAnchor is None."
-        valueMethods = {
-            "==" : anchor.constraintEqualToConstant_,
-            ">=" : anchor.constraintGreaterThanOrEqualToConstant_,
-            "<=" : anchor.constraintLessThanOrEqualToConstant_,
-        }
-        if isinstance(value, (int, float)):
-            method = valueMethods["=="]
+class VanillaVirtualStackDocumentView(AppKit.NSView):
+
+    def isFlipped(self):
+        return True
+
+
+class VanillaVirtualStackClipView(AppKit.NSClipView):
+
+    def setBoundsOrigin_(self, origin):
+        super().setBoundsOrigin_(origin)
+        wrapper = self.vanillaWrapper()
+        if wrapper is not None:
+            wrapper._updateRows()
+
+    def setFrameSize_(self, size):
+        super().setFrameSize_(size)
+        wrapper = self.vanillaWrapper()
+        if wrapper is not None:
+            wrapper._updateRows()
+
+
+class VirtualVerticalStackView(ScrollView):
+
+    """
+    A vertical stack of rows in a scroll view that only creates views
+    for the visible rows. Views of rows that are scrolled out of view
+    are reused for the rows that are scrolled into view, so a stack with
+    thousands of rows needs about as many views as fit on screen.
+
+    ::
+
+        from vanilla import CheckBox, VirtualVerticalStackView, Window
+
+        class VirtualVerticalStackViewExample:
+
+            def __init__(self):
+                self.w = Window((300, 400))
+                self.w.stack = VirtualVerticalStackView(
+                    (0, 0, 0, 0),
+                    rowCount=2000,
+                    rowHeight=24,
+                    rowBuilder=self.buildRow
+                )
+                self.w.open()
+
+            def buildRow(self, index, view):
+                if view is None:
+                    view = CheckBox((10, 0, -10, -0), "")
+                view.setTitle(f"Setting {index}")
+                return view
+
+        VirtualVerticalStackViewExample()
+
+    **posSize** Tuple of form *(left, top, width, height)* or *"auto"* representing
+    the position and size of the stack.
+
+    **rowCount** The number of rows.
+
+    **rowHeight** The height of the rows or a function taking a row index
+    and returning an estimate of the height of the row. Estimates can be
+    corrected with `setRowHeight`.
+
+    **rowBuilder** A function taking a row index and a view to reuse and
+    returning the view for the row. The view to reuse is a view previously
+    returned by the builder or `None`. Views are vanilla objects or instances
+    of `NSView`_. Vanilla objects are positioned by their posSize within the
+    row. Other views and vanilla objects with an *"auto"* posSize span the
+    width of the stack and the height of the row.
+
+    **overscan** The number of rows above and below the visible rows
+    that have a view.
+
+    **maxRecycledViews** The maximum number of unused views that are
+    kept for reuse.
+
+    .. _NSView: https://developer.apple.com/documentation/appkit/nsview?language=objc
+    """
+
+    nsDocumentViewClass = VanillaVirtualStackDocumentView
+    nsClipViewClass = VanillaVirtualStackClipView
+
+    def __init__(self, posSize, rowCount, rowHeight, rowBuilder, overscan=2, maxRecycledViews=None,
+            autohidesScrollers=True, drawsBackground=False):
+        self._rowBuilder = rowBuilder
+        self._rows = VirtualRows(
+            RowHeights(rowCount, rowHeight),
+            self._buildRow,
+            overscan=overscan,
+            pool=RecyclingPool(maxSize=maxRecycledViews, discard=self._discardView)
+        )
+        self._documentView = self.nsDocumentViewClass.alloc().init()
+        self._documentView.setAutoresizingMask_(AppKit.NSViewWidthSizable)
+        super().__init__(
+            posSize,
+            self._documentView,
+            hasHorizontalScroller=False,
+            autohidesScrollers=autohidesScrollers,
+            clipView=getNSSubclass(self.nsClipViewClass)(self),
+            drawsBackground=drawsBackground
+        )
+        self._walkDocumentView = False
+        self._updateDocumentHeight()
+
+    def _breakCycles(self):
+        self._rows.recycleAll()
+        self._rows.pool.clear()
+        super()._breakCycles()
+
+    def _buildRow(self, index, view):
+        newView = self._rowBuilder(index, view)
+        if newView is not view:
+            if view is not None:
+                self._discardView(view)
+            if isinstance(newView, VanillaBaseObject):
+                _adoptWrapper(self, newView)
+            nsView = _getNSView(newView)
+            nsView.setTranslatesAutoresizingMaskIntoConstraints_(True)
+            if _getRowPosSize(newView) is None:
+                nsView.setAutoresizingMask_(AppKit.NSViewWidthSizable)
+            else:
+                # the vertical position is set by _placeRow, the
+                # document view grows with the number of rows
+                nsView.setAutoresizingMask_(nsView.autoresizingMask() & ~_verticalAutoresizingMask)
+        return newView
+
+    def _discardView(self, view):
+        _getNSView(view).removeFromSuperview()
+        if isinstance(view, VanillaBaseObject):
+            _getWrapperRegistry(self).remove(view)
+            view._breakCycles()
+        else:
+            _breakCycles(view)
+
+    def _updateDocumentHeight(self):
+        width = self._nsObject.contentSize().width
+        height = self._rows.rowHeights.getTotalHeight()
+        self._documentView.setFrameSize_((width, height))
+        self._updateRows()
+
+    def _placeRow(self, index, view):
+        rowHeights = self._rows.rowHeights
+        nsView = _getNSView(view)
+        top = rowHeights.getRowOffset(index)
+        width = self._documentView.frame().size.width
+        height = rowHeights.getRowHeight(index)
+        posSize = _getRowPosSize(view)
+        if posSize is None:
+            nsView.setFrame_(((0, top), (width, height)))
+        else:
+            # position the view in the row, the document view is flipped
+            l, t, w, h = posSize
+            frame = _calcFrame(((0, 0), (width, height)), ((l, t), (w, h)))
+            (x, y), (w, h) = view._adjustPosSize(frame)
+            nsView.setFrame_(((x, top + height - y - h), (w, h)))
+        if nsView.superview() is not self._documentView:
+            self._documentView.addSubview_(nsView)
+        _recursiveSetFrame(nsView)
+
+    def _updateRows(self):
+        rows = getattr(self, "_rows", None)
+        if rows is None:
+            # the clip view is resized while the scroll view is built
+            return
+        (x, top), (width, height) = self._nsObject.documentVisibleRect()
+        removed, added = rows.update(top, height)
+        for index, view in removed:
+            _getNSView(view).setHidden_(True)
+        for index, view in added:
+            self._placeRow(index, view)
+            _getNSView(view).setHidden_(False)
+
+    def _relayout(self):
+        # reposition the rows after heights changed
+        self._updateDocumentHeight()
+        for index, view in self._rows.getViews().items():
+            self._placeRow(index, view)
+
+    def getRowCount(self):
+        """
+        Get the number of rows.
+        """
+        return self._rows.rowHeights.getRowCount()
+
+    def setRowCount(self, rowCount):
+        """
+        Set the number of rows. The visible rows are rebuilt.
+        """
+        for index, view in self._rows.recycleAll():
+            _getNSView(view).setHidden_(True)
+        self._rows.rowHeights.setRowCount(rowCount)
+        self._updateDocumentHeight()
+
+    def setRowHeight(self, index, height):
+        """
+        Set the height of the row at *index*, for example
+        to replace the estimate with the measured height.
+        """
+        if self._rows.rowHeights.setRowHeight(index, height):
+            self._relayout()
+
+    def reloadRows(self, indexes=None):
+        """
+        Give the views of the rows at *indexes*, or all visible
+        rows if `None`, to the row builder again.
+        """
+        for index, oldView, newView in self._rows.reload(indexes):
+            if newView is not oldView:
+                self._placeRow(index, newView)
+
+    def getRowView(self, index):
+        """
+        Get the view of the row at *index*. This is `None`
+        if the row is not visible.
+        """
+        return self._rows.getView(index)
+
+    def getVisibleRowRange(self):
+        """
+        Get the *(start, stop)* range of rows that have a view.
+        """
+        return self._rows.getRange()
+
+    def scrollToRow(self, index):
+        """
+        Scroll the row at *index* into view.
+        """
+        rowHeights = self._rows.rowHeights
+        rect = ((0, rowHeights.getRowOffset(index)), (1, rowHeights.getRowHeight(index)))
+        self._documentView.scrollRectToVisible_(rect)
+
+
+def _getNSView(view):
+    if isinstance(view, VanillaBaseObject):
+        return view._nsObject
+    return view
+
+
+_verticalAutoresizingMask = AppKit.NSViewHeightSizable | AppKit.NSViewMinYMargin | AppKit.NSViewMaxYMargin
+
+
+def _getRowPosSize(view):
+    # the posSize a row view is placed with or None to fill the row
+    posSize = getattr(view, "_posSize", None)
+    if not isinstance(view, VanillaBaseObject) or posSize is None or posSize == "auto":
+        return None
+    return posSize
+
+
+def _getAnchor(view, name):
+    return getattr(view, name + "Anchor")()
+
+
+def _makeConstraints(view, stackView, constraintDescriptions):
+    # Create, but don't activate, the constraints described by
+    # stackViewLayout.planStackItem. Constraints from earlier
+    # insertions of the view are deactivated.
+    constraints = []
+    deactivated = set()
+    for anchorName, relation, otherAnchorName, constant in constraintDescriptions:
+        anchor = _getAnchor(view, anchorName)
+        if anchorName not in deactivated:
+            deactivated.add(anchorName)
+            existing = anchor.constraintsAffectingLayout()
+            if existing:
+                AppKit.NSLayoutConstraint.deactivateConstraints_(existing)
+        if otherAnchorName is not None:
+            otherAnchor = _getAnchor(stackView, otherAnchorName)
+            anchorMethods = {
+                "==" : anchor.constraintEqualToAnchor_constant_,
+                ">=" : anchor.constraintGreaterThanOrEqualToAnchor_constant_,
+                "<=" : anchor.constraintLessThanOrEqualToAnchor_constant_,
+            }
+            constraint = anchorMethods[relation](otherAnchor, constant)
         else:
-            relation = value[:2]
-            value = float(value[2:])
-            method = valueMethods[relation]
-        args = [value]
-    constraint = method(*args)
-    constraint.setActive_(True)
+            valueMethods = {
+                "==" : anchor.constraintEqualToConstant_,
+                ">=" : anchor.constraintGreaterThanOrEqualToConstant_,
+                "<=" : anchor.constraintLessThanOrEqualToConstant_,
+            }
+            constraint = valueMethods[relation](constant)
+        constraints.append(constraint)
+    return constraints
@@ -15,7 +15,7 @@ from AppKit import NSViewController,\
     NSViewControllerTransitionSlideForward,\
     NSViewControllerTransitionSlideBackward,\
     NSFont
-from vanilla.vanillaBase import VanillaBaseObject, _breakCycles, _sizeStyleMap, VanillaCallbackWrapper, \
+from vanilla.vanillaBase import VanillaBaseObject, _adoptWrapper, _sizeStyleMap, VanillaCallbackWrapper, \
     _reverseSizeStyleMap, _recursiveSetFrame
 from vanilla.nsSubclasses import getNSSubclass
 
@@ -60,8 +60,9 @@ class VanillaTabItem(VanillaBaseObject):
         return self._tabItem.view()
 
     def _breakCycles(self):
+        # the subviews are registered with the
+        # Tabs object through _adoptWrapper.
         self._nsObject = None
-        _breakCycles(self._tabItem.view())
         self._autoLayoutViews.clear()
 
 
@@ -182,6 +183,7 @@ class Tabs(VanillaBaseObject):
         for title in titles:
             tab = self.vanillaTabViewItemClass(title)
             self._tabItems.append(tab)
+            _adoptWrapper(self, tab)
             self._tabViewController.addTabViewItem_(tab._tabItem)
         # now that the tabs are all set, set the callback.
         # this is done because the callback will be called
@@ -234,11 +236,6 @@ class Tabs(VanillaBaseObject):
     def __getitem__(self, index):
         return self._tabItems[index]
 
-    def _breakCycles(self):
-        super()._breakCycles()
-        for item in self._tabItems:
-            item._breakCycles()
-
     def get(self):
         """
         Get the index of the selected tab.
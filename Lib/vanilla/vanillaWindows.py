@@ -1,4 +1,4 @@
-from Foundation import NSObject
+from Foundation import NSObject, NSTimer, NSRunLoop, NSRunLoopCommonModes
 from AppKit import (
     NSApp,
     NSWindow,
@@ -42,10 +42,15 @@ from AppKit import (
 from objc import python_method
 from objc import super
 
-from vanilla.vanillaBase import _breakCycles, _calcFrame, _setAttr, _delAttr, _addAutoLayoutRules, _flipFrame, \
-        VanillaCallbackWrapper, VanillaError, VanillaWarning, VanillaBaseControl, \
+from vanilla.vanillaBase import _getWrapperRegistry, _calcFrame, _setAttr, _delAttr, _addAutoLayoutRules, _flipFrame, \
+        VanillaCallbackWrapper, VanillaError, VanillaWarning, VanillaBaseObject, VanillaBaseControl, \
         osVersionCurrent, osVersion10_7, osVersion10_10, osVersion10_16
 from vanilla.vanillaMenuBuilder import VanillaMenuBuilder
+from vanilla.eventCoalescing import CoalescedCallback, normalizeCoalesceMode, defaultFrameInterval
+from vanilla.eventBus import EventBus, EventBinding
+from vanilla.toolbarModel import ToolbarModel, isStandardIdentifier
+from vanilla.imageCache import imageFromPath
+from vanilla.layoutState import collectLayoutStates, applyLayoutStates
 
 # PyObjC may not have these constants wrapped,
 # so test and fallback if needed.
@@ -77,6 +82,35 @@ except ImportError:
     NSFullSizeContentViewWindowMask = 1 << 15
 
 
+def _isVanillaView(obj):
+    return isinstance(obj, VanillaBaseObject)
+
+
+class _ScheduledCall(NSObject):
+
+    # The target of the timer of _scheduleCall.
+
+    def initWithFunction_(self, function):
+        self = self.init()
+        self._function = function
+        return self
+
+    def fire_(self, timer):
+        function = self._function
+        self._function = None
+        if function is not None:
+            function()
+
+
+def _scheduleCall(delay, function):
+    # performSelector:afterDelay: only fires in the default run loop
+    # mode, not while the run loop tracks a live resize. the timer
+    # fires in all common modes.
+    call = _ScheduledCall.alloc().initWithFunction_(function)
+    timer = NSTimer.timerWithTimeInterval_target_selector_userInfo_repeats_(delay, call, "fire:", None, False)
+    NSRunLoop.currentRunLoop().addTimer_forMode_(timer, NSRunLoopCommonModes)
+
+
 class Window(NSObject):
 
     """
@@ -202,7 +236,7 @@ class Window(NSObject):
         self._window.setTitle_(title)
         self._window.setLevel_(self.nsWindowLevel)
         self._window.setReleasedWhenClosed_(False)
-        self._bindings = {}
+        self._eventBus = EventBus()
         self._window.setDelegate_(self)
         self._autoLayoutViews = {}
         self._initiallyVisible = initiallyVisible
@@ -250,13 +284,11 @@ class Window(NSObject):
         self._window.setFrameTopLeftPoint_(leftTop)
 
     def _breakCycles(self):
-        self._bindings = {}
+        self._eventBus.clear()
         self._menuItemCallbackWrappers = None
-        _breakCycles(self._window.contentView())
-        drawers = self._window.drawers()
-        if drawers is not None:
-            for drawer in drawers:
-                _breakCycles(drawer.contentView())
+        # every wrapper in the window, the drawers included,
+        # is registered, the views don't have to be walked
+        _getWrapperRegistry(self).clear()
 
     def _getContentView(self):
         return self._window.contentView()
@@ -369,6 +401,44 @@ class Window(NSObject):
         """
         self._window.setTitle_(title)
 
+    @python_method
+    def getLayoutState(self):
+        """
+        Return the frame of the window and the layout state of the views
+        in it that support it, such as :class:`SplitView` and :class:`List2`,
+        as a dictionary that can be given to *setLayoutState*. The dictionary
+        only contains lists, dictionaries, strings, numbers and booleans,
+        so it can be stored as JSON or in the user defaults::
+
+            {
+                "frame": [100, 200, 400, 300],
+                "views": {"splitView": {...}, "group.list": {...}}
+            }
+
+        The views are identified by the attribute names leading to them.
+        """
+        (x, y), (w, h) = self._window.frame()
+        return dict(
+            frame=[x, y, w, h],
+            views=collectLayoutStates(self, _isVanillaView)
+        )
+
+    @python_method
+    def setLayoutState(self, state):
+        """
+        Restore the frame of the window and the layout state of its views
+        from a dictionary returned by *getLayoutState*. Views that no longer
+        exist are ignored.
+
+        Call this after the views have been added and before the window is
+        opened, so the window is laid out once with the restored state.
+        """
+        frame = state.get("frame")
+        if frame is not None:
+            x, y, w, h = frame
+            self._window.setFrame_display_(((x, y), (w, h)), False)
+        applyLayoutStates(self, state.get("views"), _isVanillaView)
+
     def getTitle(self):
         """
         The title in the window's title bar.
@@ -569,7 +639,7 @@ class Window(NSObject):
         self._window.setDefaultButtonCell_(cell)
 
     @python_method
-    def bind(self, event, callback):
+    def bind(self, event, callback, coalesce=None, priority=0, weak=False):
         """
         Bind a callback to an event.
 
@@ -617,10 +687,52 @@ class Window(NSObject):
                     print("window moved!", sender)
 
             WindowBindDemo()
+
+        **coalesce** Collapse bursts of events into fewer calls. This is useful for
+        *"resize"* and *"move"* callbacks that do expensive work. The options are:
+
+        +----------------+-----------------------------------------------------------------+
+        | *None*         | Call the callback for every event. This is the default.         |
+        +----------------+-----------------------------------------------------------------+
+        | *"frame"*      | Call the callback at most once per display frame.               |
+        |                | The last event of a burst is always delivered.                  |
+        +----------------+-----------------------------------------------------------------+
+        | *"end"*        | Call the callback once, when the user stops live resizing.      |
+        |                | Events outside of a live resize are delivered immediately.      |
+        +----------------+-----------------------------------------------------------------+
+        | a number       | Call the callback once the events have stopped for this many    |
+        |                | seconds.                                                        |
+        +----------------+-----------------------------------------------------------------+
+
+        Coalesced callbacks are called later than the event, so they can't be used
+        for events that need a return value such as *"should close"*.
+
+        **priority** Callbacks with a higher priority are called before callbacks
+        with a lower priority. Callbacks with the same priority are called in the
+        order they were bound. The default is `0`.
+
+        **weak** If `True` the window only keeps a weak reference to the callback
+        and the callback is unbound when it is garbage collected.
+
+        This returns a token that can be given to *unbind*.
         """
-        if event not in self._bindings:
-            self._bindings[event] = []
-        self._bindings[event].append(callback)
+        wrapper = None
+        coalesce = normalizeCoalesceMode(coalesce)
+        if coalesce is not None:
+            if event == "should close":
+                raise VanillaError("the \"should close\" event can't be coalesced")
+            frameInterval = self._getFrameInterval()
+
+            def wrapper(callback):
+                return CoalescedCallback(
+                    callback,
+                    coalesce,
+                    scheduleCall=_scheduleCall,
+                    inLiveResize=self._inLiveResize,
+                    frameInterval=frameInterval
+                )
+
+        return self._eventBus.bind(event, callback, priority=priority, weak=weak, wrapper=wrapper)
 
     @python_method
     def unbind(self, event, callback):
@@ -630,20 +742,44 @@ class Window(NSObject):
         **event** A string representing the desired event.
         Refer to *bind* for the options.
 
-        **callback** The callback that has been bound to the event.
+        **callback** The callback that has been bound to the event
+        or the token returned by *bind*. Unbinding with the token
+        doesn't need to search the bindings of the event.
         """
-        self._bindings[event].remove(callback)
+        if isinstance(callback, EventBinding):
+            self._eventBus.unbind(callback)
+        else:
+            self._eventBus.unbindCallback(event, callback)
+
+    @python_method
+    def getEventBus(self):
+        """
+        Return the `EventBus` holding the bindings of the window.
+        Its `getDispatchStats` method reports the time spent in
+        the callbacks of each event.
+        """
+        return self._eventBus
+
+    @python_method
+    def _inLiveResize(self):
+        if self._window is None:
+            return False
+        return self._window.inLiveResize()
+
+    @python_method
+    def _getFrameInterval(self):
+        screen = self._window.screen()
+        if screen is None:
+            screen = NSScreen.mainScreen()
+        if screen is not None and hasattr(screen, "maximumFramesPerSecond"):
+            framesPerSecond = screen.maximumFramesPerSecond()
+            if framesPerSecond:
+                return 1.0 / framesPerSecond
+        return defaultFrameInterval
 
     @python_method
     def _alertBindings(self, key):
-        returnValues = []
-        if key in self._bindings:
-            for callback in list(self._bindings[key]):
-                value = callback(self)
-                if value is not None:
-                    # elimitate None return value
-                    returnValues.append(value)
-        return all(returnValues)
+        self._eventBus.post(key, self)
 
     def windowWillClose_(self, notification):
         self.hide()
@@ -680,6 +816,9 @@ class Window(NSObject):
     def windowDidResize_(self, notification):
         self._alertBindings("resize")
 
+    def windowDidEndLiveResize_(self, notification):
+        self._eventBus.flush("resize")
+
     def windowDidEnterFullScreen_(self, notification):
         self._alertBindings("enter full screen")
 
@@ -693,10 +832,8 @@ class Window(NSObject):
         self._alertBindings("will exit full screen")
 
     def windowShouldClose_(self, notification):
-        shouldClose = self._alertBindings("should close")
-        if shouldClose is None:
-            shouldClose = True
-        return shouldClose
+        # elimitate None return values
+        return all(self._eventBus.post("should close", self, collectResults=True))
 
     # -------
     # Toolbar
@@ -848,18 +985,13 @@ class Window(NSObject):
             NSToolbarShowColorsItemIdentifier,
         ]
         # create the reference structures
-        self._toolbarItems = {}
-        self._toolbarDefaultItemIdentifiers = []
-        self._toolbarAllowedItemIdentifiers = []
-        self._toolbarCallbackWrappers = {}
-        self._toolbarSelectableItemIdentifiers = []
+        self._toolbarModel = ToolbarModel()
         # create the toolbar items
         for itemData in toolbarItems:
             self._createToolbarItem(itemData)
         if addStandardItems:
             for standardItem in STANDARD_TOOLBAR_ITEMS:
-                if standardItem not in self._toolbarAllowedItemIdentifiers:
-                    self._toolbarAllowedItemIdentifiers.append(standardItem)
+                self._toolbarModel.addAllowedIdentifier(standardItem)
         # create the toolbar
         toolbar = NSToolbar.alloc().initWithIdentifier_(toolbarIdentifier)
         toolbar.setDelegate_(self)
@@ -885,11 +1017,11 @@ class Window(NSObject):
         self._window.setToolbar_(toolbar)
         # Return the dict of toolbar items, so our caller can choose to
         # keep references to them if needed.
-        return self._toolbarItems
+        return self._toolbarModel.items
 
     def getToolbarItems(self):
-        if hasattr(self, "_toolbarItems"):
-            return self._toolbarItems
+        if hasattr(self, "_toolbarModel"):
+            return self._toolbarModel.items
         return {}
 
     @python_method
@@ -901,16 +1033,41 @@ class Window(NSObject):
 
         **index** An integer, specifying the place to insert the toolbar itemIdentifier.
         """
-        if not hasattr(self, "_toolbarItems"):
+        self.addToolbarItems([itemData], index)
+
+    @python_method
+    def addToolbarItems(self, toolbarItems, index=None):
+        """
+        Add several toolbar items to the windows toolbar at once.
+
+        **toolbarItems** A list of item descriptions with the same format as the toolbarItem descriptions in `addToolbar`.
+
+        **index** An integer, specifying the place to insert the first toolbar itemIdentifier.
+        The other items follow it in the given order.
+        """
+        if not hasattr(self, "_toolbarModel"):
             raise VanillaError("window has not toolbar")
-        itemIdentifier = itemData.get("itemIdentifier")
-        self._createToolbarItem(itemData)
-        if itemData.get("visibleByDefault", True):
-            if index is not None:
-                self._toolbarDefaultItemIdentifiers.remove(itemIdentifier)
-                self._toolbarDefaultItemIdentifiers.insert(index, itemIdentifier)
-            index = self._toolbarDefaultItemIdentifiers.index(itemIdentifier)
-            self._window.toolbar().insertItemWithItemIdentifier_atIndex_(itemIdentifier, index)
+        model = self._toolbarModel
+        defaultIdentifiers = model.defaultIdentifiers
+        # standard items can appear more than once, they
+        # are tracked by the key of their default entry
+        visibleKeys = []
+        for itemData in toolbarItems:
+            key = self._createToolbarItem(itemData)
+            if key is not None:
+                visibleKeys.append(key)
+        if not visibleKeys:
+            return
+        if index is not None:
+            for offset, key in enumerate(visibleKeys):
+                defaultIdentifiers.insertKey(index + offset, key)
+        positions = {
+            key: position
+            for position, key in enumerate(defaultIdentifiers.getKeys())
+        }
+        toolbar = self._window.toolbar()
+        for key in sorted(visibleKeys, key=positions.get):
+            toolbar.insertItemWithItemIdentifier_atIndex_(defaultIdentifiers.getIdentifier(key), positions[key])
 
     @python_method
     def removeToolbarItem(self, itemIdentifier):
@@ -919,36 +1076,48 @@ class Window(NSObject):
 
         **itemIdentifier** A unique string identifier for the removed item.
         """
-        if not hasattr(self, "_toolbarItems"):
+        self.removeToolbarItems([itemIdentifier])
+
+    @python_method
+    def removeToolbarItems(self, itemIdentifiers):
+        """
+        Remove several toolbar items at once.
+
+        **itemIdentifiers** A list of the unique string identifiers of the removed items.
+        """
+        if not hasattr(self, "_toolbarModel"):
             raise VanillaError("window has not toolbar")
-        if itemIdentifier not in self._toolbarItems:
-            raise VanillaError("itemIdentifier %r not in toolbar" % itemIdentifier)
-        item = self._toolbarItems[itemIdentifier]
-        toolbarItems = self._window.toolbar().items()
-        if item in toolbarItems:
-            ## it can happen a user changed the toolbar manually
-            index = toolbarItems.indexOfObject_(item)
-            self._window.toolbar().removeItemAtIndex_(index)
-        self._toolbarAllowedItemIdentifiers.remove(itemIdentifier)
-        self._toolbarDefaultItemIdentifiers.remove(itemIdentifier)
-        del self._toolbarItems[itemIdentifier]
+        model = self._toolbarModel
+        for itemIdentifier in itemIdentifiers:
+            if itemIdentifier not in model.items:
+                raise VanillaError("itemIdentifier %r not in toolbar" % itemIdentifier)
+        toolbar = self._window.toolbar()
+        # it can happen a user changed the toolbar manually,
+        # so look up the current indexes of the items
+        removed = set(model.items[itemIdentifier] for itemIdentifier in itemIdentifiers)
+        indexes = [
+            index
+            for index, item in enumerate(toolbar.items())
+            if item in removed
+        ]
+        for index in reversed(indexes):
+            toolbar.removeItemAtIndex_(index)
+        for itemIdentifier in itemIdentifiers:
+            model.removeItem(itemIdentifier)
 
     @python_method
     def _createToolbarItem(self, itemData):
         itemIdentifier = itemData.get("itemIdentifier")
         if itemIdentifier is None:
             raise VanillaError("toolbar item data must contain a unique itemIdentifier string")
-        if itemIdentifier in self._toolbarItems:
+        model = self._toolbarModel
+        if itemIdentifier in model.items:
             raise VanillaError("toolbar itemIdentifier is not unique: %r" % itemIdentifier)
+        visibleByDefault = itemData.get("visibleByDefault", True)
 
-        if itemIdentifier not in self._toolbarAllowedItemIdentifiers:
-            self._toolbarAllowedItemIdentifiers.append(itemIdentifier)
-        if itemData.get("visibleByDefault", True):
-            self._toolbarDefaultItemIdentifiers.append(itemIdentifier)
-
-        if itemIdentifier.startswith("NS"):
+        if isStandardIdentifier(itemIdentifier):
             # no need to create an actual item for a standard Cocoa toolbar item
-            return
+            return model.addItem(itemIdentifier, visibleByDefault=visibleByDefault)
 
         label = itemData.get("label")
         paletteLabel = itemData.get("paletteLabel", label)
@@ -964,7 +1133,7 @@ class Window(NSObject):
         callback = itemData.get("callback", None)
         # create the NSImage if needed
         if imagePath is not None:
-            image = NSImage.alloc().initWithContentsOfFile_(imagePath)
+            image = imageFromPath(imagePath)
         elif imageNamed is not None:
             image = NSImage.imageNamed_(imageNamed)
         elif imageObject is not None:
@@ -976,8 +1145,11 @@ class Window(NSObject):
         toolbarItem.setPaletteLabel_(paletteLabel)
         toolbarItem.setToolTip_(toolTip)
         if image is not None:
-            if imageTemplate is not None:
+            if imageTemplate is not None and image.isTemplate() != imageTemplate:
                 # only change the image template setting if its either True or False
+                # images from the cache are shared, so change a copy
+                if imagePath is not None:
+                    image = image.copy()
                 image.setTemplate_(imageTemplate)
             toolbarItem.setImage_(image)
         elif view is not None:
@@ -994,29 +1166,33 @@ class Window(NSObject):
             toolbarItem.setVisibilityPriority_(NSToolbarItemVisibilityPriorityLow)
         elif priority == "high":
             toolbarItem.setVisibilityPriority_(NSToolbarItemVisibilityPriorityHigh)
+        target = None
         if callback is not None:
             target = VanillaCallbackWrapper(callback)
             toolbarItem.setTarget_(target)
             toolbarItem.setAction_("action:")
-            self._toolbarCallbackWrappers[itemIdentifier] = target
-        if itemData.get("selectable", False):
-            self._toolbarSelectableItemIdentifiers.append(itemIdentifier)
 
-        self._toolbarItems[itemIdentifier] = toolbarItem
+        return model.addItem(
+            itemIdentifier,
+            toolbarItem,
+            visibleByDefault=visibleByDefault,
+            selectable=itemData.get("selectable", False),
+            callbackWrapper=target
+        )
 
     # Toolbar delegate methods
 
     def toolbarDefaultItemIdentifiers_(self, anIdentifier):
-        return self._toolbarDefaultItemIdentifiers
+        return self._toolbarModel.defaultIdentifiers.getList()
 
     def toolbarAllowedItemIdentifiers_(self, anIdentifier):
-        return self._toolbarAllowedItemIdentifiers
+        return self._toolbarModel.allowedIdentifiers.getList()
 
     def toolbar_itemForItemIdentifier_willBeInsertedIntoToolbar_(self, toolbar, itemIdentifier, flag):
-        return self._toolbarItems.get(itemIdentifier)
+        return self._toolbarModel.items.get(itemIdentifier)
 
     def toolbarSelectableItemIdentifiers_(self, toolbar):
-        return self._toolbarSelectableItemIdentifiers
+        return self._toolbarModel.selectableIdentifiers.getList()
 
 
 class FloatingWindow(Window):
@@ -0,0 +1,273 @@
+"""
+Row bookkeeping for `VirtualVerticalStackView`.
+
+A virtual stack only has views for the rows that are visible, plus a
+few rows of overscan above and below. Rows that scroll out of view are
+put in a pool and handed to the row builder again for rows that scroll
+into view, so the number of views depends on the size of the scroll
+view, not on the number of rows.
+
+Row heights are kept in a binary indexed tree, so the offset of a row,
+the row at an offset and changing the height of one row all cost
+O(log n). Nothing in here depends on AppKit.
+"""
+
+
+class RowHeights(object):
+
+    """
+    The heights of the rows in a virtual stack.
+
+    **rowCount** The number of rows.
+
+    **estimateRowHeight** A number or a function taking a row index
+    and returning the estimated height of the row. Estimates can be
+    replaced with measured heights with `setRowHeight`.
+    """
+
+    def __init__(self, rowCount, estimateRowHeight):
+        self._estimateRowHeight = estimateRowHeight
+        self.setRowCount(rowCount)
+
+    def _estimate(self, index):
+        if callable(self._estimateRowHeight):
+            return self._estimateRowHeight(index)
+        return self._estimateRowHeight
+
+    def getRowCount(self):
+        return len(self._heights)
+
+    def setRowCount(self, rowCount):
+        """
+        Set the number of rows. Known heights of rows that
+        still exist are kept, new rows get an estimate.
+        """
+        heights = getattr(self, "_heights", [])[:rowCount]
+        heights.extend(self._estimate(index) for index in range(len(heights), rowCount))
+        self._heights = heights
+        # build the tree in O(n)
+        tree = [0] + heights
+        for index in range(1, rowCount + 1):
+            parent = index + (index & -index)
+            if parent <= rowCount:
+                tree[parent] += tree[index]
+        self._tree = tree
+        # the largest power of two not above the row count
+        self._topBit = 1 << (rowCount.bit_length() - 1) if rowCount else 0
+
+    def getRowHeight(self, index):
+        return self._heights[index]
+
+    def setRowHeight(self, index, height):
+        """
+        Set the height of the row at **index**.
+        Return `True` if the height changed.
+        """
+        change = height - self._heights[index]
+        if not change:
+            return False
+        self._heights[index] = height
+        tree = self._tree
+        position = index + 1
+        while position < len(tree):
+            tree[position] += change
+            position += position & -position
+        return True
+
+    def getRowOffset(self, index):
+        """
+        Return the offset of the top of the row at **index**,
+        which is the sum of the heights of the rows above it.
+        """
+        total = 0
+        tree = self._tree
+        position = index
+        while position > 0:
+            total += tree[position]
+            position -= position & -position
+        return total
+
+    def getTotalHeight(self):
+        return self.getRowOffset(len(self._heights))
+
+    def rowAtOffset(self, offset):
+        """
+        Return the index of the row containing **offset**. Offsets
+        before the first row give 0 and offsets after the last row
+        give the last row. Returns -1 if there are no rows.
+        """
+        rowCount = len(self._heights)
+        if not rowCount:
+            return -1
+        if offset < 0:
+            return 0
+        tree = self._tree
+        position = 0
+        bit = self._topBit
+        while bit:
+            next = position + bit
+            if next <= rowCount and tree[next] <= offset:
+                position = next
+                offset -= tree[next]
+            bit >>= 1
+        return min(position, rowCount - 1)
+
+
+def visibleRowRange(rowHeights, top, height, overscan=0):
+    """
+    Return the *(start, stop)* range of the rows visible between
+    **top** and **top + height**, extended by **overscan** rows
+    on both sides.
+    """
+    rowCount = rowHeights.getRowCount()
+    if not rowCount or height <= 0:
+        return (0, 0)
+    start = rowHeights.rowAtOffset(top)
+    stop = rowHeights.rowAtOffset(top + height)
+    # a row ending exactly at the bottom is not visible
+    if stop > start and rowHeights.getRowOffset(stop) >= top + height:
+        stop -= 1
+    start = max(0, start - overscan)
+    stop = min(rowCount, stop + 1 + overscan)
+    return (start, stop)
+
+
+class RecyclingPool(object):
+
+    """
+    Views that are not shown and can be reused.
+
+    **maxSize** The maximum number of views kept in the pool,
+    `None` for no limit.
+
+    **discard** An optional function that is called with views
+    that don't fit in the pool anymore.
+    """
+
+    def __init__(self, maxSize=None, discard=None):
+        self._views = []
+        self._maxSize = maxSize
+        self._discard = discard
+
+    def __len__(self):
+        return len(self._views)
+
+    def put(self, view):
+        if self._maxSize is not None and len(self._views) >= self._maxSize:
+            if self._discard is not None:
+                self._discard(view)
+            return
+        self._views.append(view)
+
+    def take(self):
+        """
+        Return a view from the pool or `None` if it is empty.
+        """
+        if self._views:
+            return self._views.pop()
+        return None
+
+    def clear(self):
+        views = self._views
+        self._views = []
+        if self._discard is not None:
+            for view in views:
+                self._discard(view)
+
+
+class VirtualRows(object):
+
+    """
+    The views of the visible rows of a virtual stack.
+
+    **rowHeights** A `RowHeights` object.
+
+    **buildRow** A function taking a row index and a view to reuse,
+    `None` if there is none, and returning the view for the row.
+
+    **overscan** The number of rows to keep above and below the
+    visible rows.
+
+    **pool** The `RecyclingPool` for views that are scrolled out of view.
+    """
+
+    def __init__(self, rowHeights, buildRow, overscan=0, pool=None):
+        if pool is None:
+            pool = RecyclingPool()
+        self.rowHeights = rowHeights
+        self.pool = pool
+        self._buildRow = buildRow
+        self._overscan = overscan
+        self._views = {}
+        self._range = (0, 0)
+
+    def getRange(self):
+        return self._range
+
+    def getView(self, index):
+        """
+        Return the view of the row at **index** or `None`
+        if the row is not in the current range.
+        """
+        return self._views.get(index)
+
+    def getViews(self):
+        """
+        Return a dictionary of the form `{index : view}`
+        with the views in the current range.
+        """
+        return dict(self._views)
+
+    def update(self, top, height):
+        """
+        Update the views for the area between **top** and **top + height**.
+        Views of rows outside the new range are put in the pool, rows in
+        the new range without a view get one from the row builder.
+
+        Returns two lists of *(index, view)*: the removed and the added rows.
+        """
+        start, stop = visibleRowRange(self.rowHeights, top, height, self._overscan)
+        self._range = (start, stop)
+        removed = []
+        for index in list(self._views):
+            if index < start or index >= stop:
+                view = self._views.pop(index)
+                self.pool.put(view)
+                removed.append((index, view))
+        added = []
+        for index in range(start, stop):
+            if index not in self._views:
+                view = self._buildRow(index, self.pool.take())
+                self._views[index] = view
+                added.append((index, view))
+        return removed, added
+
+    def reload(self, indexes=None):
+        """
+        Give the views of the rows at **indexes**, all rows
+        in the range if `None`, to the row builder again.
+        Returns a list of *(index, oldView, newView)* for the
+        rows in the range.
+        """
+        if indexes is None:
+            indexes = sorted(self._views)
+        reloaded = []
+        for index in indexes:
+            view = self._views.get(index)
+            if view is None:
+                continue
+            newView = self._buildRow(index, view)
+            self._views[index] = newView
+            reloaded.append((index, view, newView))
+        return reloaded
+
+    def recycleAll(self):
+        """
+        Put all views in the pool. Returns the removed *(index, view)*.
+        """
+        removed = sorted(self._views.items())
+        for index, view in removed:
+            self.pool.put(view)
+        self._views = {}
+        self._range = (0, 0)
+        return removed